@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, TextIO
+
+from ai_assistant.env import get_env
+from ai_assistant.streaming import reply_text
+
+# Campos procurados em cada linha, na ordem, quando `--prompt-field`/`--id-field` não são informados
+PROMPT_FIELDS = ("prompt", "content", "body")
+ID_FIELDS = ("id", "request_id")
+
+
+class BatchItem(NamedTuple):
+    index: int
+    id: str
+    prompt: str
+
+
+def read_items(lines: Iterable[str], prompt_field: Optional[str] = None, id_field: Optional[str] = None
+               ) -> List[BatchItem]:
+    """
+    Lê os prompts de um JSONL: cada linha é uma string JSON ou um objeto com o prompt num dos `PROMPT_FIELDS`.
+
+    Todas as linhas são validadas antes de qualquer chamada ao LLM.
+
+    Args:
+        lines (Iterable[str]): Linhas do arquivo; linhas em branco são ignoradas.
+        prompt_field (Optional[str]): Campo com o prompt (padrão: o primeiro de `PROMPT_FIELDS` presente).
+        id_field (Optional[str]): Campo com o id do item (padrão: o primeiro de `ID_FIELDS`, ou o número da linha).
+
+    Returns:
+        List[BatchItem]: Itens na ordem do arquivo.
+
+    Raises:
+        ValueError: Se uma linha não for JSON válido ou não tiver um prompt.
+    """
+    items = []
+    seen = set()
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Linha {number}: JSON inválido ({e})")
+        item_id = None
+        if isinstance(record, str):
+            prompt = record
+        elif isinstance(record, dict):
+            fields = (prompt_field,) if prompt_field else PROMPT_FIELDS
+            prompt = next((record[field] for field in fields if isinstance(record.get(field), str)), None)
+            ids = (id_field,) if id_field else ID_FIELDS
+            item_id = next((record[field] for field in ids if record.get(field) is not None), None)
+        else:
+            prompt = None
+        if not prompt or not prompt.strip():
+            raise ValueError(f"Linha {number}: prompt não encontrado (campos: {', '.join(fields)})"
+                             if isinstance(record, dict) else f"Linha {number}: esperado uma string ou um objeto")
+        item_id = str(item_id if item_id is not None else number)
+        if item_id in seen:
+            raise ValueError(f"Linha {number}: id '{item_id}' repetido")
+        seen.add(item_id)
+        items.append(BatchItem(len(items), item_id, prompt))
+    return items
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Percentil pelo método nearest-rank: o menor valor que cobre ao menos `fraction` dos valores."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class BatchRunner:
+    """
+    Executa uma lista de prompts no grafo, cada um na sua própria thread de checkpoints.
+
+    No máximo `max_concurrency` prompts rodam ao mesmo tempo; o ritmo das chamadas ao provedor
+    é limitado pelo `rate_limiter` do LLM (`LLM_RATE_LIMIT_PER_SECOND`), que vale para todas as
+    conversas juntas. Cada resultado é gravado (uma linha JSON) assim que o seu prompt termina,
+    então um batch interrompido mantém tudo o que já foi concluído.
+    """
+
+    def __init__(self, graph, max_concurrency: int = 4, timeout_s: Optional[float] = None,
+                 run_id: Optional[str] = None):
+        self.graph = graph
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+        self.run_id = run_id or f"batch-{uuid.uuid4().hex[:8]}"
+        self.records: List[Dict[str, Any]] = []
+
+    async def run_item(self, item: BatchItem) -> Dict[str, Any]:
+        thread_id = f"{self.run_id}-{item.id}"
+        config = {"configurable": {"thread_id": thread_id}}
+        record: Dict[str, Any] = {"index": item.index, "id": item.id, "thread_id": thread_id}
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self.graph.ainvoke({"messages": [{"role": "user", "content": item.prompt}]}, config), self.timeout_s
+            )
+            record["reply"] = reply_text(result.get("messages", []))
+        except asyncio.TimeoutError:
+            record["error"] = f"Tempo esgotado ({self.timeout_s}s)"
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["latency_s"] = round(time.perf_counter() - start, 3)
+        return record
+
+    async def run(self, items: Sequence[BatchItem], output: TextIO) -> List[Dict[str, Any]]:
+        """
+        Executa `items` e grava cada resultado em `output` na ordem em que terminam.
+
+        Cada linha tem `index` (posição no arquivo de entrada), `id`, `thread_id`, `latency_s`
+        e `reply` ou, se o prompt falhou, `error`.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(item: BatchItem) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.run_item(item)
+
+        tasks = [asyncio.create_task(limited(item)) for item in items]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                self.records.append(record)
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+        finally:
+            for task in tasks:
+                task.cancel()
+        return self.records
+
+
+def format_summary(records: List[Dict[str, Any]], total: int, elapsed_s: float) -> str:
+    """Vazão e percentis de latência dos prompts concluídos."""
+    failed = sum(1 for record in records if "error" in record)
+    lines = [
+        f"{len(records)}/{total} prompts em {elapsed_s:.1f}s ({len(records) / elapsed_s if elapsed_s else 0:.2f} prompts/s), "
+        f"{len(records) - failed} ok, {failed} com erro"
+    ]
+    latencies = [record["latency_s"] for record in records if "error" not in record]
+    if latencies:
+        lines.append("latência: " + ", ".join(
+            f"p{int(fraction * 100)} {percentile(latencies, fraction):.2f}s" for fraction in (0.5, 0.9, 0.95, 0.99)
+        ) + f", máx {max(latencies):.2f}s")
+    return "\n".join(lines)
+
+
+def _bounded(convert, minimum, inclusive: bool, description: str):
+    """Tipo do argparse que converte o valor e recusa os menores que `minimum`."""
+    def parse(value: str):
+        try:
+            number = convert(value)
+        except ValueError:
+            number = None
+        # `not >=`/`not >` também recusa NaN
+        if number is None or not (number >= minimum if inclusive else number > minimum):
+            raise argparse.ArgumentTypeError(f"esperado {description}, recebido '{value}'")
+        return number
+    return parse
+
+
+_positive_int = _bounded(int, 1, True, "um inteiro maior ou igual a 1")
+_non_negative_float = _bounded(float, 0, True, "um número maior ou igual a 0")
+_positive_float = _bounded(float, 0, False, "um número maior que 0")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    env = get_env()
+    parser = argparse.ArgumentParser(description="Executa os prompts de um arquivo JSONL no assistente, em paralelo.")
+    parser.add_argument("input", help="Arquivo JSONL com os prompts ('-' lê da entrada padrão).")
+    parser.add_argument("--output", "-o", default="-", help="Arquivo JSONL de saída ('-' escreve na saída padrão).")
+    parser.add_argument("--concurrency", "-c", type=_positive_int, default=env.BATCH_MAX_CONCURRENCY,
+                        help="Prompts executados ao mesmo tempo.")
+    parser.add_argument("--rate", type=_non_negative_float, default=env.LLM_RATE_LIMIT_PER_SECOND,
+                        help="Máximo de chamadas por segundo ao LLM (0 desativa).")
+    parser.add_argument("--burst", type=_positive_int, default=env.LLM_RATE_LIMIT_BURST,
+                        help="Chamadas que podem sair de uma vez depois de um período ocioso.")
+    parser.add_argument("--timeout", type=_positive_float, help="Tempo máximo de cada prompt, em segundos.")
+    parser.add_argument("--prompt-field", help=f"Campo com o prompt (padrão: {', '.join(PROMPT_FIELDS)}).")
+    parser.add_argument("--id-field", help=f"Campo com o id (padrão: {', '.join(ID_FIELDS)} ou o número da linha).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.input == "-":
+        items = read_items(sys.stdin, args.prompt_field, args.id_field)
+    else:
+        with open(args.input, encoding="utf-8") as file:
+            items = read_items(file, args.prompt_field, args.id_field)
+
+    from ai_assistant.graph import build_graph
+
+    config = get_env().model_copy(update={"LLM_RATE_LIMIT_PER_SECOND": args.rate, "LLM_RATE_LIMIT_BURST": args.burst})
+    runner = BatchRunner(build_graph(config), max_concurrency=args.concurrency, timeout_s=args.timeout)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    # O resumo vai para stderr para não se misturar ao JSONL quando a saída é a padrão
+    print(f"{runner.run_id}: {len(items)} prompts, {args.concurrency} em paralelo", file=sys.stderr)
+    start = time.perf_counter()
+    try:
+        asyncio.run(runner.run(items, output))
+    except KeyboardInterrupt:
+        print("\nBatch interrompido; os resultados concluídos foram gravados.", file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(format_summary(runner.records, len(items), time.perf_counter() - start), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
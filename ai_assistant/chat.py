@@ -1,44 +1,139 @@
+import argparse
 import os
 import signal
 import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future
 
-from langchain_core.messages import AIMessageChunk, AIMessage
-from ai_assistant.graph import graph
-from ai_assistant.utils import print_event
+from ai_assistant.streaming import ASSISTANT_NODES, ThinkTagFilter, message_text
+
+# O grafo (e com ele langchain, langgraph e o cliente do Groq) é montado em background
+# enquanto o usuário digita a primeira mensagem
+_graph_future = None
+# Verdadeiro enquanto o grafo responde uma mensagem
+_turn_running = False
 
 
 def signal_handler(sig, frame):
+    # Durante uma resposta, o primeiro Ctrl+C só interrompe as varreduras de diretórios em andamento,
+    # que devolvem ao LLM a árvore parcial; o segundo encerra o chat
+    if _turn_running:
+        from ai_assistant.walker import cancel_event
+        if not cancel_event.is_set():
+            cancel_event.set()
+            print("\nCancelando as varreduras em andamento (Ctrl+C de novo encerra o chat)...")
+            return
     print("\nEncerrando o chat...")
     sys.exit(0)
 
-def stream_graph_updates(user_input: str):
-  config = {"configurable": {"thread_id": "1"}}
 
-  # print("IA: ", end="")
+def _build_graph(future: Future):
+  try:
+      from ai_assistant.graph import get_graph
+      future.set_result(get_graph())
+  except BaseException as e:
+      future.set_exception(e)
+
+def prefetch_graph() -> Future:
+  """Começa a montar o grafo padrão numa thread daemon, se ainda não começou."""
+  global _graph_future
+  if _graph_future is None:
+      _graph_future = Future()
+      threading.Thread(target=_build_graph, args=(_graph_future,), name="graph-prefetch", daemon=True).start()
+  return _graph_future
+
+
+def stream_graph_updates(user_input: str, thread_id: str):
+  from langchain_core.messages import AIMessage
+  from ai_assistant.env import env
+  from ai_assistant.utils import print_event
+  from ai_assistant.walker import cancel_event
+
+  graph = prefetch_graph().result()
+  cancel_event.clear()
+  config = {"configurable": {"thread_id": thread_id}}
+
+  if not env.CHAT_STREAM_TOKENS:
+      _printed = set()
+      for event in graph.stream(
+        {"messages": [{"role": "user", "content": user_input}]},
+        config,
+        stream_mode="values"):
+          print_event(event, _printed)
+          message = event.get('messages')
+          if message:
+              if isinstance(message, list):
+                  message = message[-1]
+          if isinstance(message, AIMessage) and message.content:
+              print('\nAssistant:')
+              print(message.content)
+      return
+
+  # Os tokens chegam pelo modo "messages"; o modo "values" mantém a saída do `print_event`.
+  # Mensagens já transmitidas entram em `_printed` para não serem impressas de novo.
   _printed = set()
-  for event in graph.stream(
+  think_filter = ThinkTagFilter()
+  current_id = None
+  start = time.perf_counter()
+  first_token_at = None
+  for mode, payload in graph.stream(
     {"messages": [{"role": "user", "content": user_input}]},
     config,
-    stream_mode="values"):
-      print_event(event, _printed)
-      message = event.get('messages')
-      if message:
-          if isinstance(message, list):
-              message = message[-1]
-      if isinstance(message, AIMessage) and message.content:
-          print('\nAssistant:')
-          print(message.content)
-      # if isinstance(event, tuple):
-      #   if isinstance(event[0], AIMessageChunk):
-      #     message = event[0].content
-      #     print(message, end="", flush=True)
-  # print()
+    stream_mode=["messages", "values"]):
+      if mode == "values":
+          print_event(payload, _printed)
+          continue
+
+      # Respostas vindas do cache do LLM chegam inteiras, como `AIMessage`
+      chunk, metadata = payload
+      if not isinstance(chunk, AIMessage) or metadata.get("langgraph_node") not in ASSISTANT_NODES:
+          continue
+      if chunk.id != current_id:
+          if current_id in _printed:
+              print(think_filter.flush())
+          think_filter = ThinkTagFilter()
+          current_id = chunk.id
+      # Deltas de tool calls chegam sem conteúdo de texto
+      text = think_filter.feed(message_text(chunk))
+      if text:
+          if first_token_at is None:
+              first_token_at = time.perf_counter()
+          if current_id not in _printed:
+              _printed.add(current_id)
+              print('\nAssistant: ', end="", flush=True)
+          print(text, end="", flush=True)
+
+  if current_id in _printed:
+      print(think_filter.flush())
+  if first_token_at is not None:
+      print(f"\n(primeiro token em {first_token_at - start:.2f}s, total {time.perf_counter() - start:.2f}s)")
+
+def parse_args(argv=None) -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description="Chat com o assistente de IA.")
+  parser.add_argument("--session", "-s", help="Retoma uma sessão anterior pelo id.")
+  parser.add_argument("--list-sessions", action="store_true", help="Lista as sessões salvas e sai.")
+  return parser.parse_args(argv)
 
 def chat_loop():
+  global _turn_running
+  args = parse_args()
+  if args.list_sessions:
+      from ai_assistant.checkpoint import SqliteCheckpointSaver
+      from ai_assistant.env import env
+      for thread_id in SqliteCheckpointSaver(env.CHECKPOINT_DB_PATH).list_threads():
+          print(thread_id)
+      return
 
+  prefetch_graph()
   signal.signal(signal.SIGINT, signal_handler)
 
+  # Cada sessão tem sua própria thread de checkpoints
+  thread_id = args.session or uuid.uuid4().hex[:12]
+
   print("Bem-vindo ao Chat de IA. Digite 'sair' para encerrar.")
+  print(f"Sessão: {thread_id} (retome com --session {thread_id})")
   
   while True:
       try:
@@ -49,7 +144,11 @@ def chat_loop():
               print("Encerrando o chat...")
               break
   
-          stream_graph_updates(user_input)
+          _turn_running = True
+          try:
+              stream_graph_updates(user_input, thread_id)
+          finally:
+              _turn_running = False
       except Exception as e:
           print(f"Erro: {e}")
           break
@@ -0,0 +1,486 @@
+import array
+import json
+import mmap
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from ai_assistant.gitignore import IgnoreMatcher
+from ai_assistant.tree_index import RACY_WINDOW_NS
+from ai_assistant.walker import WalkBudget, walk_tree
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    root       BLOB PRIMARY KEY,
+    ignore     TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    id        INTEGER PRIMARY KEY,
+    path      BLOB NOT NULL UNIQUE,
+    mtime_ns  INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    -- Ids dos tokens do arquivo (array de int64), para remover as suas entradas de `postings`
+    token_ids BLOB NOT NULL DEFAULT x''
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    id    INTEGER PRIMARY KEY,
+    token BLOB NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token_id INTEGER NOT NULL,
+    file_id  INTEGER NOT NULL,
+    PRIMARY KEY (token_id, file_id)
+) WITHOUT ROWID;
+"""
+
+# Palavras: letras ASCII, dígitos, `_` e bytes não ASCII (acentos em UTF-8)
+_WORD = re.compile(rb"[A-Za-z0-9_\x80-\xff]{2,}")
+# Partes de um identificador: `getDirectoryTree`, `HTTPServer`, `get_directory_tree`
+_PART = re.compile(rb"[A-Z]+(?![a-z])|[A-Z]?[a-z\x80-\xff]+|[0-9]+")
+MAX_TOKEN_BYTES = 64
+# Bytes iniciais inspecionados para decidir se o arquivo é binário
+BINARY_SNIFF_BYTES = 8192
+# Parâmetros por consulta do SQLite (o limite antigo é 999)
+_SQL_CHUNK = 900
+
+
+def _parts(data) -> Set[bytes]:
+    return {part.lower() for part in set(_PART.findall(data)) if len(part) >= 2}
+
+
+def tokenize(data) -> Set[bytes]:
+    """Palavras inteiras e as suas partes (camelCase/snake_case), em minúsculas."""
+    # As partes nunca atravessam o limite de uma palavra: basta uma passada de cada regex no conteúdo todo
+    words = {word.lower() for word in set(_WORD.findall(data)) if len(word) <= MAX_TOKEN_BYTES}
+    return words | _parts(data)
+
+
+def _is_letter_or_digit(byte: int) -> bool:
+    return 48 <= byte <= 57 or 65 <= byte <= 90 or 97 <= byte <= 122 or byte >= 0x80
+
+
+def _at_part_start(data, pos: int) -> bool:
+    """
+    Se a ocorrência em `pos` começa uma palavra ou uma parte de identificador, com o mesmo corte de `_PART`:
+    depois de um separador (inclusive `_`), na troca entre letras e números, numa maiúscula depois de uma
+    minúscula (`getTree`) ou na última maiúscula de uma sigla (`HTTPServer`).
+    """
+    current = data[pos]
+    if pos == 0 or not _is_letter_or_digit(current):
+        return True
+    previous = data[pos - 1]
+    if not _is_letter_or_digit(previous):
+        return True
+    if (48 <= previous <= 57) != (48 <= current <= 57):
+        return True
+    if 65 <= current <= 90:
+        if not 65 <= previous <= 90:
+            return True
+        following = data[pos + 1] if pos + 1 < len(data) else 0
+        return 97 <= following <= 122 or following >= 0x80
+    return False
+
+
+def _query_parts(query: str) -> List[bytes]:
+    """Partes da consulta na ordem em que aparecem, com o mesmo corte usado na indexação."""
+    return [part.lower() for part in _PART.findall(query.encode("utf-8")) if len(part) >= 2]
+
+
+def _read_tokens(path: str) -> Optional[List[bytes]]:
+    """Tokens de um arquivo lido via mmap, ou `None` se for binário ou ilegível."""
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1:
+                    return None
+                return list(tokenize(data))
+    except (OSError, ValueError):
+        return None
+
+
+def _read_tokens_batch(paths: Sequence[str]) -> List[Optional[List[bytes]]]:
+    # Executado nos processos do pool: um lote por tarefa para diluir o custo de IPC
+    return [_read_tokens(path) for path in paths]
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _key(path: str) -> bytes:
+    return os.fsencode(os.path.abspath(path))
+
+
+def _subtree_range(root: bytes) -> Tuple[bytes, bytes]:
+    prefix = root.rstrip(b"/") + b"/"
+    return prefix, prefix[:-1] + b"0"
+
+
+class IndexedRoot(NamedTuple):
+    root: str
+    # Padrões ignorados na última indexação
+    ignore: List[str]
+    updated_at: float
+
+
+class SearchHit(NamedTuple):
+    path: str
+    line: int
+    text: str
+
+
+class SearchResult(NamedTuple):
+    hits: List[SearchHit]
+    # Arquivos com ocorrências entre os conferidos
+    files_matched: int
+    # Arquivos candidatos pelo índice e arquivos indexados na raiz
+    candidates: int
+    indexed_files: int
+    # Candidatos conferidos; a leitura para quando `max_results` linhas foram encontradas
+    scanned: int
+
+
+class UpdateStats(NamedTuple):
+    indexed: int
+    unchanged: int
+    removed: int
+    skipped: int
+    seconds: float
+
+
+class _PostingsWriter:
+    """Grava as listas de tokens em lotes, resolvendo cada token para o seu id uma única vez por atualização."""
+
+    def __init__(self, conn: sqlite3.Connection, batch_files: int = 256):
+        self.conn = conn
+        self.batch_files = batch_files
+        self.token_ids: Dict[bytes, int] = {}
+        self.pending: List[Tuple[int, List[bytes]]] = []
+
+    def add(self, file_id: int, tokens: List[bytes]) -> None:
+        if tokens:
+            self.pending.append((file_id, tokens))
+        if len(self.pending) >= self.batch_files:
+            self.flush()
+
+    def flush(self) -> None:
+        new_tokens = list({token for _, tokens in self.pending for token in tokens} - self.token_ids.keys())
+        self.conn.executemany("INSERT OR IGNORE INTO tokens (token) VALUES (?)", ((token,) for token in new_tokens))
+        for chunk in _chunks(new_tokens, _SQL_CHUNK):
+            self.token_ids.update(
+                (token, token_id) for token_id, token in self.conn.execute(
+                    f"SELECT id, token FROM tokens WHERE token IN ({','.join('?' * len(chunk))})", chunk
+                )
+            )
+        rows = []
+        for file_id, tokens in self.pending:
+            ids = array.array("q", sorted(self.token_ids[token] for token in tokens))
+            self.conn.execute("UPDATE files SET token_ids = ? WHERE id = ?", (ids.tobytes(), file_id))
+            rows.extend((token_id, file_id) for token_id in ids)
+        # Em ordem de chave primária, as inserções vão para as mesmas páginas da B-tree
+        rows.sort()
+        self.conn.executemany("INSERT OR IGNORE INTO postings (token_id, file_id) VALUES (?, ?)", rows)
+        self.pending = []
+
+
+def _delete_postings(conn: sqlite3.Connection, file_ids: List[int]) -> None:
+    rows = []
+    for chunk in _chunks(file_ids, _SQL_CHUNK):
+        for file_id, token_ids in conn.execute(
+            f"SELECT id, token_ids FROM files WHERE id IN ({','.join('?' * len(chunk))})", chunk
+        ):
+            rows.extend((token_id, file_id) for token_id in array.array("q", token_ids))
+    rows.sort()
+    conn.executemany("DELETE FROM postings WHERE token_id = ? AND file_id = ?", rows)
+
+
+class ContentIndex:
+    """
+    Índice invertido (SQLite) do conteúdo dos arquivos de texto, para buscas sem varrer a árvore.
+
+    Guarda, para cada palavra e para cada parte de identificador (`getDirectoryTree` gera
+    `getdirectorytree`, `get`, `directory` e `tree`), os arquivos em que aparece. Uma busca
+    usa essas listas para achar os arquivos candidatos e só abre (via mmap) esses arquivos para
+    confirmar a ocorrência e extrair as linhas; por isso encontra trechos que começam no início
+    de uma palavra ou parte de identificador, sem diferenciar maiúsculas de minúsculas.
+
+    A indexação percorre a árvore com os mesmos padrões de ignorados do `get_directory_tree`
+    e só relê os arquivos cujo mtime ou tamanho mudou. Com muitos arquivos para ler, a leitura
+    e a tokenização são distribuídas entre processos.
+    """
+
+    def __init__(self, db_path: str, max_file_bytes: int = 1_000_000, workers: Optional[int] = None,
+                 parallel_min_files: int = 256):
+        self.db_path = os.path.expanduser(db_path)
+        self.max_file_bytes = max_file_bytes
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_min_files = parallel_min_files
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        # Atualizações da mesma raiz não rodam em paralelo
+        self._update_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+        return conn
+
+    def indexed_root(self, path: str) -> Optional[IndexedRoot]:
+        """Raiz indexada que contém `path` (ele mesmo ou o ancestral indexado mais próximo), se houver."""
+        key = _key(path)
+        ancestors = [key]
+        while True:
+            parent = os.path.dirname(ancestors[-1])
+            if parent == ancestors[-1]:
+                break
+            ancestors.append(parent)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT root, ignore, updated_at FROM roots WHERE root IN ({','.join('?' * len(ancestors))})",
+                ancestors,
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return None
+        root, ignore, updated_at = max(rows, key=lambda row: len(row[0]))
+        return IndexedRoot(os.fsdecode(root), json.loads(ignore), updated_at)
+
+    def _read_all(self, paths: List[str]) -> Iterable[Tuple[str, Optional[List[bytes]]]]:
+        if len(paths) < self.parallel_min_files or self.workers <= 1:
+            return ((path, _read_tokens(path)) for path in paths)
+        # `forkserver`/`spawn`: o processo pai tem threads (walker, clientes HTTP) e não deve ser copiado com `fork`
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        batch = max(16, len(paths) // (self.workers * 8))
+        batches = list(_chunks(paths, batch))
+
+        def results():
+            done = 0
+            try:
+                with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method)) as executor:
+                    for chunk, tokens in zip(batches, executor.map(_read_tokens_batch, batches)):
+                        yield from zip(chunk, tokens)
+                        done += 1
+            except BrokenProcessPool:
+                # Ex.: script sem `if __name__ == "__main__"`; termina a leitura no próprio processo
+                for chunk in batches[done:]:
+                    yield from ((path, _read_tokens(path)) for path in chunk)
+
+        return results()
+
+    def update(self, root: str, ignore: Sequence[str] = (), budget: Optional[WalkBudget] = None) -> UpdateStats:
+        """
+        Indexa `root`, relendo só os arquivos novos ou alterados e removendo os que sumiram.
+
+        Args:
+            root (str): Diretório a indexar.
+            ignore (Sequence[str]): Padrões ignorados (no formato do `.gitignore`), além dos `.gitignore` da árvore.
+            budget (Optional[WalkBudget]): Limites da varredura de `root`.
+
+        Returns:
+            UpdateStats: Arquivos indexados, inalterados, removidos e ignorados (binários ou grandes demais).
+
+        Raises:
+            ValueError: Se a varredura não terminou dentro dos limites; nesse caso o índice não é alterado.
+        """
+        start = time.perf_counter()
+        root = os.path.abspath(root)
+        root_key = _key(root)
+        tree = walk_tree(root, IgnoreMatcher(ignore), stats=True, budget=budget)
+        # Com a árvore parcial, os arquivos não listados pareceriam removidos
+        if budget is not None and budget.partial:
+            raise ValueError(f"Indexação de {root} interrompida ({budget.summary()}); o índice não foi alterado.")
+        current: Dict[bytes, Tuple[int, int]] = {}
+        too_large = 0
+        stack = [(tree, root)]
+        while stack:
+            node, path = stack.pop()
+            for child in node["children"]:
+                child_path = os.path.join(path, child["name"])
+                if "children" in child:
+                    stack.append((child, child_path))
+                elif child["size"] <= self.max_file_bytes:
+                    current[os.fsencode(child_path)] = (child["mtime_ns"], child["size"])
+                else:
+                    too_large += 1
+
+        with self._update_lock:
+            conn = self._connect()
+            try:
+                start_key, end_key = _subtree_range(root_key)
+                known = {
+                    path: (file_id, mtime_ns, size)
+                    for file_id, path, mtime_ns, size in conn.execute(
+                        "SELECT id, path, mtime_ns, size FROM files WHERE path >= ? AND path < ?", (start_key, end_key)
+                    )
+                }
+                changed = [path for path, stat in current.items() if known.get(path, (None,))[1:] != stat]
+                removed = [known[path][0] for path in known.keys() - current.keys()]
+
+                indexed, skipped = 0, too_large
+                now_ns = time.time_ns()
+                writer = _PostingsWriter(conn)
+                with conn:
+                    # Entradas antigas dos arquivos removidos e dos que serão relidos
+                    _delete_postings(conn, removed + [known[path][0] for path in changed if path in known])
+                    for ids in _chunks(removed, _SQL_CHUNK):
+                        conn.execute(f"DELETE FROM files WHERE id IN ({','.join('?' * len(ids))})", ids)
+                    for path, tokens in self._read_all([os.fsdecode(path) for path in changed]):
+                        key = os.fsencode(path)
+                        mtime_ns, size = current[key]
+                        # Arquivos alterados há instantes podem mudar de novo sem mudar o mtime ("racy git")
+                        stored_mtime = 0 if now_ns - mtime_ns < RACY_WINDOW_NS else mtime_ns
+                        if tokens is None:
+                            skipped += 1
+                            tokens = []
+                        else:
+                            indexed += 1
+                        file_id = conn.execute(
+                            "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?) "
+                            "ON CONFLICT (path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size, "
+                            "token_ids = x'' RETURNING id",
+                            (key, stored_mtime, size),
+                        ).fetchone()[0]
+                        writer.add(file_id, tokens)
+                    writer.flush()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO roots (root, ignore, updated_at) VALUES (?, ?, ?)",
+                        (root_key, json.dumps(list(ignore)), time.time()),
+                    )
+            finally:
+                conn.close()
+        return UpdateStats(indexed, len(current) - len(changed), len(removed), skipped, time.perf_counter() - start)
+
+    @staticmethod
+    def _token_files(conn: sqlite3.Connection, token: bytes, prefix: bool) -> Set[int]:
+        if prefix:
+            # Todos os tokens em [token, token + 0xff): o byte 0xff não aparece em UTF-8
+            rows = conn.execute(
+                "SELECT DISTINCT p.file_id FROM tokens t JOIN postings p ON p.token_id = t.id "
+                "WHERE t.token >= ? AND t.token < ?",
+                (token, token + b"\xff"),
+            )
+        else:
+            rows = conn.execute(
+                "SELECT p.file_id FROM tokens t JOIN postings p ON p.token_id = t.id WHERE t.token = ?", (token,)
+            )
+        return {file_id for (file_id,) in rows}
+
+    def _candidates(self, conn: sqlite3.Connection, query: str, start_key: bytes, end_key: bytes) -> List[bytes]:
+        """
+        Arquivos da raiz que podem conter `query` a partir do início de uma palavra ou parte de identificador:
+        os que têm todas as partes da consulta (a última pode ser só o começo de uma parte) e os que têm uma
+        palavra começando pela primeira palavra da consulta (ex.: `httpserver` em `HTTPServer`).
+        """
+        parts = _query_parts(query)
+        words = _WORD.findall(query.encode("utf-8"))
+        if not parts and not words:
+            return [path for (path,) in conn.execute(
+                "SELECT path FROM files WHERE path >= ? AND path < ?", (start_key, end_key)
+            )]
+        file_ids: Set[int] = set()
+        for i, part in enumerate(parts):
+            ids = self._token_files(conn, part, prefix=i == len(parts) - 1)
+            file_ids = ids if i == 0 else file_ids & ids
+            if not file_ids:
+                break
+        if words:
+            file_ids |= self._token_files(conn, words[0].lower(), prefix=True)
+        paths = []
+        for chunk in _chunks(sorted(file_ids), _SQL_CHUNK):
+            paths.extend(
+                path for (path,) in conn.execute(
+                    f"SELECT path FROM files WHERE id IN ({','.join('?' * len(chunk))}) AND path >= ? AND path < ?",
+                    (*chunk, start_key, end_key),
+                )
+            )
+        return sorted(paths)
+
+    def search(self, path: str, query: str, max_results: int = 50, max_per_file: int = 5) -> SearchResult:
+        """
+        Busca `query` (texto literal, sem diferenciar maiúsculas de minúsculas) nos arquivos indexados sob `path`.
+
+        Só valem as ocorrências que começam no início de uma palavra ou de uma parte de identificador
+        (`tree` encontra `get_directory_tree` e `DirectoryTree`, mas não `street`), as mesmas que o índice
+        consegue achar. Os candidatos são lidos em ordem e a leitura para assim que `max_results` linhas
+        são encontradas, então `files_matched` conta só os arquivos conferidos.
+
+        Args:
+            path (str): Diretório (indexado, ou dentro de uma raiz indexada).
+            query (str): Texto procurado.
+            max_results (int): Máximo de linhas retornadas.
+            max_per_file (int): Máximo de linhas por arquivo.
+
+        Returns:
+            SearchResult: Linhas encontradas (caminhos relativos a `path`) e contagens.
+        """
+        base = os.path.abspath(path)
+        start_key, end_key = _subtree_range(_key(base))
+        conn = self._connect()
+        try:
+            candidates = self._candidates(conn, query, start_key, end_key)
+            (indexed_files,) = conn.execute(
+                "SELECT COUNT(*) FROM files WHERE path >= ? AND path < ?", (start_key, end_key)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        pattern = re.compile(re.escape(query.encode("utf-8")), re.IGNORECASE)
+        hits: List[SearchHit] = []
+        files_matched = scanned = 0
+        for candidate in candidates:
+            if len(hits) >= max_results:
+                break
+            scanned += 1
+            file_hits = self._scan(os.fsdecode(candidate), pattern, min(max_per_file, max_results - len(hits)))
+            if not file_hits:
+                continue
+            files_matched += 1
+            rel_path = os.path.relpath(os.fsdecode(candidate), base)
+            hits.extend(SearchHit(rel_path, line, text) for line, text in file_hits)
+        return SearchResult(hits, files_matched, len(candidates), indexed_files, scanned)
+
+    @staticmethod
+    def _scan(path: str, pattern: "re.Pattern[bytes]", limit: int) -> List[Tuple[int, str]]:
+        """Linhas de `path` com `pattern` no início de uma palavra ou parte, lidas via mmap (número da linha e texto)."""
+        try:
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    hits = []
+                    line, counted_until, last_line_end = 1, 0, -1
+                    for match in pattern.finditer(data):
+                        if match.start() < last_line_end:
+                            continue  # Outra ocorrência na mesma linha
+                        if not _at_part_start(data, match.start()):
+                            continue
+                        line += data[counted_until:match.start()].count(b"\n")
+                        counted_until = match.start()
+                        line_start = data.rfind(b"\n", 0, match.start()) + 1
+                        line_end = data.find(b"\n", match.start())
+                        last_line_end = line_end = len(data) if line_end == -1 else line_end
+                        text = data[line_start:min(line_end, line_start + 200)].decode("utf-8", "replace").strip()
+                        hits.append((line, text))
+                        if len(hits) >= limit:
+                            break
+                    return hits
+        except (OSError, ValueError):
+            return []
@@ -0,0 +1,118 @@
+import json
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import Runnable
+from langgraph.constants import TAG_NOSTREAM
+
+from ai_assistant.tokens import estimate_tokens
+
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+
+def message_tokens(message: AnyMessage) -> int:
+    """Estimativa de tokens de uma mensagem, incluindo os argumentos de tool calls."""
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    tokens = estimate_tokens(content) + 4
+    for tool_call in getattr(message, "tool_calls", None) or ():
+        tokens += estimate_tokens(tool_call["name"] + json.dumps(tool_call["args"], ensure_ascii=False))
+    return tokens
+
+
+class ContextPolicy:
+    """Define quanto do histórico cada assistente envia ao LLM.
+
+    Aplicada a cada chamada do `Agent`, sem alterar as mensagens guardadas no estado:
+
+    1. Resultados de tools antigos (fora dos `keep_tool_results` mais recentes) maiores que
+       `stub_chars` caracteres são trocados por um resumo de uma linha.
+    2. Só as mensagens mais recentes que cabem em `max_tokens` são enviadas. O corte é sempre
+       feito no início de um turno do usuário, então cada tool call continua acompanhada do
+       seu resultado. O turno atual é sempre enviado inteiro.
+    3. Se houver um `summarizer`, as mensagens que saíram da janela são condensadas num resumo
+       acumulado, guardado no estado e enviado no lugar delas.
+
+    Cada assistente tem a sua janela, então o resumo fica em `context_summaries[name]`: o que
+    saiu da janela de um não é necessariamente o que saiu da do outro.
+    """
+
+    def __init__(self, name: str, max_tokens: int, keep_tool_results: int = 2, stub_chars: int = 500,
+                 summarizer: Optional[Runnable] = None):
+        self.name = name
+        self.max_tokens = max_tokens
+        self.keep_tool_results = keep_tool_results
+        self.stub_chars = stub_chars
+        self.summarizer = summarizer
+
+    def _stub_old_tool_results(self, messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+        tool_indexes = [i for i, message in enumerate(messages) if isinstance(message, ToolMessage)]
+        old = set(tool_indexes[:-self.keep_tool_results] if self.keep_tool_results else tool_indexes)
+        result = []
+        for i, message in enumerate(messages):
+            if i in old and isinstance(message.content, str) and len(message.content) > self.stub_chars:
+                stub = f"[resultado de '{message.name or 'tool'}' omitido do histórico: {len(message.content)} caracteres]"
+                message = message.model_copy(update={"content": stub})
+            result.append(message)
+        return result
+
+    def _window_start(self, messages: Sequence[AnyMessage]) -> int:
+        """Índice da primeira mensagem enviada: sempre o início de um turno do usuário."""
+        turn_starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+        if not turn_starts:
+            return 0
+        start = turn_starts[-1]
+        used = sum(message_tokens(message) for message in messages[start:])
+        for turn_start in reversed(turn_starts[:-1]):
+            cost = sum(message_tokens(message) for message in messages[turn_start:start])
+            if used + cost > self.max_tokens:
+                break
+            used += cost
+            start = turn_start
+        return start
+
+    def prepare(self, state: dict) -> Tuple[List[AnyMessage], dict]:
+        """
+        Monta as mensagens a serem enviadas ao LLM.
+
+        Returns:
+            Tuple[List[AnyMessage], dict]: Mensagens para o prompt e atualizações do estado
+                                          (o resumo acumulado, quando houver).
+        """
+        messages = self._stub_old_tool_results(state["messages"])
+        start = self._window_start(messages)
+        window = messages[start:]
+        update = {}
+
+        saved = (state.get("context_summaries") or {}).get(self.name) or {}
+        summary = saved.get("summary")
+        if self.summarizer is not None and start > 0:
+            # Só condensa as mensagens que saíram da janela desde o último resumo
+            summarized_id = saved.get("summarized_id")
+            ids = [message.id for message in messages[:start]]
+            folded_from = ids.index(summarized_id) + 1 if summarized_id in ids else 0
+            dropped = messages[folded_from:start]
+            if dropped:
+                summary = self.summarize(summary, dropped)
+                update = {"context_summaries": {self.name: {"summary": summary, "summarized_id": ids[-1]}}}
+        if summary and start > 0:
+            window = [SystemMessage(content=f"Resumo da conversa anterior: {summary}")] + window
+        return window, update
+
+    def summarize(self, summary: Optional[str], messages: Sequence[AnyMessage]) -> str:
+        # Transcrição em texto: o modelo de resumo não precisa (nem tem) as tools vinculadas
+        transcript = "\n".join(
+            f"{message.type}: {message.content if isinstance(message.content, str) else json.dumps(message.content)}"
+            + "".join(f" [tool call {tc['name']}({json.dumps(tc['args'], ensure_ascii=False)})]"
+                      for tc in getattr(message, "tool_calls", None) or ())
+            for message in messages
+        )
+        # O resumo não deve aparecer no streaming de tokens do chat
+        result = self.summarizer.invoke(
+            {"summary": summary or "(vazio)", "transcript": transcript},
+            config={"tags": [TAG_NOSTREAM]},
+        )
+        text = result.content if hasattr(result, "content") else str(result)
+        return _THINK_BLOCK.sub("", text).strip()
@@ -1,8 +1,134 @@
+from functools import lru_cache
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+
+class LLMProviderConfig(BaseModel):
+    """Um provedor do pool de LLMs (`LLM_PROVIDERS`)."""
+
+    kind: Literal["groq", "ollama"]
+    model: str
+    # Nome usado nas estatísticas; por padrão "kind:model"
+    name: Optional[str] = None
+    # Groq: vazio usa AI_API_KEY
+    api_key: str = ""
+    # Vazio usa o endereço padrão do provedor (um servidor compatível, ou um stub local, também serve)
+    base_url: str = ""
+    # Vazio usa LLM_TIMEOUT_SECONDS
+    timeout_seconds: Optional[float] = None
+    temperature: float = 0
+
+
 class EnvConfig(BaseSettings):
     # Configurações podem ter valores padrão
     AI_API_KEY: str
+
+    # Provedores do LLM, em JSON, do preferido ao último recurso (vazio usa só o Groq com AI_API_KEY).
+    # Ex.: '[{"kind": "groq", "model": "deepseek-r1-distill-llama-70b"}, {"kind": "ollama", "model": "deepseek-r1:14b"}]'
+    LLM_PROVIDERS: List[LLMProviderConfig] = []
+    LLM_MODEL: str = "deepseek-r1-distill-llama-70b"
+    # Tempo máximo de cada requisição e total de tentativas por chamada (somando os provedores)
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_BACKOFF_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 8.0
+    # Peso da última medição na média móvel da latência e pausa de um provedor depois de uma falha
+    LLM_EWMA_ALPHA: float = 0.3
+    LLM_FAILURE_COOLDOWN_SECONDS: float = 30.0
+    # Conexões HTTP mantidas abertas (keep-alive) por provedor
+    LLM_HTTP_MAX_CONNECTIONS: int = 10
+    LLM_HTTP_KEEPALIVE_SECONDS: float = 60.0
+    # Limite de chamadas por segundo ao LLM, somando todas as conversas do processo (0 desativa);
+    # respostas vindas do cache não contam
+    LLM_RATE_LIMIT_PER_SECOND: float = 0.0
+    LLM_RATE_LIMIT_BURST: int = 1
+    # Novas tentativas quando o LLM devolve uma resposta vazia
+    LLM_EMPTY_RETRIES: int = 2
+
+    # Índice persistente das listagens de diretórios (vazio desativa)
+    TREE_INDEX_PATH: str = "~/.cache/ai_assistant/tree_index.sqlite"
+    TREE_INDEX_MAX_DIRECTORIES: int = 200_000
+
+    # Resultados das tools guardados fora do contexto do LLM (spill em disco desativado se vazio)
+    RESULT_STORE_MAX_NODES: int = 2_000_000
+    RESULT_STORE_MAX_ENTRIES: int = 64
+    RESULT_STORE_SPILL_DIR: str = ""
+    RESULT_STORE_SPILL_THRESHOLD: int = 100_000
+
+    # Snapshots (árvores de Merkle) comparados por `diff_directory_tree`; vazio desativa
+    SNAPSHOT_DB_PATH: str = "~/.cache/ai_assistant/snapshots.sqlite"
+    # Snapshots guardados por diretório raiz (os mais antigos são descartados)
+    SNAPSHOT_KEEP_LAST: int = 20
+
+    # Índice invertido do conteúdo dos arquivos usado por `search_directory_content`; vazio desativa
+    CONTENT_INDEX_PATH: str = "~/.cache/ai_assistant/content_index.sqlite"
+    # Arquivos maiores que isso não são indexados
+    CONTENT_INDEX_MAX_FILE_BYTES: int = 1_000_000
+    # Idade máxima do índice antes de uma busca conferir de novo os mtimes da árvore
+    CONTENT_INDEX_MAX_AGE_SECONDS: float = 60
+    # Processos de indexação (0 usa um por CPU); abaixo do mínimo de arquivos a leitura é feita no próprio processo
+    CONTENT_INDEX_WORKERS: int = 0
+    CONTENT_INDEX_PARALLEL_MIN_FILES: int = 256
+
+    # Limites de cada varredura de diretórios das tools (0 desativa): níveis abaixo da raiz,
+    # entradas listadas e tempo; ao atingir um deles a tool devolve a árvore parcial, marcada
+    WALK_MAX_DEPTH: int = 0
+    WALK_MAX_ENTRIES: int = 1_000_000
+    WALK_TIMEOUT_SECONDS: float = 60
+
+    # Orçamento aproximado de tokens do mapa de diretórios enviado ao LLM
+    TREE_VIEW_MAX_TOKENS: int = 1500
+
+    # Imprime a resposta do LLM token a token no chat
+    CHAT_STREAM_TOKENS: bool = True
+
+    # Checkpoints das conversas (um thread por sessão do chat)
+    CHECKPOINT_DB_PATH: str = "~/.cache/ai_assistant/checkpoints.sqlite"
+    CHECKPOINT_KEEP_LAST: int = 10
+
+    # Janela de histórico enviada ao LLM por assistente, em tokens aproximados
+    CONTEXT_PRIMARY_MAX_TOKENS: int = 6000
+    CONTEXT_DIRECTORY_MAX_TOKENS: int = 4000
+    # Condensa as mensagens que saem da janela num resumo (uma chamada extra ao LLM)
+    CONTEXT_SUMMARIZE: bool = False
+
+    # Cache de respostas do LLM (caminho vazio mantém só o cache em memória)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "~/.cache/ai_assistant/llm_cache.sqlite"
+    LLM_CACHE_TTL_SECONDS: int = 86_400
+    LLM_CACHE_MAX_MEMORY_ENTRIES: int = 256
+    # Liga/desliga o cache por assistente
+    LLM_CACHE_PRIMARY: bool = True
+    LLM_CACHE_DIRECTORY: bool = True
+
+    # Roteador local que envia pedidos óbvios de mapeamento direto ao assistente de diretórios
+    ROUTER_ENABLED: bool = True
+    ROUTER_THRESHOLD: float = 0.8
+    # Só pontua e mede a concordância com o LLM, sem desviar nenhum turno
+    ROUTER_SHADOW: bool = False
+
+    # Máximo de tool calls de uma mesma mensagem executadas em paralelo
+    TOOL_MAX_CONCURRENCY: int = 4
+
+    # Servidor HTTP/SSE (`ai_assistant.server`)
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8765
+    SERVER_MAX_CONCURRENCY: int = 4
+    SERVER_MAX_PENDING: int = 32
+    # Tamanho máximo do corpo de uma requisição; acima disso a resposta é 413
+    SERVER_MAX_BODY_BYTES: int = 1024 * 1024
+
+    # Modo batch (`ai_assistant.batch`): prompts de um JSONL executados em paralelo
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # Métricas de execução do grafo: tempo por nó, tokens, novas tentativas e tools (desligadas por padrão)
+    METRICS_ENABLED: bool = False
+    # Cada medição vira uma linha JSON neste arquivo (vazio não grava)
+    METRICS_JSONL_PATH: str = ""
+    # Arquivo no formato texto do Prometheus reescrito a cada turno (vazio não grava)
+    METRICS_PROMETHEUS_PATH: str = ""
     
     # Carrega de .env automaticamente
     model_config = SettingsConfigDict(
@@ -10,5 +136,14 @@ class EnvConfig(BaseSettings):
         env_file_encoding='utf-8'
     )
 
-# Instância global de configurações
-env = EnvConfig()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_env() -> EnvConfig:
+    """Instância global de configurações, criada (e validada) no primeiro uso."""
+    return EnvConfig()
+
+
+def __getattr__(name: str):
+    # Compatibilidade com `from ai_assistant.env import env`
+    if name == "env":
+        return get_env()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,205 @@
+import re
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+
+class _Rule(NamedTuple):
+    regex: str
+    negated: bool
+    dir_only: bool
+
+
+def _translate_class(pattern: str, start: int) -> Tuple[Optional[str], int]:
+    """
+    Traduz uma classe de caracteres (`[...]`) iniciada em `start`.
+
+    Returns:
+        Tuple[Optional[str], int]: Regex da classe e posição seguinte, ou `None` se a classe não fecha.
+    """
+    i = start + 1
+    negated = i < len(pattern) and pattern[i] in "!^"
+    if negated:
+        i += 1
+    chars = []
+    first = True
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "]" and not first:
+            body = "".join(chars)
+            # Classes nunca casam com o separador de diretórios
+            return (f"[^/{body}]" if negated else f"[{body}]"), i + 1
+        if c == "\\" and i + 1 < len(pattern):
+            i += 1
+            c = pattern[i]
+        chars.append(c if c == "-" else re.escape(c))
+        first = False
+        i += 1
+    return None, start + 1
+
+
+def _translate(pattern: str) -> str:
+    """
+    Converte um padrão no formato do `.gitignore` (já sem `!`, `/` inicial e `/` final) em regex.
+
+    `*` e `?` não atravessam `/`; `**/` casa com zero ou mais diretórios e `/**` com todo o conteúdo
+    de um diretório. Qualquer outro `**` se comporta como `*`.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            j = i
+            while j < n and pattern[j] == "*":
+                j += 1
+            at_segment_start = i == 0 or pattern[i - 1] == "/"
+            at_segment_end = j == n or pattern[j] == "/"
+            if j - i >= 2 and at_segment_start and at_segment_end:
+                if j == n:
+                    out.append(".*")
+                    i = j
+                else:
+                    out.append("(?:.*/)?")
+                    i = j + 1
+                continue
+            out.append("[^/]*")
+            i = j
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            translated, i = _translate_class(pattern, i)
+            out.append(translated if translated is not None else re.escape("["))
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def _parse_line(line: str) -> Optional[_Rule]:
+    """Interpreta uma linha do `.gitignore`, retornando `None` para linhas vazias ou comentários."""
+    line = line.rstrip("\r\n")
+    if not line or line.startswith("#"):
+        return None
+
+    # Espaços no final são ignorados, a menos que escapados com `\`
+    end = len(line)
+    while end > 0 and line[end - 1] == " " and not (end > 1 and line[end - 2] == "\\"):
+        end -= 1
+    line = line[:end]
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # Padrões com `/` no início ou no meio são relativos ao diretório do `.gitignore`
+    anchored = "/" in line
+    line = line.lstrip("/")
+    regex = _translate(line)
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return _Rule(regex, negated, dir_only)
+
+
+class IgnoreRules:
+    """
+    Padrões de um único `.gitignore` (ou lista equivalente), compilados uma única vez.
+
+    Todos os padrões são combinados em uma só regex por tipo de entrada, na ordem inversa
+    do arquivo, de modo que a primeira alternativa que casa é a última regra aplicável,
+    exatamente como o git resolve conflitos entre padrões.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        rules = [rule for rule in map(_parse_line, patterns) if rule is not None]
+        rules.reverse()
+        self._dir_regex, self._dir_negated = self._compile(rules)
+        self._file_regex, self._file_negated = self._compile([rule for rule in rules if not rule.dir_only])
+
+    @staticmethod
+    def _compile(rules: List[_Rule]) -> Tuple[Optional["re.Pattern[str]"], List[bool]]:
+        if not rules:
+            return None, []
+        regex = re.compile("|".join(f"({rule.regex})" for rule in rules), re.DOTALL)
+        # Índice 0 não é usado: `lastindex` começa em 1
+        return regex, [False] + [rule.negated for rule in rules]
+
+    def __bool__(self) -> bool:
+        return self._dir_regex is not None
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional["IgnoreRules"]:
+        """Lê um arquivo `.gitignore`, retornando `None` se ele não puder ser lido."""
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Avalia um caminho relativo ao diretório dos padrões.
+
+        Returns:
+            Optional[bool]: `True` se ignorado, `False` se reincluído por negação, `None` se nenhum padrão casa.
+        """
+        regex, negated = (self._dir_regex, self._dir_negated) if is_dir else (self._file_regex, self._file_negated)
+        if regex is None:
+            return None
+        m = regex.fullmatch(rel_path)
+        if m is None:
+            return None
+        return not negated[m.lastindex]
+
+
+class IgnoreMatcher:
+    """
+    Pilha de `IgnoreRules` válida para um diretório durante a varredura.
+
+    Cada `.gitignore` encontrado acrescenta uma camada relativa ao seu próprio diretório;
+    camadas mais profundas têm prioridade sobre as mais rasas.
+    """
+
+    __slots__ = ("_layers",)
+
+    def __init__(self, patterns: Iterable[str] = (), _layers: Tuple[Tuple[str, IgnoreRules], ...] = ()):
+        rules = IgnoreRules(patterns)
+        self._layers = _layers or ((("", rules),) if rules else ())
+
+    def __bool__(self) -> bool:
+        return bool(self._layers)
+
+    def with_gitignore(self, gitignore_path: str, rel_dir: str) -> "IgnoreMatcher":
+        """
+        Retorna um novo matcher com os padrões de `gitignore_path` empilhados.
+
+        Args:
+            gitignore_path (str): Caminho do arquivo `.gitignore`.
+            rel_dir (str): Diretório do arquivo, relativo à raiz da varredura (`""` para a raiz).
+        """
+        rules = IgnoreRules.from_file(gitignore_path)
+        if not rules:
+            return self
+        prefix = rel_dir + "/" if rel_dir else ""
+        return IgnoreMatcher(_layers=self._layers + ((prefix, rules),))
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Indica se um caminho (relativo à raiz da varredura) deve ser ignorado.
+
+        Args:
+            rel_path (str): Caminho relativo, separado por `/`.
+            is_dir (bool): Se a entrada é um diretório.
+        """
+        for prefix, rules in reversed(self._layers):
+            result = rules.match(rel_path[len(prefix):], is_dir)
+            if result is not None:
+                return result
+        return False
@@ -1,17 +1,28 @@
+import asyncio
+import threading
+import uuid
+from functools import lru_cache
 from typing import Annotated, Literal, Optional, Callable
 from typing_extensions import TypedDict
 
-from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
 from langchain_core.prompts import ChatPromptTemplate
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import START, END, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.graph.message import AnyMessage, add_messages
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from langgraph.prebuilt import tools_condition
 from pydantic import BaseModel, Field
 
-from ai_assistant.llm     import llm
-from ai_assistant.tools   import map_directory_structure_tree_tools
+from ai_assistant.checkpoint import SqliteCheckpointSaver
+from ai_assistant.context import ContextPolicy
+from ai_assistant.env     import EnvConfig, get_env
+from ai_assistant.llm     import build_llm, build_response_cache, get_llm, llm_with_cache
+from ai_assistant.metrics import MetricsCallbackHandler, MetricsRecorder, anotify_retry, build_metrics, notify_retry
+from ai_assistant.router  import IntentRouter
+from ai_assistant.tools   import build_directory_tools
 from ai_assistant.utils   import create_tool_node_with_fallback
 
 
@@ -24,6 +35,11 @@ def update_dialog_stack(left: list[str], right: Optional[str]) -> list[str]:
     return left + [right]
 
 
+def merge_context_summaries(left: Optional[dict], right: Optional[dict]) -> dict:
+    """Atualiza só os resumos dos assistentes presentes em `right`."""
+    return {**(left or {}), **(right or {})}
+
+
 class State(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
     dialog_state: Annotated[
@@ -34,26 +50,63 @@ class State(TypedDict):
         ],
         update_dialog_stack,
     ]
+    # Resumo acumulado das mensagens que saíram da janela de contexto de cada assistente:
+    # nome da política -> {"summary": ..., "summarized_id": última mensagem resumida}
+    context_summaries: Annotated[dict[str, dict], merge_context_summaries]
+    # Pontuação do roteador local no turno atual
+    fast_route_score: Optional[float]
 
 class Agent:
-    def __init__(self, runnable: Runnable):
+    def __init__(self, runnable: Runnable, context: Optional[ContextPolicy] = None, max_empty_retries: int = 2):
         self.runnable = runnable
+        self.context = context
+        # Depois disso a resposta vazia segue adiante em vez de prender o turno num laço
+        self.max_empty_retries = max_empty_retries
+
+    def _prepare(self, state: State) -> tuple[State, dict]:
+        if self.context is None:
+            return state, {}
+        # Envia ao LLM só a janela recente do histórico; o estado guarda tudo
+        messages, update = self.context.prepare(state)
+        return {**state, "messages": messages}, update
+
+    @staticmethod
+    def _is_empty(result) -> bool:
+        return not result.tool_calls and (
+            not result.content
+            or isinstance(result.content, list)
+            and not result.content[0].get("text")
+        )
 
     def __call__(self, state: State, config: RunnableConfig):
-        while True:
+        state, update = self._prepare(state)
+        for attempt in range(1, self.max_empty_retries + 2):
             result = self.runnable.invoke(state)
             # If the LLM happens to return an empty response, we will re-prompt it
             # for an actual response.
-            if not result.tool_calls and (
-                not result.content
-                or isinstance(result.content, list)
-                and not result.content[0].get("text")
-            ):
-                messages = state["messages"] + [("user", "Respond with a real output.")]
-                state = {**state, "messages": messages}
-            else:
+            if not self._is_empty(result) or attempt > self.max_empty_retries:
                 break
-        return {'messages': result}
+            notify_retry(config, attempt)
+            messages = state["messages"] + [("user", "Respond with a real output.")]
+            state = {**state, "messages": messages}
+        return {'messages': result, **update}
+
+    async def acall(self, state: State, config: RunnableConfig):
+        """Versão assíncrona do `__call__`, usada pelo `graph.astream`/`ainvoke`."""
+        # O resumo do histórico (quando ativo) faz uma chamada síncrona ao LLM
+        state, update = await asyncio.to_thread(self._prepare, state)
+        for attempt in range(1, self.max_empty_retries + 2):
+            result = await self.runnable.ainvoke(state)
+            if not self._is_empty(result) or attempt > self.max_empty_retries:
+                break
+            await anotify_retry(config, attempt)
+            messages = state["messages"] + [("user", "Respond with a real output.")]
+            state = {**state, "messages": messages}
+        return {'messages': result, **update}
+
+    def as_node(self) -> Runnable:
+        """Nó do grafo que usa `acall` quando o grafo roda de forma assíncrona."""
+        return RunnableLambda(self, afunc=self.acall)
     
 class CompleteOrEscalate(BaseModel):
     """Uma ferramenta para marcar a tarefa atual como concluída e/ou para escalar o controle da caixa de diálogo para o assistente principal,
@@ -79,25 +132,57 @@ class CompleteOrEscalate(BaseModel):
         }
 
 
+summary_prompt = ChatPromptTemplate.from_messages([
+    ('system',
+    "Você resume conversas entre um usuário e um assistente de IA. "
+    "Atualize o resumo existente com as novas mensagens, mantendo pedidos do usuário, decisões, caminhos, "
+    "handles de árvores e resultados importantes. Seja breve e responda apenas com o resumo em português-BR."),
+    ('user', "Resumo atual:\n{summary}\n\nNovas mensagens:\n{transcript}"),
+])
 
-directory_map_assistant_prompt = ChatPromptTemplate.from_messages([
-    ('system', 
+_DIRECTORY_MAP_SYSTEM_HEAD = (
     "Você é um assistente especializado em mapear diretórios, "
     "você é um assistente auxiliar que recebe tarefas do assistente principal. " 
     "Você possui a habilidade de criar um mapa da estrutura de um diretório. "
-    "Use a tools 'get_directory_tree' para mapear a estrutura, ela vai retornar um json. "
-    "Além disso voce também tem duas tools que podem salvar essa estrutura em arquivos .json ou .txt (estas so podem ser chamadas apos obter o mapa da estrutura). "
+    "Use a tools 'get_directory_tree' para mapear a estrutura, ela vai retornar um mapa resumido e um 'handle' que identifica a árvore. "
+    "Diretórios grandes aparecem recolhidos; use 'expand_directory' com o 'handle' para detalhar apenas os que forem relevantes. "
+    "Para mapear vários diretórios, chame 'get_directory_tree' para todos eles na mesma mensagem; as chamadas rodam em paralelo. "
+    "Além disso voce também tem duas tools que podem salvar essa estrutura em arquivos .json ou .txt (estas so podem ser chamadas apos obter o mapa da estrutura, "
+    "passando o 'handle' recebido; nunca copie a árvore como argumento). "
+)
+_DIRECTORY_MAP_SYSTEM_TAIL = (
+    "Para saber quais pastas são maiores, quanto espaço ocupam ou quantos arquivos têm, use 'get_directory_usage'. "
     "\n\n Lembre-se que a tarefa não esta concluída ate todas as tools relevantes tenham sido usadas. "
     "o usuário não precisa saber das suas habilidades, então não precisa mencioná-las"
     "\n\nSe o usuário precisar de ajuda e nenhuma de suas ferramentas for apropriada para isso, então"
-    ' "CompleteOrEscalate" a caixa de diálogo para o assistente de host. Não desperdice o tempo do usuário. Não invente ferramentas ou funções inválidas.',),
-    ('placeholder', '{messages}'),
-])
-directory_map_assistant_runnable = directory_map_assistant_prompt | llm.bind_tools(map_directory_structure_tree_tools + [CompleteOrEscalate])
-directory_map_assistant = Agent(directory_map_assistant_runnable)
+    ' "CompleteOrEscalate" a caixa de diálogo para o assistente de host. Não desperdice o tempo do usuário. Não invente ferramentas ou funções inválidas.'
+)
+# Instruções das tools que dependem de um banco configurado; só entram no prompt quando a tool é registrada
+DIRECTORY_TOOL_HINTS = {
+    "diff_directory_tree": (
+        "Para saber o que mudou num diretório, use 'snapshot_directory_tree' para registrar o estado atual e "
+        "'diff_directory_tree' com o id de um snapshot anterior para listar só os caminhos adicionados, removidos e modificados. "
+    ),
+    "search_directory_content": (
+        "Para encontrar em quais arquivos aparece um nome, função ou trecho de texto, use 'search_directory_content'. "
+    ),
+}
+
+
+def create_directory_map_assistant_prompt(tool_names) -> ChatPromptTemplate:
+    """Prompt do assistente de diretórios com as instruções só das tools em `tool_names`."""
+    hints = "".join(hint for name, hint in DIRECTORY_TOOL_HINTS.items() if name in tool_names)
+    return ChatPromptTemplate.from_messages([
+        ('system', _DIRECTORY_MAP_SYSTEM_HEAD + hints + _DIRECTORY_MAP_SYSTEM_TAIL),
+        ('placeholder', '{messages}'),
+    ])
+
+
+directory_map_assistant_prompt = create_directory_map_assistant_prompt(DIRECTORY_TOOL_HINTS)
 class ToDirectoryMapAssistant(BaseModel):
     """Transfere para um assistente especializado para lidar com o mapeamento de diretórios. 
-    Usado quando se deseja obter o mapa da estrutura de um diretório"""
+    Usado quando se deseja obter o mapa da estrutura de um diretório ou buscar um texto nos arquivos de um diretório,
+    ou saber o espaço ocupado pelas pastas"""
 
     request: str = Field(
         description="Qualquer instrução necessária para que o assistente especializado em mapear diretórios complete com exito sua tarefa"
@@ -114,31 +199,37 @@ primary_assistant_prompt = ChatPromptTemplate.from_messages([
     ('placeholder', '{messages}'),
 ])
 
-primary_assistant_runnable = primary_assistant_prompt | llm.bind_tools([ToDirectoryMapAssistant])
 
 def create_entry_node(assistant_name: str, new_dialog_state: str) -> Callable:
     def entry_node(state: State) -> dict:
-        tool_call_id = state["messages"][-1].tool_calls[0]["id"]
+        tool_calls = state["messages"][-1].tool_calls
+        # Toda tool call precisa de um ToolMessage; pedidos paralelos seguem juntos para o assistente
+        messages = [
+            ToolMessage(
+                content=f"O assistente agora é {assistant_name}. Reflita sobre a conversa acima entre o assistente do anfitrião e o usuário."
+                f" A intenção do usuário não foi satisfeita. Use as ferramentas fornecidas para ajudar o usuário. Lembre-se, você é {assistant_name}, "
+                "e as tarefas não serão concluídas até que você tenha invocado com êxito as ferramentas apropriadas."
+                "Se o usuário mudar de ideia ou precisar de ajuda para outras tarefas, chame a função CompleteOrEscalate para permitir que o assistente principal assuma o controle."
+                " Não mencione quem você é - apenas atue como um assistente auxiliar do assistente geral."
+                + (f" Há {len(tool_calls)} pedidos nesta transferência; atenda todos eles." if len(tool_calls) > 1 else ""),
+                tool_call_id=tool_calls[0]["id"],
+            )
+        ]
+        messages.extend(
+            ToolMessage(
+                content=f"Pedido encaminhado ao {assistant_name} junto com o primeiro: {tc['args'].get('request', '')}",
+                tool_call_id=tc["id"],
+            )
+            for tc in tool_calls[1:]
+        )
         return {
-            "messages": [
-                ToolMessage(
-                    content=f"O assistente agora é {assistant_name}. Reflita sobre a conversa acima entre o assistente do anfitrião e o usuário."
-                    f" A intenção do usuário não foi satisfeita. Use as ferramentas fornecidas para ajudar o usuário. Lembre-se, você é {assistant_name}, "
-                    "e as tarefas não serão concluídas até que você tenha invocado com êxito as ferramentas apropriadas."
-                    "Se o usuário mudar de ideia ou precisar de ajuda para outras tarefas, chame a função CompleteOrEscalate para permitir que o assistente principal assuma o controle."
-                    " Não mencione quem você é - apenas atue como um assistente auxiliar do assistente geral.",
-                    tool_call_id=tool_call_id,
-                )
-            ],
+            "messages": messages,
             "dialog_state": new_dialog_state,
         }
 
     return entry_node
 
 
-
-graph_builder = StateGraph(State)
-
 def pop_dialog_state(state: State) -> dict:
     """Pop the dialog stack and return to the main assistant.
 
@@ -146,38 +237,24 @@ def pop_dialog_state(state: State) -> dict:
     to specific sub-graphs.
     """
     messages = []
-    if state["messages"][-1].tool_calls:
-        # Note: Doesn't currently handle the edge case where the llm performs parallel tool calls
-        messages.append(
-            ToolMessage(
-                content="Retomando o diálogo com o assistente geral. Por favor, reflita sobre a conversa passada e ajude o usuário conforme necessário.",
-                tool_call_id=state["messages"][-1].tool_calls[0]["id"],
-            )
-        )
+    # Cada tool call da mensagem recebe sua resposta; as que vieram junto com o
+    # CompleteOrEscalate não são executadas
+    for tool_call in state["messages"][-1].tool_calls:
+        if tool_call["name"] == CompleteOrEscalate.__name__:
+            content = "Retomando o diálogo com o assistente geral. Por favor, reflita sobre a conversa passada e ajude o usuário conforme necessário."
+        else:
+            content = f"Não executada: '{tool_call['name']}' foi chamada junto com CompleteOrEscalate e o diálogo voltou ao assistente geral."
+        messages.append(ToolMessage(content=content, tool_call_id=tool_call["id"]))
     return {
         "dialog_state": "pop",
         "messages": messages,
     }
 
 
-graph_builder.add_node("leave_skill", pop_dialog_state)
-graph_builder.add_edge("leave_skill", "primary_assistant")
-
-
-
-graph_builder.add_node(
-    "enter_directory_map_assistant",
-    create_entry_node("Directory Structure Map Assistant", "directory_map_assistant"),
-)
-graph_builder.add_node("directory_map_assistant", directory_map_assistant)
-graph_builder.add_edge("enter_directory_map_assistant", "directory_map_assistant")
-graph_builder.add_node('directory_map_assistant_tools', create_tool_node_with_fallback(map_directory_structure_tree_tools))
-
 def route_directory_map_assistant(
     state: State,
 ):
     route = tools_condition(state)
-    print(route)
     if route == END:
         return END
     tool_calls = state["messages"][-1].tool_calls
@@ -186,53 +263,218 @@ def route_directory_map_assistant(
         return "leave_skill"
     return "directory_map_assistant_tools"
 
-graph_builder.add_conditional_edges(
-    "directory_map_assistant",
-    route_directory_map_assistant,
-    ["directory_map_assistant_tools", "leave_skill", END],
-)
-graph_builder.add_edge('directory_map_assistant_tools', 'directory_map_assistant')
 
-primary_assistant = Agent(primary_assistant_runnable)
+def create_fast_router(router: IntentRouter) -> Callable:
+    def fast_router(state: State) -> dict:
+        """Envia pedidos claros de mapeamento direto ao assistente de diretórios, sem chamar o LLM.
 
-graph_builder.add_node("primary_assistant", primary_assistant)
+        Simula a tool call `ToDirectoryMapAssistant` que o `primary_assistant` faria, com o
+        texto do usuário como pedido. Nos demais casos só guarda a pontuação do turno.
+        """
+        message = state["messages"][-1]
+        text = message.content if isinstance(message.content, str) else ""
+        fast, score = router.route(text)
+        if not fast:
+            return {"fast_route_score": score}
+        return {
+            "messages": [
+                AIMessage(
+                    content="",
+                    tool_calls=[{
+                        "name": ToDirectoryMapAssistant.__name__,
+                        "args": {"request": text},
+                        "id": f"call_{uuid.uuid4().hex[:24]}",
+                    }],
+                    response_metadata={"fast_router_score": score},
+                )
+            ],
+            "fast_route_score": score,
+        }
 
-def route_primary_assistant(
-    state: State,
-):
-    route = tools_condition(state)
-    if route == END:
-        return END
-    tool_calls = state["messages"][-1].tool_calls
-    if tool_calls:
-        if tool_calls[0]["name"] == ToDirectoryMapAssistant.__name__:
+    return fast_router
+
+
+def create_route_primary_assistant(router: Optional[IntentRouter]) -> Callable:
+    def record_llm_route(state: State, delegated: bool) -> None:
+        """Compara a primeira decisão do LLM no turno com a que o roteador local teria tomado."""
+        score = state.get("fast_route_score")
+        messages = state["messages"]
+        if router is None or score is None or len(messages) < 2 or not isinstance(messages[-2], HumanMessage):
+            return
+        router.metrics.record_llm_route(score >= router.threshold, delegated)
+
+    def route_primary_assistant(
+        state: State,
+    ):
+        route = tools_condition(state)
+        record_llm_route(state, route != END)
+        if route == END:
+            return END
+        tool_calls = state["messages"][-1].tool_calls
+        if any(tc["name"] == ToDirectoryMapAssistant.__name__ for tc in tool_calls):
             return "enter_directory_map_assistant"
-    raise ValueError("Invalid route")
+        raise ValueError("Invalid route")
+
+    return route_primary_assistant
+
+
+def route_fast_router(state: State) -> Literal["enter_directory_map_assistant", "primary_assistant"]:
+    if isinstance(state["messages"][-1], AIMessage):
+        return "enter_directory_map_assistant"
+    return "primary_assistant"
+
+
+def create_route_to_workflow(use_fast_router: bool) -> Callable:
+    def route_to_workflow(
+        state: State,
+    ) -> Literal[
+        "fast_router",
+        "primary_assistant",
+        "directory_map_assistant",
+    ]:
+        """If we are in a delegated state, route directly to the appropriate assistant."""
+        dialog_state = state.get("dialog_state")
+        if not dialog_state:
+            return "fast_router" if use_fast_router else "primary_assistant"
+        return dialog_state[-1]
+
+    return route_to_workflow
+
+
+def build_graph(
+    config: Optional[EnvConfig] = None,
+    *,
+    llm: Optional[BaseChatModel] = None,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    router: Optional[IntentRouter] = None,
+    metrics: Optional[MetricsRecorder] = None,
+) -> CompiledStateGraph:
+    """
+    Monta e compila o grafo dos assistentes.
+
+    Cada componente pode ser injetado (um LLM falso nos testes e benchmarks, outro
+    checkpointer no servidor); os que faltarem são criados a partir de `config`.
+
+    Args:
+        config (Optional[EnvConfig]): Configurações; por padrão as do ambiente (`get_env()`).
+        llm (Optional[BaseChatModel]): Modelo usado pelos assistentes.
+        checkpointer (Optional[BaseCheckpointSaver]): Onde salvar o estado das conversas.
+        router (Optional[IntentRouter]): Roteador local usado quando `ROUTER_ENABLED`.
+        metrics (Optional[MetricsRecorder]): Onde registrar as métricas quando `METRICS_ENABLED`.
+
+    Returns:
+        CompiledStateGraph: Grafo compilado.
+    """
+    config = config or get_env()
+    if llm is None:
+        llm = build_llm(config, build_response_cache(config))
+    if checkpointer is None:
+        checkpointer = SqliteCheckpointSaver(config.CHECKPOINT_DB_PATH, keep_last=config.CHECKPOINT_KEEP_LAST)
+    if router is None and config.ROUTER_ENABLED:
+        router = IntentRouter(config.ROUTER_THRESHOLD, shadow=config.ROUTER_SHADOW)
+    if metrics is None:
+        metrics = build_metrics(config)
+    if metrics is not None and router is not None:
+        metrics.attach_router(router.metrics)
+
+    summarizer = summary_prompt | llm if config.CONTEXT_SUMMARIZE else None
+    directory_tools = build_directory_tools(config)
+
+    directory_map_assistant_runnable = create_directory_map_assistant_prompt(
+        [directory_tool.name for directory_tool in directory_tools]
+    ) | llm_with_cache(llm, config.LLM_CACHE_DIRECTORY).bind_tools(directory_tools + [CompleteOrEscalate])
+    directory_map_assistant = Agent(
+        directory_map_assistant_runnable,
+        ContextPolicy("directory_map_assistant", config.CONTEXT_DIRECTORY_MAX_TOKENS, summarizer=summarizer),
+        max_empty_retries=config.LLM_EMPTY_RETRIES,
+    )
+    primary_assistant_runnable = primary_assistant_prompt | llm_with_cache(llm, config.LLM_CACHE_PRIMARY).bind_tools([ToDirectoryMapAssistant])
+    primary_assistant = Agent(
+        primary_assistant_runnable,
+        ContextPolicy("primary_assistant", config.CONTEXT_PRIMARY_MAX_TOKENS, summarizer=summarizer),
+        max_empty_retries=config.LLM_EMPTY_RETRIES,
+    )
+
+    graph_builder = StateGraph(State)
 
-graph_builder.add_conditional_edges(
-    "primary_assistant",
-    route_primary_assistant,
-    [
+    graph_builder.add_node("leave_skill", pop_dialog_state)
+    graph_builder.add_edge("leave_skill", "primary_assistant")
+
+    graph_builder.add_node(
         "enter_directory_map_assistant",
-        END,
-    ],
-)
+        create_entry_node("Directory Structure Map Assistant", "directory_map_assistant"),
+    )
+    graph_builder.add_node("directory_map_assistant", directory_map_assistant.as_node())
+    graph_builder.add_edge("enter_directory_map_assistant", "directory_map_assistant")
+    graph_builder.add_node('directory_map_assistant_tools', create_tool_node_with_fallback(directory_tools, max_concurrency=config.TOOL_MAX_CONCURRENCY))
+    graph_builder.add_conditional_edges(
+        "directory_map_assistant",
+        route_directory_map_assistant,
+        ["directory_map_assistant_tools", "leave_skill", END],
+    )
+    graph_builder.add_edge('directory_map_assistant_tools', 'directory_map_assistant')
+
+    graph_builder.add_node("primary_assistant", primary_assistant.as_node())
+    graph_builder.add_conditional_edges(
+        "primary_assistant",
+        create_route_primary_assistant(router),
+        [
+            "enter_directory_map_assistant",
+            END,
+        ],
+    )
 
-def route_to_workflow(
-    state: State,
-) -> Literal[
-    "primary_assistant",
-    "directory_map_assistant",
-]:
-    """If we are in a delegated state, route directly to the appropriate assistant."""
-    dialog_state = state.get("dialog_state")
-    if not dialog_state:
-        return "primary_assistant"
-    return dialog_state[-1]
+    workflows = ["primary_assistant", "directory_map_assistant"]
+    if router is not None:
+        graph_builder.add_node("fast_router", create_fast_router(router))
+        graph_builder.add_conditional_edges("fast_router", route_fast_router)
+        workflows.append("fast_router")
+    graph_builder.add_conditional_edges(START, create_route_to_workflow(router is not None), workflows)
+
+    graph = graph_builder.compile(checkpointer=checkpointer)
+    if metrics is not None:
+        # Sem métricas o grafo não recebe callback nenhum, então não há custo
+        graph = graph.with_config(callbacks=[MetricsCallbackHandler(metrics)])
+    return graph
+
+
+_default_lock = threading.Lock()
+_default_graph: Optional[CompiledStateGraph] = None
+
+
+def get_graph() -> CompiledStateGraph:
+    """Grafo padrão (configurações do ambiente), montado na primeira chamada e reaproveitado."""
+    global _default_graph
+    with _default_lock:
+        if _default_graph is None:
+            _default_graph = build_graph(llm=get_llm(), checkpointer=get_memory(), router=get_router(), metrics=get_metrics())
+        return _default_graph
+
+
+@lru_cache(maxsize=None)
+def get_memory() -> SqliteCheckpointSaver:
+    env = get_env()
+    return SqliteCheckpointSaver(env.CHECKPOINT_DB_PATH, keep_last=env.CHECKPOINT_KEEP_LAST)
+
+
+@lru_cache(maxsize=None)
+def get_router() -> Optional[IntentRouter]:
+    env = get_env()
+    if not env.ROUTER_ENABLED:
+        return None
+    return IntentRouter(env.ROUTER_THRESHOLD, shadow=env.ROUTER_SHADOW)
+
+
+@lru_cache(maxsize=None)
+def get_metrics() -> Optional[MetricsRecorder]:
+    return build_metrics(get_env())
 
-graph_builder.add_conditional_edges(START, route_to_workflow)
 
+_LAZY_ATTRIBUTES = {"graph": get_graph, "memory": get_memory, "router": get_router, "metrics": get_metrics, "llm": get_llm}
 
-memory = MemorySaver()
 
-graph = graph_builder.compile(checkpointer=memory)
\ No newline at end of file
+def __getattr__(name: str):
+    # Compatibilidade com `from ai_assistant.graph import graph, memory`
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
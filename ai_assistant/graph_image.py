@@ -1,11 +1,9 @@
 # from graphviz import Source
-from langchain_core.runnables.graph_png import PngDrawer
-
-from ai_assistant.graph import graph
+from ai_assistant.graph import get_graph as get_compiled_graph
 
 
 
 # Criando um objeto Graphviz e exportando como PNG
 def get_graph():
-  graph.get_graph().draw_mermaid_png(output_file_path="ai_assistant_graph.png")
+  get_compiled_graph().get_graph().draw_mermaid_png(output_file_path="ai_assistant_graph.png")
 
@@ -1,7 +1,51 @@
-from langchain_groq import ChatGroq
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
-from ai_assistant.env import env
+from ai_assistant.env import EnvConfig, get_env
+from ai_assistant.llm_cache import ResponseCache
 
-llm = ChatGroq(
-    api_key=env.AI_API_KEY, model='deepseek-r1-distill-llama-70b', temperature=0
-)
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+def build_response_cache(config: EnvConfig) -> Optional[ResponseCache]:
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    return ResponseCache(
+        config.LLM_CACHE_PATH or None,
+        ttl_seconds=config.LLM_CACHE_TTL_SECONDS,
+        max_memory_entries=config.LLM_CACHE_MAX_MEMORY_ENTRIES,
+    )
+
+
+def build_llm(config: EnvConfig, cache: Optional[ResponseCache] = None) -> "BaseChatModel":
+    # Importado aqui: os clientes dos provedores só carregam quando o modelo é criado
+    from ai_assistant.llm_pool import build_llm_pool
+
+    return build_llm_pool(config, cache)
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> Optional[ResponseCache]:
+    return build_response_cache(get_env())
+
+
+@lru_cache(maxsize=None)
+def get_llm() -> "BaseChatModel":
+    return build_llm(get_env(), get_response_cache())
+
+
+def llm_with_cache(llm: "BaseChatModel", enabled: bool) -> "BaseChatModel":
+    """Retorna o `llm`, ou uma cópia dele que sempre chama o modelo quando `enabled` é falso."""
+    if enabled or llm.cache is False:
+        return llm
+    return llm.model_copy(update={"cache": False})
+
+
+def __getattr__(name: str):
+    # Compatibilidade com `from ai_assistant.llm import llm, response_cache`
+    if name == "llm":
+        return get_llm()
+    if name == "response_cache":
+        return get_response_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
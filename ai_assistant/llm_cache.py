@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    value      TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+# Campos que mudam a cada execução sem alterar o que o modelo recebe
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+def _canonical_prompt(prompt: str) -> str:
+    """
+    Normaliza o prompt serializado pelo LangChain para uso na chave do cache.
+
+    Remove os ids e metadados das mensagens e renumera os ids das tool calls pela ordem
+    em que aparecem, então a mesma conversa gera a mesma chave em qualquer sessão.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+    tool_call_ids: Dict[str, str] = {}
+
+    def renumber(tool_call_id: Any) -> str:
+        return tool_call_ids.setdefault(str(tool_call_id), f"call_{len(tool_call_ids)}")
+
+    for message in messages:
+        kwargs = message.get("kwargs") if isinstance(message, dict) else None
+        if not isinstance(kwargs, dict):
+            continue
+        for field in _VOLATILE_FIELDS:
+            kwargs.pop(field, None)
+        for tool_call in kwargs.get("tool_calls", ()):
+            tool_call["id"] = renumber(tool_call.get("id"))
+        for tool_call in kwargs.get("additional_kwargs", {}).get("tool_calls", ()):
+            tool_call["id"] = renumber(tool_call.get("id"))
+        if "tool_call_id" in kwargs:
+            kwargs["tool_call_id"] = renumber(kwargs["tool_call_id"])
+    return json.dumps(messages, sort_keys=True, ensure_ascii=False)
+
+
+def _fresh_ids(generations: RETURN_VAL_TYPE) -> RETURN_VAL_TYPE:
+    """
+    Troca os ids da mensagem e das tool calls de uma resposta vinda do cache.
+
+    A mesma resposta pode ser reutilizada várias vezes numa conversa; com os ids
+    originais o `add_messages` substituiria a mensagem anterior e os resultados das
+    tools ficariam associados à tool call errada.
+    """
+    for generation in generations:
+        message = getattr(generation, "message", None)
+        if not isinstance(message, AIMessage):
+            continue
+        message.id = None
+        renamed: Dict[str, str] = {}
+        for tool_call in message.tool_calls:
+            renamed[tool_call["id"]] = tool_call["id"] = f"call_{uuid.uuid4().hex[:24]}"
+        for raw in message.additional_kwargs.get("tool_calls", ()):
+            raw["id"] = renamed.get(raw.get("id"), raw.get("id"))
+    return generations
+
+
+class ResponseCache(BaseCache):
+    """
+    Cache de respostas do LLM por correspondência exata, usado via `ChatModel(cache=...)`.
+
+    A chave é um hash das mensagens renderizadas pelo prompt (sem ids, ver `_canonical_prompt`)
+    e do `llm_string` do LangChain, que já inclui o modelo, os parâmetros (como `temperature`) e os schemas das tools vinculadas.
+    Um LRU em memória fica na frente de um SQLite em disco (opcional), e toda entrada expira
+    após `ttl_seconds`. As respostas são guardadas serializadas, então cada acerto devolve
+    objetos novos.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: float = 86_400, max_memory_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            db_path = os.path.expanduser(db_path)
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        canonical = _canonical_prompt(prompt)
+        return hashlib.sha256(f"{llm_string}\x00{canonical}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires_at, value FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, *entry)
+                    self.disk_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _fresh_ids(loads(entry[1]))
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        expires_at = time.time() + self.ttl_seconds
+        value = dumps(list(return_val))
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._conn is not None:
+                self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, value, expires_at))
+                # Aproveita a escrita para descartar entradas vencidas
+                self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de acertos (total e vindos do disco) e de faltas."""
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
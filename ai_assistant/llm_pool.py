@@ -0,0 +1,380 @@
+import asyncio
+import random
+import threading
+import time
+from functools import lru_cache
+from itertools import chain
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+from ai_assistant.env import EnvConfig, LLMProviderConfig
+
+# Os provedores são chamados sem callbacks: quem aparece para o grafo (streaming, métricas,
+# cache) é só o pool, uma vez por chamada
+_NO_CALLBACKS = {"callbacks": []}
+
+# Status HTTP que indicam um problema do provedor (vale tentar de novo ou outro provedor)
+_RETRYABLE_STATUS = {408, 409, 425, 429}
+
+_JSON_TYPES = (str, int, float, bool, type(None), list, dict)
+
+
+class LLMPoolError(RuntimeError):
+    """Todas as tentativas do pool falharam."""
+
+    def __init__(self, errors: List[Tuple[str, BaseException]]):
+        details = "; ".join(f"{name}: {error!r}" for name, error in errors)
+        super().__init__(f"Nenhum provedor do LLM respondeu ({len(errors)} tentativas): {details}")
+        self.errors = errors
+
+
+@lru_cache(maxsize=None)
+def _transport_errors() -> Tuple[type, ...]:
+    """Exceções de rede e de timeout dos clientes (o do Ollama converte as de conexão em `ConnectionError`)."""
+    import httpx
+
+    errors = [httpx.TransportError, ConnectionError, TimeoutError]
+    try:
+        import groq
+
+        errors.append(groq.APIConnectionError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Falhas de rede, timeouts, limites de taxa e erros 5xx; qualquer outro erro sobe na hora."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and status > 0:
+        return status >= 500 or status in _RETRYABLE_STATUS
+    return isinstance(error, _transport_errors())
+
+
+class Backend:
+    """Um provedor do pool, com a média móvel (EWMA) da sua latência e o seu estado de saúde.
+
+    Depois de uma falha o provedor fica em pausa por `cooldown_seconds`, dobrando a cada falha
+    seguida (até 8x); enquanto isso só é usado se nenhum outro estiver disponível.
+    """
+
+    def __init__(self, name: str, model: BaseChatModel, alpha: float = 0.3, cooldown_seconds: float = 30.0,
+                 params: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.model = model
+        # O que define as respostas do provedor (entra na chave do cache do pool)
+        self.params = params if params is not None else dict(model._identifying_params)
+        self.alpha = alpha
+        self.cooldown_seconds = cooldown_seconds
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.available_at = 0.0
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.available_at
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.failures = 0
+            self.available_at = 0.0
+            self.latency = seconds if self.latency is None else self.alpha * seconds + (1 - self.alpha) * self.latency
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += 1
+            self.failures += 1
+            self.available_at = time.monotonic() + self.cooldown_seconds * min(2 ** (self.failures - 1), 8)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "latency_s": self.latency,
+            "healthy": self.healthy(now),
+            "cooldown_s": max(0.0, self.available_at - now),
+            "calls": self.calls,
+            "errors": self.errors,
+        }
+
+
+class LLMPool(BaseChatModel):
+    """Modelo de chat que distribui as chamadas entre vários provedores.
+
+    Cada chamada vai para o provedor saudável com a menor latência média (os ainda não medidos
+    vêm primeiro, na ordem configurada). Se ele falhar (rede, timeout, limite de taxa, erro do
+    servidor), o próximo da lista é tentado na hora; ao voltar a um provedor que já falhou na
+    mesma chamada, espera um backoff exponencial com jitter. São no máximo `max_attempts`
+    tentativas, somando todos os provedores. Em streaming, só há troca de provedor antes do
+    primeiro pedaço da resposta.
+
+    As tools são vinculadas no formato da OpenAI, que Groq e Ollama aceitam, e repassadas ao
+    provedor escolhido em cada chamada. As cópias criadas por `bind_tools` compartilham os
+    `Backend`, e com eles as estatísticas.
+    """
+
+    backends: List[Any] = Field(exclude=True)
+    max_attempts: int = 3
+    backoff_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-pool"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # Entra na chave do cache do LLM: só o que não muda entre chamadas, mas trocar o modelo,
+        # a temperatura ou o endereço de um provedor precisa invalidar as respostas guardadas
+        return {"backends": [{"name": backend.name, **backend.params} for backend in self.backends]}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [backend.snapshot() for backend in self.backends]
+
+    def _plan(self) -> Iterator[Tuple[Backend, float]]:
+        """Provedores de cada tentativa desta chamada, com a espera antes de cada um."""
+        now = time.monotonic()
+        ordered = sorted(
+            self.backends,
+            key=lambda b: (not b.healthy(now), b.available_at if not b.healthy(now) else 0.0, b.latency or 0.0),
+        )
+        for attempt in range(self.max_attempts):
+            retry = attempt - len(ordered)
+            delay = 0.0
+            if retry >= 0:
+                delay = min(self.backoff_seconds * 2 ** retry, self.backoff_max_seconds) * random.uniform(0.5, 1.0)
+            yield ordered[attempt % len(ordered)], delay
+
+    @staticmethod
+    def _clean(message: BaseMessage, backend: Optional[Backend] = None) -> BaseMessage:
+        """Deixa nos metadados só valores serializáveis em JSON (o Ollama inclui o objeto `Message`,
+        que quebraria o cache) e marca o provedor que respondeu.
+
+        Em streaming só o primeiro pedaço é marcado: os textos dos metadados são concatenados na junção.
+        """
+        metadata = {key: value for key, value in message.response_metadata.items() if isinstance(value, _JSON_TYPES)}
+        if backend is not None:
+            metadata["llm_pool_backend"] = backend.name
+        message.response_metadata = metadata
+        return message
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        errors = []
+        for backend, delay in self._plan():
+            if delay:
+                time.sleep(delay)
+            start = time.perf_counter()
+            try:
+                message = backend.model.invoke(messages, _NO_CALLBACKS, stop=stop, **kwargs)
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                backend.record_failure()
+                errors.append((backend.name, e))
+                continue
+            backend.record_success(time.perf_counter() - start)
+            return ChatResult(generations=[ChatGeneration(message=self._clean(message, backend))])
+        raise LLMPoolError(errors) from errors[-1][1]
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        errors = []
+        for backend, delay in self._plan():
+            if delay:
+                await asyncio.sleep(delay)
+            start = time.perf_counter()
+            try:
+                message = await backend.model.ainvoke(messages, _NO_CALLBACKS, stop=stop, **kwargs)
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                backend.record_failure()
+                errors.append((backend.name, e))
+                continue
+            backend.record_success(time.perf_counter() - start)
+            return ChatResult(generations=[ChatGeneration(message=self._clean(message, backend))])
+        raise LLMPoolError(errors) from errors[-1][1]
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        errors = []
+        for backend, delay in self._plan():
+            if delay:
+                time.sleep(delay)
+            start = time.perf_counter()
+            stream = backend.model.stream(messages, _NO_CALLBACKS, stop=stop, **kwargs)
+            try:
+                first = next(stream, None)
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                backend.record_failure()
+                errors.append((backend.name, e))
+                continue
+            if first is not None:
+                first = self._clean(first, backend)
+            try:
+                for chunk in chain([first] if first is not None else [], stream):
+                    generation = ChatGenerationChunk(message=chunk if chunk is first else self._clean(chunk))
+                    if run_manager:
+                        run_manager.on_llm_new_token(str(chunk.content), chunk=generation)
+                    yield generation
+            except Exception as e:
+                # Parte da resposta já foi entregue: não dá para trocar de provedor
+                if _is_retryable(e):
+                    backend.record_failure()
+                raise
+            backend.record_success(time.perf_counter() - start)
+            return
+        raise LLMPoolError(errors) from errors[-1][1]
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        errors = []
+        for backend, delay in self._plan():
+            if delay:
+                await asyncio.sleep(delay)
+            start = time.perf_counter()
+            stream = backend.model.astream(messages, _NO_CALLBACKS, stop=stop, **kwargs)
+            try:
+                first = await anext(stream, None)
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                backend.record_failure()
+                errors.append((backend.name, e))
+                continue
+            try:
+                if first is not None:
+                    generation = ChatGenerationChunk(message=self._clean(first, backend))
+                    if run_manager:
+                        await run_manager.on_llm_new_token(str(first.content), chunk=generation)
+                    yield generation
+                async for chunk in stream:
+                    generation = ChatGenerationChunk(message=self._clean(chunk))
+                    if run_manager:
+                        await run_manager.on_llm_new_token(str(chunk.content), chunk=generation)
+                    yield generation
+            except Exception as e:
+                if _is_retryable(e):
+                    backend.record_failure()
+                raise
+            backend.record_success(time.perf_counter() - start)
+            return
+        raise LLMPoolError(errors) from errors[-1][1]
+
+
+def _build_provider(provider: LLMProviderConfig, config: EnvConfig) -> BaseChatModel:
+    # Importados aqui: cada cliente só carrega se o provedor estiver configurado
+    import httpx
+
+    timeout = provider.timeout_seconds or config.LLM_TIMEOUT_SECONDS
+    # Um pool de conexões keep-alive por provedor, compartilhado por todas as chamadas
+    limits = httpx.Limits(
+        max_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=config.LLM_HTTP_KEEPALIVE_SECONDS,
+    )
+    if provider.kind == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            api_key=provider.api_key or config.AI_API_KEY,
+            model=provider.model,
+            temperature=provider.temperature,
+            base_url=provider.base_url or None,
+            timeout=timeout,
+            # As novas tentativas são do pool, que pode trocar de provedor
+            max_retries=0,
+            http_client=httpx.Client(limits=limits, timeout=timeout),
+            http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+            cache=False,
+        )
+    if provider.kind == "ollama":
+        from langchain_ollama import ChatOllama
+
+        return ChatOllama(
+            model=provider.model,
+            temperature=provider.temperature,
+            base_url=provider.base_url or None,
+            client_kwargs={"timeout": timeout, "limits": limits},
+            cache=False,
+        )
+    raise ValueError(f"Provedor de LLM desconhecido: {provider.kind}")
+
+
+def build_llm_pool(config: EnvConfig, cache=None) -> LLMPool:
+    """
+    Monta o pool com os provedores de `LLM_PROVIDERS` (ou só o Groq, se a lista estiver vazia).
+
+    Args:
+        config (EnvConfig): Configurações.
+        cache: Cache de respostas do pool (`ResponseCache`); os provedores nunca usam cache.
+
+    Returns:
+        LLMPool: Modelo de chat pronto para os assistentes.
+    """
+    providers = config.LLM_PROVIDERS or [LLMProviderConfig(kind="groq", model=config.LLM_MODEL)]
+    backends = [
+        Backend(
+            provider.name or f"{provider.kind}:{provider.model}",
+            _build_provider(provider, config),
+            alpha=config.LLM_EWMA_ALPHA,
+            cooldown_seconds=config.LLM_FAILURE_COOLDOWN_SECONDS,
+            params={
+                "kind": provider.kind,
+                "model": provider.model,
+                "temperature": provider.temperature,
+                "base_url": provider.base_url,
+            },
+        )
+        for provider in providers
+    ]
+    return LLMPool(
+        backends=backends,
+        max_attempts=config.LLM_MAX_ATTEMPTS,
+        backoff_seconds=config.LLM_BACKOFF_SECONDS,
+        backoff_max_seconds=config.LLM_BACKOFF_MAX_SECONDS,
+        cache=cache if cache is not None else False,
+        # Aplicado pelo `BaseChatModel` depois da consulta ao cache, uma vez por chamada (as novas tentativas não contam)
+        rate_limiter=InMemoryRateLimiter(
+            requests_per_second=config.LLM_RATE_LIMIT_PER_SECOND,
+            check_every_n_seconds=min(0.1, 1 / config.LLM_RATE_LIMIT_PER_SECOND),
+            max_bucket_size=config.LLM_RATE_LIMIT_BURST,
+        ) if config.LLM_RATE_LIMIT_PER_SECOND > 0 else None,
+    )
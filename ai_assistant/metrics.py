@@ -0,0 +1,339 @@
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks.manager import adispatch_custom_event, dispatch_custom_event
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+if TYPE_CHECKING:
+    from ai_assistant.router import RouterMetrics
+
+# Evento emitido pelo `Agent` quando o LLM devolve uma resposta vazia e é chamado de novo
+RETRY_EVENT = "ai_assistant_llm_retry"
+
+# Limites (em segundos) dos buckets dos histogramas de duração
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Limites (em bytes) dos buckets do tamanho dos resultados das tools
+SIZE_BUCKETS = (256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576)
+
+
+def notify_retry(config, attempt: int) -> None:
+    """Avisa os callbacks (como o `MetricsCallbackHandler`) de uma nova tentativa do LLM."""
+    try:
+        dispatch_custom_event(RETRY_EVENT, {"attempt": attempt}, config=config)
+    except RuntimeError:
+        # Fora de uma execução com callbacks (sem run pai) não há a quem avisar
+        pass
+
+
+async def anotify_retry(config, attempt: int) -> None:
+    """Versão assíncrona do `notify_retry`."""
+    try:
+        await adispatch_custom_event(RETRY_EVENT, {"attempt": attempt}, config=config)
+    except RuntimeError:
+        pass
+
+
+class _Histogram:
+    """Histograma cumulativo no formato do Prometheus (buckets, soma e contagem)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """Tokens de prompt e de resposta de uma chamada ao LLM (zero se o provedor não informar)."""
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+    if not prompt and not completion:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+    return prompt, completion
+
+
+def _result_size(output: Any) -> int:
+    content = output.content if isinstance(output, BaseMessage) else output
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, default=str)
+    return len(content.encode("utf-8"))
+
+
+class MetricsRecorder:
+    """Agrega as medições do grafo e as exporta em JSON lines e no formato texto do Prometheus.
+
+    Guarda, por nó do grafo, a duração de cada execução; por nó, as chamadas ao LLM (duração,
+    tokens de prompt e de resposta) e as novas tentativas por resposta vazia; por tool, a
+    duração, o tamanho do resultado e os erros; e a duração de cada turno completo. A
+    diferença entre o turno e a soma dos nós é o custo do próprio LangGraph (checkpoints,
+    canais).
+
+    Args:
+        jsonl_path (Optional[str]): Arquivo onde cada medição é acrescentada como uma linha JSON.
+        prometheus_path (Optional[str]): Arquivo reescrito ao fim de cada turno com
+            `render_prometheus()` (para o textfile collector do node_exporter).
+    """
+
+    def __init__(self, jsonl_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+        self.prometheus_path = os.path.expanduser(prometheus_path) if prometheus_path else None
+        self._lock = threading.Lock()
+        self._jsonl = None
+        if jsonl_path:
+            jsonl_path = os.path.expanduser(jsonl_path)
+            os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+            self._jsonl = open(jsonl_path, "a", encoding="utf-8", buffering=1)
+        self.turns = _Histogram(DURATION_BUCKETS)
+        self.nodes: Dict[str, _Histogram] = {}
+        self.llm: Dict[str, _Histogram] = {}
+        self.prompt_tokens: Dict[str, int] = {}
+        self.completion_tokens: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.tools: Dict[str, _Histogram] = {}
+        self.tool_sizes: Dict[str, _Histogram] = {}
+        self.tool_errors: Dict[str, int] = {}
+        self.router: Optional["RouterMetrics"] = None
+
+    def attach_router(self, router: "RouterMetrics") -> None:
+        """Inclui os contadores do roteador local (`IntentRouter.metrics`) no `render_prometheus()`."""
+        self.router = router
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps({"ts": time.time(), **event}, ensure_ascii=False) + "\n")
+
+    def record_turn(self, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.turns.observe(seconds)
+            self._emit({"event": "turn", "seconds": seconds, "error": error})
+        if self.prometheus_path:
+            self.write_prometheus(self.prometheus_path)
+
+    def record_node(self, node: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.nodes.setdefault(node, _Histogram(DURATION_BUCKETS)).observe(seconds)
+            self._emit({"event": "node", "node": node, "seconds": seconds, "error": error})
+
+    def record_llm(self, node: str, seconds: float, prompt_tokens: int, completion_tokens: int,
+                   model: Optional[str] = None) -> None:
+        with self._lock:
+            self.llm.setdefault(node, _Histogram(DURATION_BUCKETS)).observe(seconds)
+            self.prompt_tokens[node] = self.prompt_tokens.get(node, 0) + prompt_tokens
+            self.completion_tokens[node] = self.completion_tokens.get(node, 0) + completion_tokens
+            self._emit({"event": "llm", "node": node, "model": model, "seconds": seconds,
+                        "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens})
+
+    def record_retry(self, node: str, attempt: int) -> None:
+        with self._lock:
+            self.retries[node] = self.retries.get(node, 0) + 1
+            self._emit({"event": "retry", "node": node, "attempt": attempt})
+
+    def record_tool(self, tool: str, seconds: float, size: int, error: bool = False) -> None:
+        with self._lock:
+            self.tools.setdefault(tool, _Histogram(DURATION_BUCKETS)).observe(seconds)
+            self.tool_sizes.setdefault(tool, _Histogram(SIZE_BUCKETS)).observe(size)
+            if error:
+                self.tool_errors[tool] = self.tool_errors.get(tool, 0) + 1
+            self._emit({"event": "tool", "tool": tool, "seconds": seconds, "bytes": size, "error": error})
+
+    def render_prometheus(self) -> str:
+        """Todas as métricas agregadas no formato de exposição em texto do Prometheus."""
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, series: Dict[str, _Histogram], label: Optional[str]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(series.items()):
+                base = {label: key} if label else {}
+                for bound, count in zip(hist.bounds, hist.counts):
+                    lines.append(f"{name}_bucket{_labels(**base, le=f'{bound:g}')} {count}")
+                lines.append(f"{name}_bucket{_labels(**base, le='+Inf')} {hist.count}")
+                suffix = _labels(**base) if base else ""
+                lines.append(f"{name}_sum{suffix} {hist.sum:.6f}")
+                lines.append(f"{name}_count{suffix} {hist.count}")
+
+        def counter(name: str, help_text: str, series: Dict[str, int], label: Optional[str]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(**{label: key})} {value}" if label else f"{name} {value}")
+
+        def gauge(name: str, help_text: str, value: float):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:.6f}")
+
+        with self._lock:
+            histogram("ai_assistant_turn_duration_seconds", "Duração de cada turno do grafo.",
+                      {"": self.turns} if self.turns.count else {}, None)
+            histogram("ai_assistant_node_duration_seconds", "Duração de cada execução de um nó do grafo.",
+                      self.nodes, "node")
+            histogram("ai_assistant_llm_duration_seconds", "Duração de cada chamada ao LLM, por nó.",
+                      self.llm, "node")
+            counter("ai_assistant_llm_prompt_tokens_total", "Tokens de prompt enviados ao LLM, por nó.",
+                    self.prompt_tokens, "node")
+            counter("ai_assistant_llm_completion_tokens_total", "Tokens gerados pelo LLM, por nó.",
+                    self.completion_tokens, "node")
+            counter("ai_assistant_llm_retries_total", "Novas chamadas ao LLM após respostas vazias, por nó.",
+                    self.retries, "node")
+            histogram("ai_assistant_tool_duration_seconds", "Duração de cada execução de tool.",
+                      self.tools, "tool")
+            histogram("ai_assistant_tool_result_bytes", "Tamanho do resultado de cada execução de tool.",
+                      self.tool_sizes, "tool")
+            counter("ai_assistant_tool_errors_total", "Execuções de tool que falharam.",
+                    self.tool_errors, "tool")
+        # O roteador tem o próprio lock; os valores são lidos fora do nosso
+        if self.router is not None:
+            router = self.router.snapshot()
+            counter("ai_assistant_router_decisions_total", "Decisões do roteador local, por caminho escolhido.",
+                    {"fast": router["fast_routes"], "llm": router["fallbacks"]}, "route")
+            counter("ai_assistant_router_compared_total",
+                    "Turnos enviados ao LLM em que a decisão dele foi comparada com a do roteador local.",
+                    {"": router["compared"]}, None)
+            counter("ai_assistant_router_agreements_total",
+                    "Turnos comparados em que o roteador local concordou com o LLM.",
+                    {"": router["agreements"]}, None)
+            gauge("ai_assistant_router_accuracy_ratio", "Concordância do roteador local com o LLM (0 a 1).",
+                  router["accuracy_vs_llm"])
+            gauge("ai_assistant_router_latency_avg_seconds", "Tempo médio de classificação do roteador local.",
+                  router["latency_avg_ms"] / 1000)
+            gauge("ai_assistant_router_latency_max_seconds", "Maior tempo de classificação do roteador local.",
+                  router["latency_max_ms"] / 1000)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Reescreve `path` de forma atômica com `render_prometheus()`."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Callback do LangChain que alimenta um `MetricsRecorder` durante a execução do grafo.
+
+    Identifica os nós pelas execuções marcadas com `graph:step:N` pelo LangGraph, atribui as
+    chamadas ao LLM ao nó em que ocorreram (`langgraph_node`) e conta as novas tentativas
+    pelo evento `RETRY_EVENT` despachado pelo `Agent`. Só é registrado no grafo quando
+    `METRICS_ENABLED`; desligado, não há nenhum custo.
+    """
+
+    # Só faz contas e escritas curtas: roda na própria thread do evento, sem executor
+    run_inline = True
+
+    def __init__(self, recorder: MetricsRecorder):
+        self.recorder = recorder
+        # run_id -> (tipo, nome, início[, modelo])
+        self._starts: Dict[UUID, tuple] = {}
+
+    def _start(self, run_id: UUID, kind: str, name: str) -> None:
+        self._starts[run_id] = (kind, name, time.perf_counter())
+
+    def _finish(self, run_id: UUID, kind: str) -> Optional[Tuple[str, float]]:
+        start = self._starts.get(run_id)
+        if start is None or start[0] != kind:
+            return None
+        del self._starts[run_id]
+        return start[1], time.perf_counter() - start[2]
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       tags: Optional[List[str]] = None, metadata: Optional[Dict[str, Any]] = None,
+                       **kwargs: Any) -> None:
+        if parent_run_id is None:
+            self._start(run_id, "turn", "")
+            return
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node and any(tag.startswith("graph:step:") for tag in tags or ()):
+            self._start(run_id, "node", node)
+
+    def _end_chain(self, run_id: UUID, error: bool) -> None:
+        if (finished := self._finish(run_id, "node")) is not None:
+            self.recorder.record_node(*finished, error=error)
+        elif (finished := self._finish(run_id, "turn")) is not None:
+            self.recorder.record_turn(finished[1], error=error)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id in self._starts:
+            self._end_chain(run_id, error=False)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id in self._starts:
+            self._end_chain(run_id, error=True)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        self._starts[run_id] = ("llm", metadata.get("langgraph_node", ""), time.perf_counter(),
+                                metadata.get("ls_model_name"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        start = self._starts.pop(run_id, None)
+        if start is None:
+            return
+        _, node, started, model = start
+        prompt_tokens, completion_tokens = _token_usage(response)
+        self.recorder.record_llm(node, time.perf_counter() - started, prompt_tokens, completion_tokens, model)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            self.recorder.record_llm(start[1], time.perf_counter() - start[2], 0, 0, start[3])
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "tool", kwargs.get("name") or (serialized or {}).get("name", ""))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if (finished := self._finish(run_id, "tool")) is not None:
+            error = getattr(output, "status", None) == "error"
+            self.recorder.record_tool(*finished, _result_size(output), error=error)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        if (finished := self._finish(run_id, "tool")) is not None:
+            self.recorder.record_tool(*finished, 0, error=True)
+
+    def on_custom_event(self, name: str, data: Any, *, run_id: UUID,
+                        metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        if name == RETRY_EVENT:
+            self.recorder.record_retry((metadata or {}).get("langgraph_node", ""), data.get("attempt", 0))
+
+
+def build_metrics(config) -> Optional[MetricsRecorder]:
+    """`MetricsRecorder` configurado pelo `EnvConfig`, ou `None` se `METRICS_ENABLED` estiver desligado."""
+    if not config.METRICS_ENABLED:
+        return None
+    return MetricsRecorder(config.METRICS_JSONL_PATH or None, config.METRICS_PROMETHEUS_PATH or None)
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+def count_tree(tree: dict) -> Tuple[int, int]:
+    """
+    Conta diretórios e arquivos de uma árvore gerada por `walk_tree` (sem contar a raiz).
+
+    Returns:
+        Tuple[int, int]: Quantidade de diretórios e de arquivos.
+    """
+    directories = files = 0
+    stack = [tree]
+    while stack:
+        for child in stack.pop()["children"]:
+            if "children" in child:
+                directories += 1
+                stack.append(child)
+            else:
+                files += 1
+    return directories, files
+
+
+class ResultStore:
+    """
+    Guarda resultados grandes das tools (como árvores de diretórios) fora do contexto do LLM.
+
+    Cada resultado é referenciado por um handle curto que o modelo repassa às outras tools,
+    em vez de regenerar o conteúdo inteiro como argumento. O consumo de memória é limitado
+    pelo total de nós guardados, descartando os resultados usados há mais tempo; resultados
+    maiores que `spill_threshold` nós são gravados em `spill_dir` (se configurado) e só o
+    caminho do arquivo fica em memória.
+    """
+
+    def __init__(self, max_nodes: int, max_entries: int, spill_dir: Optional[str] = None,
+                 spill_threshold: int = 100_000):
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.spill_dir = os.path.expanduser(spill_dir) if spill_dir else None
+        self.spill_threshold = spill_threshold
+        # handle -> (árvore em memória ou None, caminho em disco ou None, peso em nós)
+        self._entries: "OrderedDict[str, Tuple[Optional[dict], Optional[str], int]]" = OrderedDict()
+        self._nodes = 0
+        self._lock = threading.Lock()
+
+    def put(self, tree: dict, nodes: Optional[int] = None) -> str:
+        """
+        Guarda uma árvore e retorna seu handle.
+
+        Args:
+            tree (dict): Árvore a ser guardada.
+            nodes (Optional[int]): Quantidade de nós da árvore, se já conhecida.
+        """
+        if nodes is None:
+            nodes = sum(count_tree(tree)) + 1
+        handle = f"tree-{uuid.uuid4().hex[:8]}"
+
+        spill_path = None
+        if self.spill_dir and nodes > self.spill_threshold:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            spill_path = os.path.join(self.spill_dir, f"{handle}.json")
+            with open(spill_path, "w", encoding="utf-8") as f:
+                json.dump(tree, f)
+
+        with self._lock:
+            if spill_path is None:
+                self._entries[handle] = (tree, None, nodes)
+                self._nodes += nodes
+            else:
+                self._entries[handle] = (None, spill_path, 0)
+            self._evict()
+        return handle
+
+    def get(self, handle: str) -> dict:
+        """
+        Retorna a árvore associada a `handle`.
+
+        Raises:
+            ValueError: Se o handle não existir ou já tiver sido descartado.
+        """
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None:
+                self._entries.move_to_end(handle)
+        if entry is None:
+            raise ValueError(
+                f"Handle '{handle}' não encontrado. Use o handle retornado por 'get_directory_tree' "
+                "ou mapeie o diretório novamente."
+            )
+        tree, spill_path, _ = entry
+        if tree is None:
+            with open(spill_path, "r", encoding="utf-8") as f:
+                tree = json.load(f)
+        return tree
+
+    def _evict(self) -> None:
+        # Mantém sempre o resultado mais recente, mesmo que sozinho ultrapasse o limite
+        while len(self._entries) > 1 and (self._nodes > self.max_nodes or len(self._entries) > self.max_entries):
+            _, (_, spill_path, nodes) = self._entries.popitem(last=False)
+            self._nodes -= nodes
+            if spill_path is not None:
+                try:
+                    os.remove(spill_path)
+                except OSError:
+                    pass
@@ -0,0 +1,165 @@
+import re
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+
+class Rule(NamedTuple):
+    pattern: Pattern
+    weight: float
+
+
+def _rule(pattern: str, weight: float) -> Rule:
+    return Rule(re.compile(pattern, re.IGNORECASE), weight)
+
+
+# Evidências de um pedido de mapeamento de diretório. Os pesos se combinam como
+# probabilidades independentes: 1 - Π(1 - peso) das regras que casam
+DIRECTORY_MAP_RULES: Tuple[Rule, ...] = (
+    _rule(r"\b(mapei[ea]|mapear|mapeamento|mapa|map|tree)\b", 0.7),
+    _rule(r"\b(list[ea]r?|mostr[ea]r?|ger[ea]r?)\b.*\b(estrutura|[áa]rvore)\b", 0.6),
+    _rule(r"\b(pastas?|diret[óo]rios?|folders?|directory|directories|estrutura|[áa]rvore)\b", 0.35),
+    _rule(r"(^|\s)(~|\.{1,2})?/[\w.\-/]*|\b[a-z]:\\", 0.35),
+    _rule(r"\b(salv[ea]r?|export[ea]r?|grav[ea]r?)\b.*\b(json|txt)\b", 0.7),
+    _rule(r"\b(expand[ea]r?|detalh[ea]r?)\b.*\b(pasta|diret[óo]rio|handle)\b", 0.5),
+    _rule(r"\b(tamanho|espa[çc]o|ocupa[mr]?|maiores|disk usage|du)\b", 0.4),
+)
+
+# Evidências contrárias: perguntas conceituais que só mencionam os termos
+NEGATIVE_RULES: Tuple[Rule, ...] = (
+    _rule(r"^\s*(o que|por ?qu[eê]|explique|qual a diferen[çc]a|what is|why)\b", 0.6),
+    _rule(r"\bcomo (eu )?(fa[çc]o|funciona|posso|se faz)\b", 0.5),
+    _rule(r"\b(c[óo]digo|script|fun[çc][ãa]o|python|bash)\b", 0.4),
+    # Pedido negado: "não mapeie", "não precisa listar", "don't map"
+    _rule(r"\b(n[ãa]o|nem|don'?t|do not)\s+(\w+\s+)?(mapei[ea]|mapear|map|list[ea]r?|mostr[ea]r?|ger[ea]r?|"
+          r"salv[ea]r?|export[ea]r?)\b", 0.8),
+)
+
+
+class RouterMetrics:
+    """Contadores do roteador local.
+
+    `agreements`/`compared` medem a acurácia contra o roteador do LLM: nos turnos que
+    seguem para o `primary_assistant` (por falta de confiança ou em modo sombra), a decisão
+    do LLM é comparada com o que o roteador local teria feito.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast_routes = 0
+        self.fallbacks = 0
+        self.compared = 0
+        self.agreements = 0
+        self.latency_total_s = 0.0
+        self.latency_max_s = 0.0
+
+    def record_decision(self, fast: bool, elapsed: float) -> None:
+        with self._lock:
+            if fast:
+                self.fast_routes += 1
+            else:
+                self.fallbacks += 1
+            self.latency_total_s += elapsed
+            self.latency_max_s = max(self.latency_max_s, elapsed)
+
+    def record_llm_route(self, predicted: bool, actual: bool) -> None:
+        with self._lock:
+            self.compared += 1
+            self.agreements += predicted == actual
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            decisions = self.fast_routes + self.fallbacks
+            return {
+                "fast_routes": self.fast_routes,
+                "fallbacks": self.fallbacks,
+                "fast_route_rate": self.fast_routes / decisions if decisions else 0.0,
+                "accuracy_vs_llm": self.agreements / self.compared if self.compared else 0.0,
+                "compared": self.compared,
+                "agreements": self.agreements,
+                "latency_avg_ms": 1000 * self.latency_total_s / decisions if decisions else 0.0,
+                "latency_max_ms": 1000 * self.latency_max_s,
+            }
+
+
+class IntentRouter:
+    """
+    Classificador local que decide, sem chamar o LLM, se um pedido é de mapeamento de diretório.
+
+    A pontuação combina as regras positivas e é reduzida pelas negativas. Se houver um
+    `scorer` (por exemplo, um modelo pequeno rodando localmente que retorna a probabilidade
+    do pedido ser de mapeamento), a pontuação final é a média das duas. Só pedidos com
+    pontuação maior ou igual a `threshold` seguem direto para o assistente de diretórios;
+    os demais continuam passando pelo LLM do `primary_assistant`.
+
+    Com `shadow=True` o roteador só pontua e registra métricas, sem desviar nenhum turno,
+    o que permite calibrar o `threshold` com tráfego real.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        rules: Sequence[Rule] = DIRECTORY_MAP_RULES,
+        negative_rules: Sequence[Rule] = NEGATIVE_RULES,
+        scorer: Optional[Callable[[str], float]] = None,
+        shadow: bool = False,
+    ):
+        self.threshold = threshold
+        self.rules = rules
+        self.negative_rules = negative_rules
+        self.scorer = scorer
+        self.shadow = shadow
+        self.metrics = RouterMetrics()
+
+    def score(self, text: str) -> float:
+        """
+        Pontua de 0 a 1 a chance de `text` ser um pedido de mapeamento de diretório.
+
+        Args:
+            text (str): Mensagem do usuário.
+
+        Returns:
+            float: Pontuação combinada das regras (e do `scorer`, se houver).
+        """
+        miss = 1.0
+        for rule in self.rules:
+            if rule.pattern.search(text):
+                miss *= 1 - rule.weight
+        score = 1 - miss
+        for rule in self.negative_rules:
+            if rule.pattern.search(text):
+                score *= 1 - rule.weight
+        if self.scorer is not None:
+            score = (score + self.scorer(text)) / 2
+        return score
+
+    def route(self, text: str) -> Tuple[bool, float]:
+        """
+        Decide se o pedido pode ir direto para o assistente de diretórios.
+
+        Returns:
+            Tuple[bool, float]: Se deve usar o caminho rápido e a pontuação calculada.
+        """
+        start = time.perf_counter()
+        score = self.score(text)
+        fast = score >= self.threshold and not self.shadow
+        self.metrics.record_decision(fast, time.perf_counter() - start)
+        return fast, score
+
+
+def evaluate(router: IntentRouter, examples: Sequence[Tuple[str, bool]]) -> Dict[str, float]:
+    """
+    Mede o roteador contra exemplos rotulados (`True` para pedidos de mapeamento).
+
+    Returns:
+        Dict[str, float]: Acurácia, precisão e cobertura (fração dos pedidos de mapeamento
+                          que seguem pelo caminho rápido) no `threshold` atual.
+    """
+    predicted: List[bool] = [router.score(text) >= router.threshold for text, _ in examples]
+    actual = [label for _, label in examples]
+    true_positives = sum(p and a for p, a in zip(predicted, actual))
+    return {
+        "accuracy": sum(p == a for p, a in zip(predicted, actual)) / len(examples) if examples else 0.0,
+        "precision": true_positives / sum(predicted) if any(predicted) else 0.0,
+        "coverage": true_positives / sum(actual) if any(actual) else 0.0,
+    }
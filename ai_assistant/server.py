@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import json
+import re
+import uuid
+from contextlib import aclosing, asynccontextmanager
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.graph.state import CompiledStateGraph
+
+from ai_assistant.env import get_env
+from ai_assistant.metrics import MetricsRecorder
+from ai_assistant.streaming import ASSISTANT_NODES, ThinkTagFilter, message_text, reply_text
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+# `Content-Length` é só dígitos ASCII (RFC 9110); sinal, espaços internos e `0x` são inválidos
+_CONTENT_LENGTH = re.compile(r"[0-9]+")
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _Request(NamedTuple):
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+async def _read_request(reader: asyncio.StreamReader, max_body_bytes: int = MAX_BODY_BYTES) -> Optional[_Request]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "Cabeçalhos muito grandes")
+    request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    try:
+        method, target, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Requisição inválida")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    content_length = headers.get("content-length") or "0"
+    if not _CONTENT_LENGTH.fullmatch(content_length):
+        raise HttpError(400, "Content-Length inválido")
+    length = int(content_length)
+    if length > max_body_bytes:
+        raise HttpError(413, "Corpo da requisição muito grande")
+    body = await reader.readexactly(length) if length else b""
+    return _Request(method.upper(), urlsplit(target).path.rstrip("/") or "/", headers, body)
+
+
+def _head(status: int, content_type: str, extra: str = "") -> bytes:
+    return (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Connection: close\r\n{extra}\r\n"
+    ).encode("latin-1")
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: Any) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(_head(status, "application/json; charset=utf-8", f"Content-Length: {len(body)}\r\n") + body)
+    await writer.drain()
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def _cancel_on_disconnect(read: asyncio.Task, task: asyncio.Task) -> None:
+    if read.cancelled():
+        return
+    if read.exception() is not None or read.result() == b"":
+        task.cancel()
+
+
+class AssistantServer:
+    """Servidor HTTP assíncrono que atende várias sessões do assistente num só processo.
+
+    Cada sessão é uma thread de checkpoints do grafo. Endpoints:
+
+    - `POST /sessions`: cria uma sessão e retorna o seu id.
+    - `GET /sessions`: lista as sessões salvas no checkpointer.
+    - `POST /sessions/{id}/messages`: envia `{"content": "..."}` e transmite a resposta por SSE
+      (eventos `token`, `tool`, `done`, `cancelled` e `error`).
+    - `POST /sessions/{id}/invoke`: igual, mas responde um JSON único ao final.
+    - `DELETE /sessions/{id}/run`: cancela a execução em andamento da sessão.
+    - `GET /health`: execuções ativas e na fila.
+    - `GET /metrics`: métricas no formato texto do Prometheus (com `METRICS_ENABLED`).
+
+    No máximo `max_concurrency` execuções do grafo rodam ao mesmo tempo; até `max_pending`
+    esperam na fila e as demais recebem 503. Uma sessão só tem uma execução por vez (409).
+    Corpos maiores que `max_body_bytes` são recusados (413) antes de serem lidos.
+    Se o cliente desconectar, a execução é cancelada. O SSE só lê o próximo evento do grafo
+    depois que o anterior foi escrito no socket (`drain`), então um cliente lento desacelera
+    a sua execução em vez de acumular eventos em memória.
+
+    O grafo é recebido pronto, então pode ser montado com um LLM falso nos testes. Os nós
+    síncronos (tools que acessam o sistema de arquivos) rodam no executor do LangGraph.
+    """
+
+    def __init__(self, graph: CompiledStateGraph, max_concurrency: int = 4, max_pending: int = 32,
+                 metrics: Optional[MetricsRecorder] = None, max_body_bytes: int = MAX_BODY_BYTES):
+        self.graph = graph
+        self.metrics = metrics
+        self.max_body_bytes = max_body_bytes
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+        self._waiting = 0
+        self._runs: Dict[str, asyncio.Task] = {}
+
+    @asynccontextmanager
+    async def _admit(self, session_id: str) -> AsyncIterator[None]:
+        """Reserva a sessão e uma vaga de execução, respeitando os limites de concorrência e fila."""
+        if session_id in self._runs:
+            raise HttpError(409, "A sessão já tem uma execução em andamento")
+        if self._waiting >= self.max_pending:
+            raise HttpError(503, "Servidor ocupado, tente novamente")
+        self._runs[session_id] = asyncio.current_task()
+        try:
+            self._waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self._waiting -= 1
+            self._active += 1
+            try:
+                yield
+            finally:
+                self._active -= 1
+                self._semaphore.release()
+        finally:
+            self._runs.pop(session_id, None)
+
+    @staticmethod
+    def _parse_message(request: _Request) -> Dict[str, Any]:
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            raise HttpError(400, "JSON inválido")
+        content = payload.get("content") if isinstance(payload, dict) else None
+        if not isinstance(content, str) or not content.strip():
+            raise HttpError(400, "Campo 'content' obrigatório")
+        return {"messages": [{"role": "user", "content": content}]}
+
+    async def _stream(self, writer: asyncio.StreamWriter, session_id: str, graph_input: dict) -> None:
+        config = {"configurable": {"thread_id": session_id}}
+        async with self._admit(session_id):
+            writer.write(_head(200, "text/event-stream; charset=utf-8", "Cache-Control: no-cache\r\n"))
+            await writer.drain()
+            try:
+                filters: Dict[Optional[str], ThinkTagFilter] = {}
+                stream = self.graph.astream(graph_input, config, stream_mode=["messages", "updates"])
+                async with aclosing(stream):
+                    async for mode, payload in stream:
+                        if mode == "updates":
+                            for update in payload.values():
+                                messages = update.get("messages", []) if isinstance(update, dict) else []
+                                for message in messages if isinstance(messages, list) else [messages]:
+                                    if isinstance(message, ToolMessage):
+                                        writer.write(_sse("tool", {"name": message.name, "status": message.status}))
+                        else:
+                            chunk, metadata = payload
+                            if not isinstance(chunk, AIMessage) or metadata.get("langgraph_node") not in ASSISTANT_NODES:
+                                continue
+                            text = filters.setdefault(chunk.id, ThinkTagFilter()).feed(message_text(chunk))
+                            if text:
+                                writer.write(_sse("token", {"text": text}))
+                        await writer.drain()
+                state = await self.graph.aget_state(config)
+                writer.write(_sse("done", {"session_id": session_id, "reply": reply_text(state.values.get("messages", []))}))
+            except asyncio.CancelledError:
+                writer.write(_sse("cancelled", {"session_id": session_id}))
+                raise
+            except Exception as e:
+                writer.write(_sse("error", {"message": str(e)}))
+            await writer.drain()
+
+    async def _invoke(self, writer: asyncio.StreamWriter, session_id: str, graph_input: dict) -> None:
+        config = {"configurable": {"thread_id": session_id}}
+        async with self._admit(session_id):
+            try:
+                result = await self.graph.ainvoke(graph_input, config)
+            except asyncio.CancelledError:
+                # Só chega ao cliente quando o cancelamento veio de um `DELETE`
+                writer.write(_head(200, "application/json; charset=utf-8") +
+                             json.dumps({"session_id": session_id, "cancelled": True}).encode("utf-8"))
+                raise
+        await _send_json(writer, 200, {"session_id": session_id, "reply": reply_text(result.get("messages", []))})
+
+    async def _route(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        parts = [part for part in request.path.split("/") if part]
+        if request.method == "GET" and parts == ["health"]:
+            await _send_json(writer, 200, {"active": self._active, "waiting": self._waiting,
+                                           "max_concurrency": self.max_concurrency})
+        elif request.method == "GET" and parts == ["metrics"]:
+            if self.metrics is None:
+                raise HttpError(404, "Métricas desativadas (METRICS_ENABLED)")
+            body = self.metrics.render_prometheus().encode("utf-8")
+            writer.write(_head(200, "text/plain; version=0.0.4; charset=utf-8", f"Content-Length: {len(body)}\r\n") + body)
+            await writer.drain()
+        elif request.method == "GET" and parts == ["sessions"]:
+            list_threads = getattr(self.graph.checkpointer, "list_threads", None)
+            await _send_json(writer, 200, {"sessions": list_threads() if list_threads else sorted(self._runs)})
+        elif request.method == "POST" and parts == ["sessions"]:
+            await _send_json(writer, 201, {"session_id": uuid.uuid4().hex[:12]})
+        elif len(parts) == 3 and parts[0] == "sessions":
+            session_id, action = parts[1], parts[2]
+            if request.method == "POST" and action == "messages":
+                await self._stream(writer, session_id, self._parse_message(request))
+            elif request.method == "POST" and action == "invoke":
+                await self._invoke(writer, session_id, self._parse_message(request))
+            elif request.method == "DELETE" and action == "run":
+                task = self._runs.get(session_id)
+                if task is None:
+                    raise HttpError(404, "Nenhuma execução em andamento nesta sessão")
+                task.cancel()
+                await _send_json(writer, 202, {"session_id": session_id, "cancelled": True})
+            else:
+                raise HttpError(404, "Rota não encontrada")
+        else:
+            raise HttpError(404, "Rota não encontrada")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende uma conexão (uma requisição por conexão)."""
+        task = asyncio.current_task()
+        watcher = None
+        try:
+            request = await _read_request(reader, self.max_body_bytes)
+            if request is None:
+                return
+            # Depois do corpo o cliente não envia mais nada: EOF significa que desconectou
+            watcher = asyncio.create_task(reader.read(1))
+            watcher.add_done_callback(lambda read: _cancel_on_disconnect(read, task))
+            await self._route(request, writer)
+        except HttpError as e:
+            await _send_json(writer, e.status, {"error": e.message})
+        except asyncio.CancelledError:
+            pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+
+
+async def _serve_forever(server: AssistantServer, host: str, port: int) -> None:
+    listener = await server.serve(host, port)
+    print(f"Servidor ouvindo em http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    env = get_env()
+    parser = argparse.ArgumentParser(description="Servidor HTTP/SSE do assistente de IA.")
+    parser.add_argument("--host", default=env.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=env.SERVER_PORT)
+    args = parser.parse_args(argv)
+
+    from ai_assistant.graph import get_graph, get_metrics
+
+    server = AssistantServer(get_graph(), max_concurrency=env.SERVER_MAX_CONCURRENCY, max_pending=env.SERVER_MAX_PENDING,
+                             metrics=get_metrics(), max_body_bytes=env.SERVER_MAX_BODY_BYTES)
+    try:
+        asyncio.run(_serve_forever(server, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nEncerrando o servidor...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Collection, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ai_assistant.result_store import count_tree
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    hash    BLOB PRIMARY KEY,
+    entries TEXT NOT NULL,
+    refs    INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    id          TEXT PRIMARY KEY,
+    root        TEXT NOT NULL,
+    hash        BLOB NOT NULL,
+    ignore      TEXT NOT NULL,
+    directories INTEGER NOT NULL,
+    files       INTEGER NOT NULL,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_root ON snapshots (root, created_at);
+"""
+
+
+class SnapshotInfo(NamedTuple):
+    id: str
+    root: str
+    hash: bytes
+    ignore: List[str]
+    directories: int
+    files: int
+    created_at: float
+
+
+class TreeDiff(NamedTuple):
+    """Diferença entre dois snapshots; diretórios terminam com `/` e aparecem sem o seu conteúdo."""
+
+    added: List[str]
+    removed: List[str]
+    modified: List[str]
+    # Diretórios comparados entrada a entrada (os demais foram pulados pelo hash)
+    visited_directories: int
+
+
+def _is_directory(entry: list) -> bool:
+    # Diretórios: [nome, hash]; arquivos: [nome, tamanho, mtime_ns]
+    return len(entry) == 2
+
+
+def build_merkle(tree: dict) -> Tuple[bytes, Dict[bytes, str]]:
+    """
+    Calcula o hash de Merkle de cada diretório de uma árvore gerada por `walk_tree(..., stats=True)`.
+
+    O hash de um diretório cobre o nome, o tamanho e o mtime de cada arquivo e o nome e o hash
+    de cada subdiretório, então dois diretórios com o mesmo hash têm subárvores idênticas.
+
+    Args:
+        tree (dict): Árvore com `size` e `mtime_ns` nos arquivos.
+
+    Returns:
+        Tuple[bytes, Dict[bytes, str]]: Hash da raiz e, para cada hash, as entradas do diretório em JSON.
+    """
+    hashes: Dict[int, bytes] = {}
+    nodes: Dict[bytes, str] = {}
+    # Pós-ordem iterativa: os filhos de um diretório são resolvidos antes dele
+    stack: List[Tuple[dict, bool]] = [(tree, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if not children_done:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node["children"] if "children" in child)
+            continue
+        entries = []
+        for child in node["children"]:
+            if "children" in child:
+                entries.append([child["name"], hashes.pop(id(child)).hex()])
+            else:
+                entries.append([child["name"], child.get("size", -1), child.get("mtime_ns", 0)])
+        entries.sort(key=lambda entry: entry[0])
+        # `ensure_ascii` mantém nomes que não são UTF-8 (surrogates) graváveis no SQLite
+        data = json.dumps(entries, separators=(",", ":"))
+        digest = hashlib.blake2b(data.encode("ascii"), digest_size=16).digest()
+        hashes[id(node)] = digest
+        nodes[digest] = data
+    return hashes[id(tree)], nodes
+
+
+class SnapshotStore:
+    """
+    Snapshots de árvores de diretórios guardados num SQLite como uma árvore de Merkle.
+
+    Cada diretório é gravado uma única vez por conteúdo (chave: o seu hash), então snapshots
+    de uma árvore que mudou pouco compartilham quase todos os nós: gravar um snapshot só
+    escreve os diretórios alterados e comparar dois só desce pelos diretórios cujo hash
+    difere, em tempo proporcional às mudanças e não ao tamanho da árvore. Os nós têm contagem
+    de referências; são guardados no máximo `keep_last` snapshots por diretório raiz, e os nós
+    que deixam de ser usados são removidos.
+    """
+
+    def __init__(self, db_path: str, keep_last: int = 20):
+        self.db_path = os.path.expanduser(db_path)
+        self.keep_last = keep_last
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+        return conn
+
+    @staticmethod
+    def _row_to_info(row) -> SnapshotInfo:
+        snapshot_id, root, digest, ignore, directories, files, created_at = row
+        return SnapshotInfo(snapshot_id, root, digest, json.loads(ignore), directories, files, created_at)
+
+    def create(self, root: str, tree: dict, ignore: Sequence[str] = (), counts: Optional[Tuple[int, int]] = None,
+               protect: Collection[str] = ()) -> SnapshotInfo:
+        """
+        Grava um snapshot de `tree` (gerada com `stats=True`) e descarta os mais antigos de `root`.
+
+        Args:
+            root (str): Caminho absoluto da raiz mapeada.
+            tree (dict): Árvore com `size` e `mtime_ns` nos arquivos.
+            ignore (Sequence[str]): Padrões ignorados na varredura, para repeti-la depois.
+            counts (Optional[Tuple[int, int]]): Quantidade de diretórios e arquivos, se já conhecida.
+            protect (Collection[str]): Snapshots que não podem ser descartados agora (ex.: o que vai ser
+                                       comparado com este), mesmo que passem de `keep_last`.
+        """
+        root_hash, nodes = build_merkle(tree)
+        if counts is None:
+            counts = count_tree(tree)
+        info = SnapshotInfo(f"snap-{uuid.uuid4().hex[:8]}", root, root_hash, list(ignore), counts[0], counts[1],
+                            time.time())
+        conn = self._connect()
+        try:
+            with conn:
+                self._insert_nodes(conn, root_hash, nodes)
+                conn.execute(
+                    "INSERT INTO snapshots (id, root, hash, ignore, directories, files, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (info.id, root, root_hash, json.dumps(info.ignore), info.directories, info.files, info.created_at),
+                )
+                expired = conn.execute(
+                    "SELECT id, hash FROM snapshots WHERE root = ? "
+                    "ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?",
+                    (root, self.keep_last),
+                ).fetchall()
+                for snapshot_id, digest in expired:
+                    if snapshot_id in protect:
+                        continue
+                    conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+                    self._release(conn, digest)
+        finally:
+            conn.close()
+        return info
+
+    @staticmethod
+    def _insert_nodes(conn: sqlite3.Connection, root_hash: bytes, nodes: Dict[bytes, str]) -> None:
+        """Grava os diretórios novos, descendo só por onde o hash ainda não existe, e conta as referências."""
+        references = [root_hash]
+        stack = [root_hash]
+        while stack:
+            digest = stack.pop()
+            if conn.execute("SELECT 1 FROM nodes WHERE hash = ?", (digest,)).fetchone():
+                # Hash já gravado: a subárvore inteira também está
+                continue
+            data = nodes[digest]
+            conn.execute("INSERT INTO nodes (hash, entries, refs) VALUES (?, ?, 0)", (digest, data))
+            children = [bytes.fromhex(entry[1]) for entry in json.loads(data) if _is_directory(entry)]
+            references.extend(children)
+            stack.extend(children)
+        conn.executemany("UPDATE nodes SET refs = refs + 1 WHERE hash = ?", ((digest,) for digest in references))
+
+    @staticmethod
+    def _release(conn: sqlite3.Connection, root_hash: bytes) -> None:
+        """Solta uma referência a `root_hash`, removendo em cascata os nós que ficarem sem nenhuma."""
+        stack = [root_hash]
+        while stack:
+            digest = stack.pop()
+            conn.execute("UPDATE nodes SET refs = refs - 1 WHERE hash = ?", (digest,))
+            row = conn.execute("SELECT refs, entries FROM nodes WHERE hash = ?", (digest,)).fetchone()
+            if row is None or row[0] > 0:
+                continue
+            conn.execute("DELETE FROM nodes WHERE hash = ?", (digest,))
+            stack.extend(bytes.fromhex(entry[1]) for entry in json.loads(row[1]) if _is_directory(entry))
+
+    def get(self, snapshot_id: str) -> SnapshotInfo:
+        """
+        Retorna os dados do snapshot `snapshot_id`.
+
+        Raises:
+            ValueError: Se o snapshot não existir ou já tiver sido descartado.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, root, hash, ignore, directories, files, created_at FROM snapshots WHERE id = ?",
+                (snapshot_id,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise ValueError(
+                f"Snapshot '{snapshot_id}' não encontrado. Use o id retornado por 'snapshot_directory_tree'."
+            )
+        return self._row_to_info(row)
+
+    def latest(self, root: str, exclude: Optional[str] = None) -> Optional[SnapshotInfo]:
+        """Snapshot mais recente de `root` (exceto `exclude`), se houver."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, root, hash, ignore, directories, files, created_at FROM snapshots "
+                "WHERE root = ? AND id != ? ORDER BY created_at DESC, rowid DESC LIMIT 1",
+                (root, exclude or ""),
+            ).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_info(row) if row is not None else None
+
+    def diff(self, snapshot_a: str, snapshot_b: str) -> TreeDiff:
+        """
+        Compara dois snapshots, pulando as subárvores de mesmo hash.
+
+        Args:
+            snapshot_a (str): Snapshot de referência (o mais antigo).
+            snapshot_b (str): Snapshot comparado (o mais novo).
+
+        Returns:
+            TreeDiff: Caminhos (relativos à raiz) adicionados, removidos e modificados, ordenados.
+        """
+        hash_a = self.get(snapshot_a).hash
+        hash_b = self.get(snapshot_b).hash
+        added: List[str] = []
+        removed: List[str] = []
+        modified: List[str] = []
+        visited = 0
+        conn = self._connect()
+        try:
+            def entries(digest: bytes) -> Dict[str, list]:
+                (data,) = conn.execute("SELECT entries FROM nodes WHERE hash = ?", (digest,)).fetchone()
+                return {entry[0]: entry for entry in json.loads(data)}
+
+            stack = [("", hash_a, hash_b)]
+            while stack:
+                rel_dir, digest_a, digest_b = stack.pop()
+                if digest_a == digest_b:
+                    continue
+                visited += 1
+                entries_a, entries_b = entries(digest_a), entries(digest_b)
+                for name in entries_a.keys() | entries_b.keys():
+                    path = f"{rel_dir}/{name}" if rel_dir else name
+                    a, b = entries_a.get(name), entries_b.get(name)
+                    if a is not None and b is not None and _is_directory(a) and _is_directory(b):
+                        if a[1] != b[1]:
+                            stack.append((path, bytes.fromhex(a[1]), bytes.fromhex(b[1])))
+                    elif a is not None and b is not None and not _is_directory(a) and not _is_directory(b):
+                        if a[1:] != b[1:]:
+                            modified.append(path)
+                    else:
+                        # Entrada nova, removida ou que trocou de tipo (arquivo <-> diretório)
+                        if a is not None:
+                            removed.append(path + "/" if _is_directory(a) else path)
+                        if b is not None:
+                            added.append(path + "/" if _is_directory(b) else path)
+        finally:
+            conn.close()
+        return TreeDiff(sorted(added), sorted(removed), sorted(modified), visited)
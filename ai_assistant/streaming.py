@@ -0,0 +1,79 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+# Nós do grafo cujas chamadas ao LLM devem aparecer para o usuário
+ASSISTANT_NODES = {"primary_assistant", "directory_map_assistant"}
+
+
+class ThinkTagFilter:
+    """Remove os blocos `<think>...</think>` do deepseek-r1 de um fluxo de tokens.
+
+    As tags podem chegar divididas entre vários chunks, então o final de cada chunk
+    que ainda pode ser o começo de uma tag fica retido até o próximo.
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        visible = []
+        while True:
+            tag = self.CLOSE_TAG if self._inside else self.OPEN_TAG
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if not self._inside:
+                    visible.append(self._buffer[:index])
+                self._buffer = self._buffer[index + len(tag):]
+                self._inside = not self._inside
+                continue
+            # Retém um possível começo de tag no final do buffer
+            keep = next((n for n in range(min(len(tag) - 1, len(self._buffer)), 0, -1)
+                         if tag.startswith(self._buffer[-n:])), 0)
+            if not self._inside:
+                visible.append(self._buffer[:len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return self._strip_leading("".join(visible))
+
+    def flush(self) -> str:
+        rest = "" if self._inside else self._buffer
+        self._buffer = ""
+        return self._strip_leading(rest)
+
+    def _strip_leading(self, text: str) -> str:
+        # O modelo costuma emitir linhas em branco logo após fechar o raciocínio
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+
+def message_text(message: "BaseMessage") -> str:
+    """Texto de uma mensagem (ou chunk), ignorando partes que não são texto."""
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(part.get("text", "") for part in message.content if isinstance(part, dict))
+
+
+def strip_think(text: str) -> str:
+    """Remove os blocos `<think>...</think>` de um texto completo."""
+    think_filter = ThinkTagFilter()
+    return think_filter.feed(text) + think_filter.flush()
+
+
+def reply_text(messages: list) -> str:
+    """Texto da última resposta do assistente, sem o raciocínio `<think>`."""
+    from langchain_core.messages import AIMessage
+
+    message = messages[-1] if messages else None
+    if isinstance(message, AIMessage):
+        return strip_think(message_text(message))
+    return ""
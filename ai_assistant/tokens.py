@@ -0,0 +1,7 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa barata da quantidade de tokens de um texto (~4 caracteres por token).
+
+    Suficiente para respeitar orçamentos de contexto sem depender do tokenizador do modelo.
+    """
+    return (len(text) + 3) // 4
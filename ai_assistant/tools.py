@@ -1,15 +1,64 @@
 import os
 import json
-from typing import List, Optional
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, TextIO
+
+from langchain_core.tools import BaseTool, tool
+
+from ai_assistant.content_index import ContentIndex
+from ai_assistant.env import EnvConfig, get_env
+from ai_assistant.gitignore import IgnoreMatcher
+from ai_assistant.result_store import ResultStore, count_tree
+from ai_assistant.snapshot import SnapshotInfo, SnapshotStore
+from ai_assistant.tree_index import TreeIndex
+from ai_assistant.tree_usage import aggregate_usage, render_usage
+from ai_assistant.tree_view import find_subtree, render_tree, write_stylized_tree
+from ai_assistant.walker import WalkBudget, cancel_event, walk_tree
+
+# Lista padrão de diretórios/arquivos a serem ignorados
+DEFAULT_IGNORE_DIRS = (
+    '.git',
+    '.venv',
+    'venv',
+    'node_modules',
+    '__pycache__',
+    '.pytest_cache',
+    '.mypy_cache',
+)
+
+@contextmanager
+def _atomic_open(output_path: str) -> Iterator[TextIO]:
+    """
+    Abre um arquivo temporário ao lado de `output_path` e o renomeia para o destino ao final.
 
-from langchain_core.tools import tool
+    Se a escrita falhar no meio, o arquivo de destino anterior (se existir) permanece intacto.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(output_path)[1])
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            yield file
+        # `mkstemp` cria o arquivo com permissão 0600; mantém a do destino ou usa a padrão
+        mode = os.stat(output_path).st_mode & 0o777 if os.path.exists(output_path) else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
 @tool
 def get_resolved_path(path: Optional[str]) -> str:
     """
     Resolve o caminho absoluto de um diretório ou arquivo a partir da home do usuário ou do diretório atual.
     Caso não seja fornecido um caminho, será retornado o caminho absoluto do diretório atual.
-    Caso seja fornecido um caminho, será retornado o caminho absoluto do diretório ou arquivo levando em conta a home do usuário.
+    Caso seja fornecido um caminho relativo, ele é resolvido a partir da home do usuário; caminhos absolutos e
+    iniciados por `~` são mantidos. Componentes como `..` e barras repetidas são normalizados.
     Função necessária para garantir que o caminho fornecido seja válido.
     ideal para ser usada em conjunto com outras funções que requerem um caminho absoluto.
     
@@ -23,175 +72,391 @@ def get_resolved_path(path: Optional[str]) -> str:
     Example:
         get_resolved_path("my_project/teste")
     """
-    resolved_path = os.path.abspath('./') if not path else os.path.expanduser("~") + "/" + path
-    print("get_resolved_path")
-    return resolved_path
+    if not path:
+        return os.path.abspath(os.curdir)
+    # `join` descarta a home quando `path` já é absoluto
+    return os.path.normpath(os.path.join(os.path.expanduser("~"), os.path.expanduser(path)))
 
-@tool
-def get_directory_tree(path: str, ignore_dirs: Optional[List[str]] = None) -> str:
-    """
-    Gera a estrutura em árvore de um diretório no formato JSON (string), ignorando arquivos/diretórios especificados,
-    e considerando arquivos e diretórios listados no arquivo `.gitignore` (se existir).
+def _describe_snapshot(info: SnapshotInfo) -> str:
+    created_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info.created_at))
+    return f"{info.id} ({created_at}, {info.directories} pastas, {info.files} arquivos)"
 
-    Args:
-        path (str): Caminho do diretório a ser explorado.
-        ignore_dirs (Optional[List[str]]): Lista de arquivos/diretórios a serem ignorados (opcional). Se não fornecido,
-                                           serão usados diretórios comuns de ignorados como `.git`, `node_modules`, etc.
 
-    Returns:
-        str: Estrutura do diretório no formato JSON (string).
-        
-    Example:
-        get_directory_tree("/home/thielson/my_project", ["test_dir", "temp_dir"])
+class DirectoryTools:
     """
-    # Lista padrão de diretórios/arquivos a serem ignorados
-
-    default_ignore_dirs = [
-        '.git', 
-        '.venv', 
-        'venv', 
-        'node_modules', 
-        '__pycache__', 
-        '.pytest_cache', 
-        '.mypy_cache'
-    ]
-    
-    # Se ignore_dirs não for fornecido, combina com a lista padrão e o conteúdo do .gitignore
-    if ignore_dirs is None:
-        ignore_dirs = default_ignore_dirs
-        gitignore_path = os.path.join(path, ".gitignore")
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, "r", encoding="utf-8") as f:
-                gitignore_files = [line.strip() for line in f if line.strip() and not line.startswith("#")]
-            ignore_dirs.extend(gitignore_files)
-    else:
-        ignore_dirs = set(ignore_dirs)  # Remove duplicatas
-    
-    # Função interna para construir a árvore
-    def build_tree(current_path: str) -> str:
+    Tools do assistente de diretórios e os stores que elas compartilham, criados a partir de `config`.
+
+    Cada grafo monta o seu conjunto com `build_directory_tools`, então os limites `WALK_*`, o
+    `TREE_VIEW_MAX_TOKENS`, o `RESULT_STORE_*` e os bancos do índice, dos snapshots e da busca
+    são os do `EnvConfig` recebido, e nada é aberto só por importar o módulo.
+    """
+
+    def __init__(self, config: EnvConfig):
+        self.config = config
+        self.tree_index = (
+            TreeIndex(config.TREE_INDEX_PATH, config.TREE_INDEX_MAX_DIRECTORIES) if config.TREE_INDEX_PATH else None
+        )
+        self.snapshot_store = (
+            SnapshotStore(config.SNAPSHOT_DB_PATH, config.SNAPSHOT_KEEP_LAST) if config.SNAPSHOT_DB_PATH else None
+        )
+        self.content_index = ContentIndex(
+            config.CONTENT_INDEX_PATH,
+            max_file_bytes=config.CONTENT_INDEX_MAX_FILE_BYTES,
+            workers=config.CONTENT_INDEX_WORKERS or None,
+            parallel_min_files=config.CONTENT_INDEX_PARALLEL_MIN_FILES,
+        ) if config.CONTENT_INDEX_PATH else None
+        # Árvores completas ficam aqui; o LLM só recebe o handle e um resumo
+        self.result_store = ResultStore(
+            max_nodes=config.RESULT_STORE_MAX_NODES,
+            max_entries=config.RESULT_STORE_MAX_ENTRIES,
+            spill_dir=config.RESULT_STORE_SPILL_DIR,
+            spill_threshold=config.RESULT_STORE_SPILL_THRESHOLD,
+        )
+        methods = [
+            self.get_directory_tree, self.get_directory_usage, self.expand_directory, self.save_json_to_file,
+            self.save_json_structure_as_txt,
+        ]
+        # Tools que dependem de um banco só são oferecidas ao LLM quando ele está configurado
+        if self.snapshot_store is not None:
+            methods += [self.snapshot_directory_tree, self.diff_directory_tree]
+        if self.content_index is not None:
+            methods.append(self.search_directory_content)
+        self.tools: List[BaseTool] = [tool(method) for method in methods]
+
+    def _walk_budget(self, max_depth: Optional[int] = None) -> WalkBudget:
+        """Limites `WALK_*` de uma varredura feita por uma tool; o Ctrl+C do chat a interrompe."""
+        if max_depth is not None and max_depth < 0:
+            raise ValueError(f"max_depth deve ser maior ou igual a 0 (recebido {max_depth}).")
+        return WalkBudget(
+            # Um `max_depth` explícito vale mesmo se for 0 (só a raiz); `WALK_MAX_DEPTH` = 0 desativa o limite
+            max_depth=max_depth if max_depth is not None else self.config.WALK_MAX_DEPTH or None,
+            max_entries=self.config.WALK_MAX_ENTRIES or None,
+            timeout_s=self.config.WALK_TIMEOUT_SECONDS or None,
+            cancel=cancel_event,
+        )
+
+    def get_directory_tree(self, path: str, ignore_dirs: Optional[List[str]] = None, refresh: bool = False,
+                           max_depth: Optional[int] = None) -> str:
         """
-        Constrói recursivamente a árvore de diretórios e arquivos em um formato estruturado.
+        Gera a estrutura em árvore de um diretório, ignorando arquivos/diretórios especificados,
+        e considerando os padrões dos arquivos `.gitignore` encontrados no diretório e em seus subdiretórios.
+
+        A árvore completa fica guardada fora da conversa e é identificada por um `handle`. O retorno mostra um mapa
+        resumido: diretórios grandes aparecem recolhidos com a contagem de pastas e arquivos e podem ser detalhados com
+        `expand_directory`. Para salvar a estrutura em arquivo, passe o `handle` para as tools de salvar, sem copiar a árvore.
+
+        Árvores muito grandes, profundas demais ou lentas de listar são cortadas: o retorno avisa que o resultado é parcial
+        e as pastas que ficaram sem listar aparecem marcadas com `[não listada: motivo]`.
 
         Args:
-            current_path (str): Caminho do diretório atual a ser analisado.
+            path (str): Caminho do diretório a ser explorado.
+            ignore_dirs (Optional[List[str]]): Lista de arquivos/diretórios a serem ignorados (opcional), aceitando padrões
+                                               do `.gitignore` como `*.log` ou `build/`. Se não fornecido, serão usados
+                                               diretórios comuns de ignorados como `.git`, `node_modules`, etc.
+            refresh (bool): Descarta as listagens em cache do diretório e o explora novamente do zero (opcional).
+                            Só é necessário se o usuário disser que o mapa está desatualizado.
+            max_depth (Optional[int]): Quantidade de níveis listados abaixo do diretório (opcional). Útil para ter uma
+                                       visão geral de diretórios enormes, como `/` ou a home; 0 ou 1 listam só o
+                                       próprio diretório.
 
         Returns:
-            dict: Dicionário representando a estrutura de diretórios e arquivos.
+            str: `handle` da árvore, quantidade de pastas e arquivos, um aviso se o resultado for parcial e o mapa
+                 resumido em formato indentado.
+
+        Example:
+            get_directory_tree("/home/thielson/my_project", ["test_dir", "temp_dir"])
         """
-        tree = {"name": os.path.basename(current_path), "children": []}
-        try:
-            entries = os.listdir(current_path)
-            # Filtra os arquivos e diretórios ignorados
-            entries = [entry for entry in entries if entry not in ignore_dirs]
-            
-            # Separando pastas e arquivos
-            directories = sorted([entry for entry in entries if os.path.isdir(os.path.join(current_path, entry))])
-            files = sorted([entry for entry in entries if os.path.isfile(os.path.join(current_path, entry))])
-            
-            # Primeiro adicionamos as pastas, depois os arquivos
-            for directory in directories:
-                tree["children"].append(build_tree(os.path.join(current_path, directory)))
-            for file in files:
-                tree["children"].append({"name": file})
-
-        except PermissionError:
-            pass  # Ignora diretórios sem permissão de acesso
-        return tree
-    result = json.dumps(build_tree(path))
-    return result
+        # Padrões são compilados uma única vez; os `.gitignore` da árvore são lidos durante a varredura
+        matcher = IgnoreMatcher(DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs)
+        if refresh and self.tree_index is not None:
+            self.tree_index.invalidate(path)
+        budget = self._walk_budget(max_depth)
+        tree = walk_tree(path, matcher, index=self.tree_index, budget=budget)
+        directories, files = count_tree(tree)
+        handle = self.result_store.put(tree, directories + files + 1)
+        lines = [f"handle: {handle}", f"{directories} pastas, {files} arquivos"]
+        if budget.skipped:
+            lines.append(budget.describe())
+        lines += ["", render_tree(tree, self.config.TREE_VIEW_MAX_TOKENS)]
+        return "\n".join(lines)
+
+    def get_directory_usage(self, path: str, ignore_dirs: Optional[List[str]] = None, max_depth: int = 2, top_n: int = 10) -> str:
+        """
+        Resume o espaço ocupado por um diretório (como o `du`): tamanho total, quantidade de pastas e arquivos,
+        extensões que mais ocupam espaço, as maiores subárvores e um resumo por pasta até `max_depth` níveis.
+        Use quando o usuário perguntar quais pastas são maiores, quanto espaço algo ocupa ou quantos arquivos há em cada pasta.
 
-@tool
-def save_json_to_file(json_string: str, output_path: str) -> None:
-    """
-    Salva um JSON formatado em string em um arquivo no formato .json.
+        Também retorna um `handle` da árvore, que pode ser usado com `expand_directory` e com as tools de salvar.
 
-    Está é uma função auxiliar, ou seja ela só pode ser chamada depois de alguma outra função, que tenha como retorno uma JSON formatado como string, tenha sido executada
+        Args:
+            path (str): Caminho do diretório.
+            ignore_dirs (Optional[List[str]]): Arquivos/diretórios ignorados (opcional), com a mesma regra de `get_directory_tree`.
+            max_depth (int): Quantidade de níveis de pastas detalhados no resumo (opcional).
+            top_n (int): Quantidade de maiores subárvores e de extensões listadas (opcional).
 
-    Ela poderá ser usada também caso tenha certeza que o que esta sendo passado é no arg json_string seja um JSON (string)
+        Returns:
+            str: `handle` da árvore e o resumo de uso de espaço.
 
-    Só usar essa função caso seja solicitado pelo usuário.
+        Example:
+            get_directory_usage("/home/thielson/my_project", max_depth=1)
+        """
+        matcher = IgnoreMatcher(DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs)
+        # Uma única varredura: os tamanhos vêm do `stat` feito na listagem e são somados na memória
+        budget = self._walk_budget()
+        tree = walk_tree(path, matcher, stats=True, budget=budget)
+        usage = aggregate_usage(tree)
+        root = usage[id(tree)]
+        handle = self.result_store.put(tree, root.directories + root.files + 1)
+        lines = [f"handle: {handle}"]
+        if budget.skipped:
+            lines.append(budget.describe())
+        lines.append(render_usage(tree, usage, max_depth, top_n, self.config.TREE_VIEW_MAX_TOKENS))
+        return "\n".join(lines)
+
+    def _take_snapshot(self, path: str, ignore: List[str], protect: Sequence[str] = ()) -> SnapshotInfo:
+        if self.snapshot_store is None:
+            raise ValueError("Snapshots desativados: configure SNAPSHOT_DB_PATH.")
+        budget = self._walk_budget()
+        tree = walk_tree(path, IgnoreMatcher(ignore), stats=True, budget=budget)
+        # Um snapshot parcial faria as pastas não listadas parecerem removidas no diff
+        if budget.partial:
+            raise ValueError(f"Snapshot não criado: a varredura de {path} não terminou ({budget.summary()}).")
+        return self.snapshot_store.create(os.path.abspath(path), tree, ignore, count_tree(tree), protect=protect)
+
+    def snapshot_directory_tree(self, path: str, ignore_dirs: Optional[List[str]] = None) -> str:
+        """
+        Registra um snapshot de um diretório (nomes, tamanhos e datas de modificação dos arquivos) para comparar depois
+        com `diff_directory_tree`. Use quando o usuário quiser saber o que mudou num diretório ao longo do tempo.
 
-    Args:
-        json_string (str): JSON (string).
-        output_path (str): Caminho do arquivo de saída (.json).
+        Args:
+            path (str): Caminho do diretório.
+            ignore_dirs (Optional[List[str]]): Arquivos/diretórios ignorados (opcional), com a mesma regra de `get_directory_tree`.
 
-    Returns:
-        str: Texto confirmando a criação do arquivo.
-        
-    Example:
-        save_json_to_file("{ 'key' : 'value' }", "path_to_directory/file_name.json")
-    """
-    with open(output_path, "w", encoding="utf-8") as file:
-        file.write(json_string)
-    return f"Arquivo JSON salvo em: {output_path}"
+        Returns:
+            str: Id do novo snapshot e, se houver, o do snapshot anterior do mesmo diretório.
 
-@tool
-def save_json_structure_as_txt(json_string: str, output_path: str) -> None:
-    """
+        Example:
+            snapshot_directory_tree("/home/thielson/my_project")
+        """
+        ignore = list(DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs)
+        info = self._take_snapshot(path, ignore)
+        result = f"snapshot: {_describe_snapshot(info)}"
+        previous = self.snapshot_store.latest(info.root, exclude=info.id)
+        if previous is not None:
+            result += f"\nsnapshot anterior deste diretório: {_describe_snapshot(previous)}"
+        return result
+
+    def diff_directory_tree(self, snapshot_a: str, snapshot_b: Optional[str] = None, max_entries: int = 200) -> str:
+        """
+        Mostra o que mudou entre dois snapshots de `snapshot_directory_tree`: caminhos adicionados (+), removidos (-)
+        e modificados (~). Diretórios novos ou removidos aparecem uma vez, terminados em `/`, sem o seu conteúdo.
 
-    Está função é especifica para converter um em JSON (string) para o formato de texto estilizado e salva em um arquivo `.txt`.
+        Args:
+            snapshot_a (str): Snapshot mais antigo.
+            snapshot_b (Optional[str]): Snapshot mais novo. Se não fornecido, um novo snapshot do mesmo diretório é
+                                        registrado agora (ou seja, compara com o estado atual).
+            max_entries (int): Quantidade máxima de caminhos listados (opcional).
 
-    Está é uma função auxiliar, ou seja ela só pode ser chamada depois de alguma outra função, que tenha como retorno uma JSON formatado como string, tenha sido executada
-    
-    Ela poderá ser usada também caso tenha certeza que o que esta sendo passado é no arg json_string seja um JSON (string)
-    
-    Só usar essa função caso seja solicitado pelo usuário.
+        Returns:
+            str: Resumo das mudanças e a lista de caminhos, relativos à raiz do diretório.
 
-    A estrutura será formatada como uma árvore com linhas e ramas representando a hierarquia de diretórios e arquivos.
+        Example:
+            diff_directory_tree("snap-1a2b3c4d")
+        """
+        if self.snapshot_store is None:
+            raise ValueError("Snapshots desativados: configure SNAPSHOT_DB_PATH.")
+        info_a = self.snapshot_store.get(snapshot_a)
+        # Com o armazenamento cheio, o snapshot novo descartaria justamente `snapshot_a`, o mais antigo
+        info_b = (self.snapshot_store.get(snapshot_b) if snapshot_b
+                  else self._take_snapshot(info_a.root, info_a.ignore, protect=[info_a.id]))
+        diff = self.snapshot_store.diff(info_a.id, info_b.id)
+        lines = [
+            f"{_describe_snapshot(info_a)} -> {_describe_snapshot(info_b)}",
+            f"{len(diff.added)} adicionados, {len(diff.removed)} removidos, {len(diff.modified)} modificados",
+        ]
+        changes = ([f"+ {path}" for path in diff.added] + [f"- {path}" for path in diff.removed]
+                   + [f"~ {path}" for path in diff.modified])
+        if changes:
+            lines.append("")
+            lines.extend(changes[:max_entries])
+            if len(changes) > max_entries:
+                lines.append(f"... e mais {len(changes) - max_entries} mudanças")
+        return "\n".join(lines)
+
+    def search_directory_content(self, path: str, query: str, ignore_dirs: Optional[List[str]] = None, refresh: bool = False,
+                                 max_results: int = 50) -> str:
+        """
+        Busca um texto dentro dos arquivos de um diretório (como um `grep`), usando um índice do conteúdo mantido em disco.
+        Use quando o usuário quiser saber em quais arquivos aparece um nome, função, classe ou trecho de texto.
 
-    Args:
-        json_string (str): JSON (string).
-        output_path (str): Caminho do arquivo de saída (.txt).
-    
-    Returns:
-        str: Texto confirmando a criação do arquivo.
-        
-    Example:
-        save_tree_as_txt("{ 'key' : 'value' }", "path_to_directory/file_name.txt")
-    """
+        A busca não diferencia maiúsculas de minúsculas e encontra trechos que começam no início de uma palavra ou de uma
+        parte de identificador (`directory` encontra `get_directory_tree` e `DirectoryTree`). A primeira busca num diretório
+        o indexa; as seguintes só releem os arquivos modificados.
 
-    def json_to_stylized_text(node: dict, is_last_parent: bool = True, prefix: str = "", is_root: bool = False) -> List[str]:
+        Args:
+            path (str): Caminho do diretório.
+            query (str): Texto procurado.
+            ignore_dirs (Optional[List[str]]): Arquivos/diretórios ignorados (opcional), com a mesma regra de `get_directory_tree`.
+            refresh (bool): Confere de novo os arquivos modificados antes de buscar (opcional). Só é necessário se o
+                            usuário disser que os arquivos acabaram de mudar.
+            max_results (int): Quantidade máxima de linhas retornadas (opcional).
+
+        Returns:
+            str: Quantidade de ocorrências e as linhas encontradas no formato `arquivo:linha: texto`.
+
+        Example:
+            search_directory_content("/home/thielson/my_project", "get_directory_tree")
+        """
+        if self.content_index is None:
+            raise ValueError("Busca de conteúdo desativada: configure CONTENT_INDEX_PATH.")
+        ignore = list(DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs)
+        indexed = self.content_index.indexed_root(path)
+        if indexed is None:
+            self.content_index.update(path, ignore, self._walk_budget())
+        else:
+            # A raiz indexada pode ser um ancestral de `path`; nesse caso mantém os padrões usados nela
+            own_root = indexed.root == os.path.abspath(path)
+            stale = time.time() - indexed.updated_at > self.config.CONTENT_INDEX_MAX_AGE_SECONDS
+            if refresh or stale or (own_root and indexed.ignore != ignore):
+                self.content_index.update(indexed.root, ignore if own_root else indexed.ignore, self._walk_budget())
+        result = self.content_index.search(path, query, max_results=max_results)
+        lines = [
+            f"{len(result.hits)} linhas em {result.files_matched} arquivos "
+            f"({result.candidates} candidatos de {result.indexed_files} arquivos indexados)"
+        ]
+        if result.hits:
+            lines.append("")
+            lines.extend(f"{hit.path}:{hit.line}: {hit.text}" for hit in result.hits)
+            if result.scanned < result.candidates:
+                lines.append(f"... resultados limitados a {max_results} linhas "
+                             f"({result.candidates - result.scanned} arquivos candidatos não conferidos)")
+        return "\n".join(lines)
+
+    def expand_directory(self, handle: str, path: str, max_tokens: Optional[int] = None) -> str:
         """
-        Converte um nó da árvore JSON em um formato estilizado com linhas e ramas.
+        Mostra o conteúdo de um diretório de uma árvore já mapeada por `get_directory_tree`.
+
+        Use quando um diretório aparecer recolhido no mapa (ex.: `src/ (12 pastas, 340 arquivos)`) e for necessário
+        conhecer seu conteúdo. Não percorre o disco novamente.
 
         Args:
-            node (dict): Nó da árvore contendo o nome e os filhos.
-            is_last_parent (bool): Indica se o nó é o último da lista de filhos.
-            prefix (str): Prefixo que indica a profundidade na árvore.
-            is_root (bool): Indica se o nó é a raiz da árvore.
+            handle (str): Handle da árvore retornado por `get_directory_tree`.
+            path (str): Caminho do diretório relativo à raiz mapeada (ex.: "src/components"). Use "" para a raiz.
+            max_tokens (Optional[int]): Tamanho máximo aproximado da resposta em tokens (opcional).
 
         Returns:
-            List[str]: Lista de linhas formatadas representando a estrutura da árvore.
+            str: Estrutura do diretório em formato indentado.
+
+        Example:
+            expand_directory("tree-1a2b3c4d", "src/components")
+        """
+        tree = self.result_store.get(handle)
+        node = find_subtree(tree, path)
+        if node is None:
+            # O modelo às vezes inclui o nome da raiz no caminho
+            root_prefix = tree["name"] + "/"
+            if path.strip("/").startswith(root_prefix):
+                node = find_subtree(tree, path.strip("/")[len(root_prefix):])
+        if node is None:
+            raise ValueError(f"Diretório '{path}' não encontrado na árvore '{handle}'.")
+        return render_tree(node, max_tokens or self.config.TREE_VIEW_MAX_TOKENS)
+
+    def save_json_to_file(self, handle: str, output_path: str) -> None:
         """
-        rama = "├──" if not is_last_parent else "└──"
-        lines = [f"{prefix}{rama} {node['name']}/"] if not is_root else [f"{node['name']}/"]
-        if "children" in node:
-            for i, child in enumerate(node["children"]):
-                is_last = i == len(node["children"]) - 1
-                new_prefix = (f"{prefix}│   " if not is_last_parent else f"{prefix}    ") if not is_root else ""
-                lines.extend(json_to_stylized_text(child, is_last, new_prefix))
-        return lines
+        Salva a estrutura de um diretório em um arquivo no formato .json.
+
+        Está é uma função auxiliar, ou seja ela só pode ser chamada depois de `get_directory_tree` ter sido executada,
+        usando o `handle` retornado por ela.
+
+        Só usar essa função caso seja solicitado pelo usuário.
+
+        Args:
+            handle (str): Handle da árvore retornado por `get_directory_tree`.
+            output_path (str): Caminho do arquivo de saída (.json).
+
+        Returns:
+            str: Texto confirmando a criação do arquivo.
+
+        Example:
+            save_json_to_file("tree-1a2b3c4d", "path_to_directory/file_name.json")
+        """
+        tree = self.result_store.get(handle)
+        with _atomic_open(output_path) as file:
+            json.dump(tree, file)
+        return f"Arquivo JSON salvo em: {output_path}"
+
+    def save_json_structure_as_txt(self, handle: str, output_path: str) -> None:
+        """
+
+        Está função é especifica para converter a estrutura de um diretório para o formato de texto estilizado e salva em um arquivo `.txt`.
+
+        Está é uma função auxiliar, ou seja ela só pode ser chamada depois de `get_directory_tree` ter sido executada,
+        usando o `handle` retornado por ela.
+
+        Só usar essa função caso seja solicitado pelo usuário.
+
+        A estrutura será formatada como uma árvore com linhas e ramas representando a hierarquia de diretórios e arquivos.
+
+        Args:
+            handle (str): Handle da árvore retornado por `get_directory_tree`.
+            output_path (str): Caminho do arquivo de saída (.txt).
+
+        Returns:
+            str: Texto confirmando a criação do arquivo.
+
+        Example:
+            save_json_structure_as_txt("tree-1a2b3c4d", "path_to_directory/file_name.txt")
+        """
+
+        tree = self.result_store.get(handle)
+        with _atomic_open(output_path) as file:
+            write_stylized_tree(tree, file)
+        return f"Estrutura salva em: {output_path}"
+
+
+def build_directory_tools(config: EnvConfig) -> List[BaseTool]:
+    """Tools do assistente de diretórios com os stores e limites de `config`."""
+    return DirectoryTools(config).tools
+
+
+@lru_cache(maxsize=None)
+def get_directory_tools() -> DirectoryTools:
+    """Tools das configurações do ambiente, criadas no primeiro uso."""
+    return DirectoryTools(get_env())
+
+
+_STORES = ("tree_index", "snapshot_store", "content_index", "result_store")
+_TOOLS = (
+    "get_directory_tree", "get_directory_usage", "expand_directory", "save_json_to_file", "save_json_structure_as_txt",
+    "snapshot_directory_tree", "diff_directory_tree", "search_directory_content",
+)
 
-    tree = json.loads(json_string)
-    stylized_lines = json_to_stylized_text(tree, is_root=True)
-    with open(output_path, "w", encoding="utf-8") as file:
-        file.write("\n".join(stylized_lines))
-    return f"Estrutura salva em: {output_path}"
 
+def __getattr__(name: str):
+    # Compatibilidade com `from ai_assistant.tools import map_directory_structure_tree_tools, get_directory_tree`
+    if name == "map_directory_structure_tree_tools":
+        return get_directory_tools().tools
+    if name in _STORES:
+        return getattr(get_directory_tools(), name)
+    if name in _TOOLS:
+        directory_tools = {directory_tool.name: directory_tool for directory_tool in get_directory_tools().tools}
+        if name in directory_tools:
+            return directory_tools[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-map_directory_structure_tree_tools = [get_directory_tree, save_json_to_file, save_json_structure_as_txt]
 
 # Exemplo de uso
 if __name__ == "__main__":
     directory_path = "/home/thielson/personal/ai-assistant"  # Caminho do diretório a ser explorado
     json_output_path = "directory_structure.json"
     txt_output_path = "/home/thielson/personal/ai-assistant/directory_structure.txt"
+    directory_tools = get_directory_tools()
 
-    # Gerar JSON
-    directory_json = get_directory_tree(directory_path)
+    # Mapear o diretório
+    handle = directory_tools.get_directory_tree(directory_path).split("\n", 1)[0].removeprefix("handle: ")
 
     # Salvar JSON
-    # save_json_to_file(directory_json, json_output_path)
+    # directory_tools.save_json_to_file(handle, json_output_path)
 
     # Salvar estrutura em formato .txt estilizado
-    save_json_structure_as_txt(directory_json, txt_output_path)
\ No newline at end of file
+    directory_tools.save_json_structure_as_txt(handle, txt_output_path)
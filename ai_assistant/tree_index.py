@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Diretórios modificados há menos tempo que isso não são gravados no índice: em sistemas
+# de arquivos com mtime de baixa resolução uma alteração logo após a listagem passaria
+# despercebida (mesmo problema do "racy git").
+RACY_WINDOW_NS = 2_000_000_000
+
+# Intervalo mínimo entre atualizações de `last_used` de um mesmo diretório; evita reescrever
+# a subárvore inteira a cada chamada quente só para manter a ordem de descarte.
+LAST_USED_RESOLUTION_S = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path      BLOB PRIMARY KEY,
+    mtime_ns  INTEGER NOT NULL,
+    inode     INTEGER NOT NULL,
+    entries   TEXT NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS directories_last_used ON directories (last_used);
+"""
+
+
+def _key(path: str) -> bytes:
+    """Chave de um diretório no índice: o caminho absoluto em bytes (nomes podem não ser UTF-8)."""
+    return os.fsencode(os.path.abspath(path))
+
+
+def _subtree_range(root: str) -> Tuple[bytes, bytes, bytes]:
+    """Retorna a chave da raiz e o intervalo `[início, fim)` de chaves dos seus descendentes."""
+    key = _key(root)
+    prefix = key.rstrip(b"/") + b"/"
+    # `0` é o byte seguinte a `/`, então o intervalo cobre exatamente os caminhos com o prefixo
+    return key, prefix, prefix[:-1] + b"0"
+
+
+class TreeIndexSession:
+    """
+    Visão do índice durante uma varredura.
+
+    As listagens da subárvore são carregadas de uma só vez no início, para que as threads
+    do walker consultem apenas memória; as listagens novas são acumuladas e gravadas em
+    uma única transação por `TreeIndex.commit`.
+    """
+
+    def __init__(self, rows: Dict[bytes, Tuple[int, int, str]]):
+        self._rows = rows
+        self._updates: List[Tuple[bytes, int, int, str]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, path: str, st: os.stat_result) -> Optional[Tuple[List[str], List[str]]]:
+        """Retorna `(diretórios, arquivos)` de `path` (absoluto) se a listagem em cache ainda for válida."""
+        row = self._rows.get(os.fsencode(path))
+        if row is None or row[0] != st.st_mtime_ns or row[1] != st.st_ino:
+            self.misses += 1
+            return None
+        self.hits += 1
+        directories, files = json.loads(row[2])
+        return directories, files
+
+    def record(self, path: str, st: os.stat_result, directories: List[str], files: List[str]) -> None:
+        """Guarda a listagem de `path` (absoluto), obtida com o `stat` feito antes da leitura."""
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        # `list.append` é atômico, então várias threads podem registrar ao mesmo tempo
+        self._updates.append((os.fsencode(path), st.st_mtime_ns, st.st_ino, json.dumps([directories, files])))
+
+
+class TreeIndex:
+    """
+    Índice persistente (SQLite) das listagens de diretórios usadas por `get_directory_tree`.
+
+    Cada diretório é guardado com seu mtime e inode; numa nova varredura apenas os diretórios
+    cujo mtime mudou são listados novamente. O índice guarda as listagens brutas, antes dos
+    padrões de ignorados, para que mudanças nos `.gitignore` continuem valendo de imediato.
+    Quando passa de `max_directories`, os diretórios usados há mais tempo são descartados.
+    """
+
+    def __init__(self, db_path: str, max_directories: int = 200_000):
+        self.db_path = os.path.expanduser(db_path)
+        self.max_directories = max_directories
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+        return conn
+
+    def open_session(self, root: str) -> TreeIndexSession:
+        """Carrega as listagens em cache de `root` e de todos os seus subdiretórios."""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        key, start, end = _subtree_range(root)
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT path, mtime_ns, inode, entries FROM directories "
+                "WHERE path = ? OR (path >= ? AND path < ?)",
+                (key, start, end),
+            )
+            rows = {path: (mtime_ns, inode, entries) for path, mtime_ns, inode, entries in cursor}
+        finally:
+            conn.close()
+        return TreeIndexSession(rows)
+
+    def commit(self, root: str, session: TreeIndexSession) -> None:
+        """Grava as listagens novas da sessão, marca a subárvore como usada e aplica o limite de tamanho."""
+        key, start, end = _subtree_range(root)
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO directories (path, mtime_ns, inode, entries, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [update + (now,) for update in session._updates],
+                )
+                conn.execute(
+                    "UPDATE directories SET last_used = ? "
+                    "WHERE (path = ? OR (path >= ? AND path < ?)) AND last_used < ?",
+                    (now, key, start, end, now - LAST_USED_RESOLUTION_S),
+                )
+                (count,) = conn.execute("SELECT COUNT(*) FROM directories").fetchone()
+                if count > self.max_directories:
+                    conn.execute(
+                        "DELETE FROM directories WHERE path IN "
+                        "(SELECT path FROM directories ORDER BY last_used LIMIT ?)",
+                        (count - self.max_directories,),
+                    )
+        finally:
+            conn.close()
+
+    def invalidate(self, root: Optional[str] = None) -> None:
+        """Remove do índice a subárvore de `root`, ou o índice inteiro se `root` não for fornecido."""
+        if not os.path.exists(self.db_path):
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                if root is None:
+                    conn.execute("DELETE FROM directories")
+                else:
+                    key, start, end = _subtree_range(root)
+                    conn.execute(
+                        "DELETE FROM directories WHERE path = ? OR (path >= ? AND path < ?)",
+                        (key, start, end),
+                    )
+        finally:
+            conn.close()
@@ -0,0 +1,184 @@
+import heapq
+import os
+from typing import Dict, List, NamedTuple, Tuple
+
+from ai_assistant.tokens import estimate_tokens
+from ai_assistant.tree_view import INDENT
+
+NO_EXTENSION = "(sem extensão)"
+
+
+class UsageStats(NamedTuple):
+    """Totais de uma subárvore (sem contar o próprio diretório)."""
+
+    size: int
+    directories: int
+    files: int
+    # Extensão -> (quantidade de arquivos, tamanho total)
+    extensions: Dict[str, Tuple[int, int]]
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _extension(name: str) -> str:
+    return os.path.splitext(name)[1].lower() or NO_EXTENSION
+
+
+def aggregate_usage(tree: dict) -> Dict[int, UsageStats]:
+    """
+    Soma, de baixo para cima, o tamanho, as pastas, os arquivos e o histograma de extensões de cada diretório.
+
+    Usa o `size` que a varredura (`walk_tree(..., stats=True)`) já guardou em cada arquivo, então
+    não lê o sistema de arquivos de novo.
+
+    Args:
+        tree (dict): Árvore com `size` nos arquivos.
+
+    Returns:
+        Dict[int, UsageStats]: Totais de cada diretório, indexados pelo `id` do nó.
+    """
+    order = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(child for child in node["children"] if "children" in child)
+
+    usage: Dict[int, UsageStats] = {}
+    # Filhos aparecem depois dos pais em `order`, então percorrer ao contrário é pós-ordem
+    for node in reversed(order):
+        size = directories = files = 0
+        extensions: Dict[str, List[int]] = {}
+        for child in node["children"]:
+            if "children" in child:
+                child_usage = usage[id(child)]
+                size += child_usage.size
+                directories += child_usage.directories + 1
+                files += child_usage.files
+                for extension, (count, ext_size) in child_usage.extensions.items():
+                    totals = extensions.setdefault(extension, [0, 0])
+                    totals[0] += count
+                    totals[1] += ext_size
+            else:
+                child_size = child.get("size", 0)
+                size += child_size
+                files += 1
+                totals = extensions.setdefault(_extension(child["name"]), [0, 0])
+                totals[0] += 1
+                totals[1] += child_size
+        usage[id(node)] = UsageStats(size, directories, files,
+                                     {extension: tuple(totals) for extension, totals in extensions.items()})
+    return usage
+
+
+def largest_subtrees(tree: dict, usage: Dict[int, UsageStats], top_n: int) -> List[Tuple[str, UsageStats]]:
+    """Os `top_n` diretórios com mais bytes (como no `du`, um diretório e os seus pais podem aparecer juntos)."""
+    directories = []
+    stack = [(tree, "")]
+    while stack:
+        node, rel_path = stack.pop()
+        for child in node["children"]:
+            if "children" in child:
+                child_path = f"{rel_path}/{child['name']}" if rel_path else child["name"]
+                directories.append((child_path, usage[id(child)]))
+                stack.append((child, child_path))
+    return heapq.nlargest(top_n, directories, key=lambda item: item[1].size)
+
+
+def _top_extensions(stats: UsageStats, limit: int) -> str:
+    """As maiores extensões da subárvore com a sua fração do tamanho (as que não chegam a 1% ficam de fora)."""
+    if not stats.size:
+        return ""
+    ranked = heapq.nlargest(limit, stats.extensions.items(), key=lambda item: item[1][1])
+    return ", ".join(f"{extension} {100 * ext_size / stats.size:.0f}%"
+                     for extension, (_, ext_size) in ranked if ext_size * 100 >= stats.size)
+
+
+def _describe(stats: UsageStats) -> str:
+    return f"{format_size(stats.size)}, {stats.files} arquivos, {stats.directories} pastas"
+
+
+def render_usage(tree: dict, usage: Dict[int, UsageStats], max_depth: int = 2, top_n: int = 10,
+                 max_tokens: int = 1500, max_children: int = 10) -> str:
+    """
+    Resume o uso de espaço de uma árvore: totais, extensões, maiores subárvores e um resumo por profundidade.
+
+    No resumo, as subpastas de cada diretório aparecem da maior para a menor (no máximo `max_children`,
+    as demais somadas numa linha) e os arquivos soltos de cada diretório viram uma única linha.
+    Linhas que passariam de `max_tokens` são cortadas.
+
+    Args:
+        tree (dict): Árvore com `size` nos arquivos.
+        usage (Dict[int, UsageStats]): Totais calculados por `aggregate_usage`.
+        max_depth (int): Profundidade máxima do resumo (1 mostra só os filhos da raiz).
+        top_n (int): Quantidade de maiores subárvores e de extensões listadas.
+        max_tokens (int): Orçamento aproximado de tokens da saída.
+        max_children (int): Máximo de subpastas listadas por diretório.
+
+    Returns:
+        str: Resumo em texto, uma entrada por linha.
+    """
+    root = usage[id(tree)]
+    lines = [f"{tree['name']}/: {_describe(root)} (tamanho aparente dos arquivos)"]
+    if root.extensions:
+        lines.append("")
+        lines.append("Extensões (por tamanho):")
+        ranked = heapq.nlargest(top_n, root.extensions.items(), key=lambda item: item[1][1])
+        lines.extend(f"{INDENT}{extension}: {count} arquivos, {format_size(ext_size)}"
+                     for extension, (count, ext_size) in ranked)
+        if len(root.extensions) > len(ranked):
+            rest = sum(ext_size for _, (_, ext_size) in root.extensions.items()) - sum(item[1][1] for item in ranked)
+            lines.append(f"{INDENT}... (+{len(root.extensions) - len(ranked)} extensões, {format_size(rest)})")
+
+    largest = largest_subtrees(tree, usage, top_n)
+    if largest:
+        lines.append("")
+        lines.append("Maiores subárvores:")
+        lines.extend(f"{INDENT}{path}/: {_describe(stats)}" for path, stats in largest)
+
+    lines.append("")
+    lines.append(f"Resumo até a profundidade {max_depth}:")
+    used = sum(estimate_tokens(line) + 1 for line in lines)
+    # Pré-ordem com pilha explícita: cada item é uma linha pronta ou um diretório a detalhar
+    stack: List[Tuple[str, object, int]] = [("directory", tree, 1)]
+    while stack:
+        kind, item, depth = stack.pop()
+        if kind == "line":
+            cost = estimate_tokens(item) + 1
+            if used + cost > max_tokens:
+                lines.append("... (resumo cortado pelo limite de tokens; use um `max_depth` menor ou um subdiretório)")
+                break
+            used += cost
+            lines.append(item)
+            continue
+        stack.extend(reversed(_summary_items(item, depth, usage, max_depth, max_children)))
+    return "\n".join(lines)
+
+
+def _summary_items(node: dict, depth: int, usage: Dict[int, UsageStats], max_depth: int, max_children: int
+                   ) -> List[Tuple[str, object, int]]:
+    """Linhas de um diretório no resumo: subpastas da maior para a menor, cada uma seguida do seu detalhamento."""
+    prefix = INDENT * depth
+    subdirectories = sorted((child for child in node["children"] if "children" in child),
+                            key=lambda child: usage[id(child)].size, reverse=True)
+    items: List[Tuple[str, object, int]] = []
+    for child in subdirectories[:max_children]:
+        stats = usage[id(child)]
+        extensions = _top_extensions(stats, 3)
+        line = f"{prefix}{child['name']}/: {_describe(stats)}" + (f" [{extensions}]" if extensions else "")
+        items.append(("line", line, depth))
+        if depth < max_depth:
+            items.append(("directory", child, depth + 1))
+    if len(subdirectories) > max_children:
+        rest = subdirectories[max_children:]
+        items.append(("line", f"{prefix}... (+{len(rest)} pastas, {format_size(sum(usage[id(c)].size for c in rest))})",
+                      depth))
+    files = [child.get("size", 0) for child in node["children"] if "children" not in child]
+    if files:
+        items.append(("line", f"{prefix}(arquivos soltos: {len(files)}, {format_size(sum(files))})", depth))
+    return items
@@ -0,0 +1,165 @@
+from collections import deque
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from ai_assistant.tokens import estimate_tokens
+from ai_assistant.walker import SKIP_REASONS
+
+INDENT = "  "
+
+
+def _subtree_counts(tree: dict) -> Dict[int, Tuple[int, int]]:
+    """Calcula, para cada diretório (por `id`), o total de pastas e arquivos da sua subárvore."""
+    order = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(child for child in node["children"] if "children" in child)
+
+    counts: Dict[int, Tuple[int, int]] = {}
+    # Filhos aparecem depois dos pais em `order`, então percorrer ao contrário é pós-ordem
+    for node in reversed(order):
+        directories = files = 0
+        for child in node["children"]:
+            if "children" in child:
+                child_dirs, child_files = counts[id(child)]
+                directories += child_dirs + 1
+                files += child_files
+            else:
+                files += 1
+        counts[id(node)] = (directories, files)
+    return counts
+
+
+def _directory_label(node: dict) -> str:
+    # Diretórios que a varredura não listou (limites ou ciclos) não podem parecer vazios
+    reason = node.get("truncated")
+    return f"{node['name']}/ [não listada: {SKIP_REASONS[reason]}]" if reason else f"{node['name']}/"
+
+
+def _collapsed_label(node: dict, counts: Dict[int, Tuple[int, int]]) -> str:
+    directories, files = counts[id(node)]
+    if not directories and not files:
+        return _directory_label(node)
+    return f"{_directory_label(node)} ({directories} pastas, {files} arquivos)"
+
+
+def _child_lines(node: dict, depth: int, counts: Dict[int, Tuple[int, int]], max_children: int) -> List[str]:
+    """Linhas dos filhos de `node` com todos os subdiretórios recolhidos."""
+    prefix = INDENT * depth
+    children = node["children"]
+    lines = [
+        prefix + (_collapsed_label(child, counts) if "children" in child else child["name"])
+        for child in children[:max_children]
+    ]
+    if len(children) > max_children:
+        lines.append(f"{prefix}... (+{len(children) - max_children} entradas)")
+    return lines
+
+
+def render_tree(tree: dict, max_tokens: int, max_children: int = 50) -> str:
+    """
+    Renderiza uma árvore em formato indentado compacto, limitado a `max_tokens`.
+
+    Os diretórios são expandidos em largura (primeiro os níveis mais rasos) enquanto couberem
+    no orçamento, e o primeiro nível é sempre listado. Os que não couberem aparecem recolhidos
+    com a contagem de pastas e arquivos e podem ser detalhados depois com `expand_directory`.
+    Diretórios com mais de `max_children` entradas mostram só as primeiras.
+
+    Args:
+        tree (dict): Árvore gerada por `walk_tree` (ou uma subárvore dela).
+        max_tokens (int): Orçamento aproximado de tokens da saída.
+        max_children (int): Máximo de entradas listadas por diretório.
+
+    Returns:
+        str: Árvore renderizada, uma entrada por linha.
+    """
+    counts = _subtree_counts(tree)
+    expanded = set()
+    used = estimate_tokens(tree["name"]) + 1
+    queue = deque([(tree, 1)])
+    while queue:
+        node, depth = queue.popleft()
+        lines = _child_lines(node, depth, counts, max_children)
+        cost = sum(estimate_tokens(line) + 1 for line in lines)
+        # A raiz é sempre expandida; os demais ficam recolhidos se não couberem,
+        # mas diretórios menores ainda podem caber depois deles
+        if used + cost > max_tokens and node is not tree:
+            continue
+        used += cost
+        expanded.add(id(node))
+        queue.extend((child, depth + 1) for child in node["children"][:max_children] if "children" in child)
+
+    lines = []
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if "children" not in node:
+            lines.append(INDENT * depth + node["name"])
+            continue
+        if id(node) not in expanded:
+            lines.append(INDENT * depth + _collapsed_label(node, counts))
+            continue
+        lines.append(INDENT * depth + _directory_label(node))
+        children = node["children"]
+        if len(children) > max_children:
+            stack.append(({"name": f"... (+{len(children) - max_children} entradas)"}, depth + 1))
+        stack.extend((child, depth + 1) for child in reversed(children[:max_children]))
+    return "\n".join(lines)
+
+
+def find_subtree(tree: dict, path: str) -> Optional[dict]:
+    """
+    Localiza um diretório pelo caminho relativo à raiz da árvore (`""` ou `"."` para a própria raiz).
+
+    Returns:
+        Optional[dict]: Nó do diretório, ou `None` se não existir.
+    """
+    node = tree
+    for part in path.strip("/").split("/"):
+        if part in ("", "."):
+            continue
+        node = next((child for child in node["children"] if child["name"] == part and "children" in child), None)
+        if node is None:
+            return None
+    return node
+
+
+def iter_stylized_lines(tree: dict) -> Iterator[str]:
+    """
+    Gera, linha a linha, a árvore no formato estilizado com linhas e ramas (`├──`, `└──`).
+
+    Usa uma pilha explícita em vez de recursão, então a profundidade da árvore não é limitada
+    pelo limite de recursão do Python e nenhuma lista intermediária de linhas é montada.
+
+    Args:
+        tree (dict): Árvore gerada por `walk_tree`.
+
+    Yields:
+        str: Linhas da árvore, sem quebra de linha.
+    """
+    yield f"{tree['name']}/"
+    # Cada quadro guarda [filhos, próximo índice, prefixo dos filhos]
+    stack = [[tree.get("children") or [], 0, ""]]
+    while stack:
+        frame = stack[-1]
+        children, i, prefix = frame
+        if i == len(children):
+            stack.pop()
+            continue
+        frame[1] = i + 1
+        child = children[i]
+        is_last = i == len(children) - 1
+        rama = "└──" if is_last else "├──"
+        yield f"{prefix}{rama} {child['name']}/"
+        grandchildren = child.get("children")
+        if grandchildren:
+            stack.append([grandchildren, 0, prefix + ("    " if is_last else "│   ")])
+
+
+def write_stylized_tree(tree: dict, file: TextIO) -> None:
+    """Escreve a árvore estilizada em `file` de forma incremental, sem quebra de linha no final."""
+    lines = iter_stylized_lines(tree)
+    file.write(next(lines))
+    for line in lines:
+        file.write("\n" + line)
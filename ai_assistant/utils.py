@@ -1,5 +1,9 @@
+import asyncio
+from typing import Optional
+
 from langchain_core.messages import ToolMessage
-from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import patch_config
 from langgraph.prebuilt import ToolNode
 
 def handle_tool_error(state) -> dict:
@@ -10,14 +14,58 @@ def handle_tool_error(state) -> dict:
             ToolMessage(
                 content=f'Error: {repr(error)}\n please fix your mistakes.',
                 tool_call_id=tc['id'],
+                name=tc['name'],
+                status='error',
             )
             for tc in tool_calls
         ]
     }
 
 
-def create_tool_node_with_fallback(tools: list) -> dict:
-    return ToolNode(tools).with_fallbacks(
+class BoundedToolNode:
+    """Executa as tool calls de uma mensagem em paralelo, no máximo `max_concurrency` por vez.
+
+    Envolve um `ToolNode` usando só a sua interface pública (`invoke`/`ainvoke`). No modo
+    síncrono o limite vai no `max_concurrency` do config, que o pool de threads do `ToolNode`
+    já respeita. No assíncrono o `ToolNode` dispara todas as chamadas de uma vez, então, quando
+    há mais chamadas que o limite, cada uma é executada separadamente sob um semáforo; tools
+    assíncronas continuam rodando no event loop e as síncronas no executor do LangChain.
+    """
+
+    def __init__(self, tools: list, *, max_concurrency: Optional[int] = None, **kwargs):
+        self.tool_node = ToolNode(tools, **kwargs)
+        self.max_concurrency = max_concurrency
+
+    def invoke(self, state, config: RunnableConfig):
+        if self.max_concurrency:
+            config = patch_config(config, max_concurrency=self.max_concurrency)
+        return self.tool_node.invoke(state, config)
+
+    async def ainvoke(self, state, config: RunnableConfig):
+        key = self.tool_node.messages_key
+        message = state[key][-1] if isinstance(state, dict) and state.get(key) else None
+        tool_calls = getattr(message, "tool_calls", None) or []
+        if not self.max_concurrency or len(tool_calls) <= self.max_concurrency:
+            return await self.tool_node.ainvoke(state, config)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(tool_call: dict):
+            # O mesmo estado, mas com a última mensagem pedindo só esta tool call
+            single = message.model_copy(update={"tool_calls": [tool_call]})
+            async with semaphore:
+                return await self.tool_node.ainvoke({**state, key: [*state[key][:-1], single]}, config)
+
+        outputs = await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls))
+        if all(isinstance(output, dict) for output in outputs):
+            return {key: [tool_message for output in outputs for tool_message in output[key]]}
+        # Com `Command` o `ToolNode` devolve uma lista de atualizações, que o LangGraph aplica em ordem
+        return [update for output in outputs for update in (output if isinstance(output, list) else [output])]
+
+
+def create_tool_node_with_fallback(tools: list, max_concurrency: Optional[int] = None) -> Runnable:
+    node = BoundedToolNode(tools, max_concurrency=max_concurrency)
+    return RunnableLambda(node.invoke, afunc=node.ainvoke, name="tools").with_fallbacks(
         [RunnableLambda(handle_tool_error)], exception_key='error'
     )
 
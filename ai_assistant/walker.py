@@ -0,0 +1,294 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ai_assistant.gitignore import IgnoreMatcher
+from ai_assistant.tree_index import TreeIndex, TreeIndexSession
+
+# Em sistemas de arquivos de rede a latência de cada listagem domina o tempo
+# total, então vale manter mais threads do que núcleos.
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Sinalizado pelo Ctrl+C do chat: as varreduras em andamento param e devolvem a árvore parcial
+cancel_event = threading.Event()
+
+# Motivos pelos quais um diretório fica sem ser listado (valor de `"truncated"` no nó)
+SKIP_REASONS = {
+    "max_depth": "profundidade máxima",
+    "max_entries": "limite de entradas",
+    "deadline": "tempo esgotado",
+    "cancelled": "varredura cancelada",
+    "cycle": "ciclo de links simbólicos",
+}
+
+
+class WalkBudget:
+    """
+    Limites de uma varredura: profundidade, total de entradas, tempo e cancelamento.
+
+    Quando um limite é atingido a varredura para de listar diretórios e devolve a árvore parcial.
+    Os diretórios que ficaram sem listar recebem `"truncated"` com o motivo (veja `SKIP_REASONS`)
+    e são contados em `skipped`; os limites valem para uma varredura de cada vez.
+
+    Args:
+        max_depth (Optional[int]): Níveis listados abaixo da raiz (0 ou 1 listam só a raiz).
+        max_entries (Optional[int]): Entradas listadas antes de parar; pode passar um pouco, já que
+                                     cada diretório começado é listado por inteiro.
+        timeout_s (Optional[float]): Tempo máximo da varredura, em segundos.
+        cancel (Optional[threading.Event]): Interrompe a varredura quando sinalizado.
+    """
+
+    def __init__(self, max_depth: Optional[int] = None, max_entries: Optional[int] = None,
+                 timeout_s: Optional[float] = None, cancel: Optional[threading.Event] = None):
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self.timeout_s = timeout_s
+        self.cancel = cancel
+        self.deadline: Optional[float] = None
+        self.entries = 0
+        self.skipped: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.deadline = time.monotonic() + self.timeout_s if self.timeout_s is not None else None
+        self.entries = 0
+        self.skipped.clear()
+
+    @property
+    def partial(self) -> bool:
+        """Se algum limite interrompeu a varredura (diretórios pulados por ciclos não contam)."""
+        return any(reason != "cycle" for reason in self.skipped)
+
+    def stop_reason(self) -> Optional[str]:
+        if self.cancel is not None and self.cancel.is_set():
+            return "cancelled"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        if self.max_entries is not None and self.entries >= self.max_entries:
+            return "max_entries"
+        return None
+
+    def add_entries(self, count: int) -> None:
+        with self._lock:
+            self.entries += count
+
+    def skip(self, node: dict, reason: str) -> None:
+        node["truncated"] = reason
+        with self._lock:
+            self.skipped[reason] += 1
+
+    def summary(self) -> str:
+        """Diretórios pulados por motivo, ex.: `limite de entradas: 12, ciclo de links simbólicos: 1`."""
+        return ", ".join(f"{SKIP_REASONS[reason]}: {count}" for reason, count in self.skipped.most_common())
+
+    def describe(self) -> str:
+        """Aviso de resultado parcial para as tools (vazio se nenhum diretório foi pulado)."""
+        if not self.skipped:
+            return ""
+        prefix = "Resultado parcial" if self.partial else "Aviso"
+        return f"{prefix}: {sum(self.skipped.values())} pastas não listadas ({self.summary()})."
+
+
+def _list_directory(path: str, st: os.stat_result, index: Optional[TreeIndexSession], stats: bool = False
+                    ) -> Tuple[List[str], List[str], Optional[Dict[str, Tuple[int, int]]]]:
+    """
+    Retorna os nomes de subdiretórios e arquivos de `path`, na ordem do sistema de arquivos,
+    e, se `stats` for verdadeiro, o tamanho e o mtime (ns) de cada arquivo.
+
+    Usa `os.scandir` para aproveitar o tipo de cada entrada já retornado pelo sistema,
+    evitando um `stat` extra por arquivo quando `stats` é falso. Com um índice, o `stat`
+    do diretório (`st`) basta quando seu mtime não mudou desde a última listagem.
+    """
+    if index is not None:
+        cached = index.lookup(path, st)
+        if cached is not None:
+            return cached + (None,)
+
+    directories = []
+    files = []
+    file_stats = {} if stats else None
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    directories.append(entry.name)
+                elif entry.is_file():
+                    if file_stats is not None:
+                        entry_st = entry.stat()
+                        file_stats[entry.name] = (entry_st.st_size, entry_st.st_mtime_ns)
+                    files.append(entry.name)
+            except OSError:
+                pass  # Entrada removida ou inacessível durante a listagem
+
+    if index is not None:
+        index.record(path, st, directories, files)
+    return directories, files, file_stats
+
+
+def _scan_directory(node: dict, path: str, rel_dir: str, matcher: Optional[IgnoreMatcher], depth: int,
+                    ancestors: Tuple[Tuple[int, int], ...], index: Optional[TreeIndexSession], budget: WalkBudget,
+                    stats: bool = False) -> List[tuple]:
+    """
+    Lista um único diretório e preenche os filhos do nó correspondente.
+
+    Se o diretório tiver um `.gitignore`, seus padrões passam a valer para ele e para toda a subárvore.
+    Links simbólicos para diretórios são seguidos, mas um diretório que já é ancestral dele mesmo
+    no caminho percorrido (mesmo `st_dev` e `st_ino`) não é listado de novo.
+
+    Args:
+        node (dict): Nó da árvore que receberá os filhos.
+        path (str): Caminho do diretório a ser listado.
+        rel_dir (str): Caminho do diretório relativo à raiz da varredura.
+        matcher (Optional[IgnoreMatcher]): Regras de arquivos/diretórios a serem ignorados.
+        depth (int): Profundidade do diretório (0 para a raiz).
+        ancestors (Tuple[Tuple[int, int], ...]): `(st_dev, st_ino)` dos diretórios acima dele no caminho.
+        index (Optional[TreeIndexSession]): Índice persistente de listagens (opcional).
+        budget (WalkBudget): Limites da varredura.
+        stats (bool): Inclui `size` e `mtime_ns` nos nós dos arquivos.
+
+    Returns:
+        List[tuple]: Subdiretórios que ainda precisam ser explorados, com os mesmos argumentos desta função.
+    """
+    try:
+        st = os.stat(path)
+        key = (st.st_dev, st.st_ino)
+        if key in ancestors:
+            budget.skip(node, "cycle")
+            return []
+        directories, files, file_stats = _list_directory(path, st, index, stats)
+    except PermissionError:
+        return []  # Ignora diretórios sem permissão de acesso
+
+    if matcher is not None:
+        if ".gitignore" in files:
+            matcher = matcher.with_gitignore(os.path.join(path, ".gitignore"), rel_dir)
+        if matcher:
+            prefix = rel_dir + "/" if rel_dir else ""
+            directories = [name for name in directories if not matcher.is_ignored(prefix + name, True)]
+            files = [name for name in files if not matcher.is_ignored(prefix + name, False)]
+
+    directories.sort()
+    files.sort()
+
+    budget.add_entries(len(directories) + len(files))
+    # Abaixo da profundidade máxima as pastas aparecem, mas sem o conteúdo
+    listed = budget.max_depth is None or depth + 1 < budget.max_depth
+    ancestors += (key,)
+
+    # Primeiro adicionamos as pastas, depois os arquivos
+    children = node["children"]
+    pending = []
+    for directory in directories:
+        child = {"name": directory, "children": []}
+        children.append(child)
+        if not listed:
+            budget.skip(child, "max_depth")
+            continue
+        pending.append((child, os.path.join(path, directory), f"{rel_dir}/{directory}" if rel_dir else directory,
+                        matcher, depth + 1, ancestors))
+    if file_stats is None:
+        children.extend({"name": file} for file in files)
+    else:
+        children.extend({"name": file, "size": file_stats[file][0], "mtime_ns": file_stats[file][1]}
+                        for file in files)
+    return pending
+
+
+class _Walk:
+    """
+    Estado compartilhado de uma varredura.
+
+    Cada tarefa percorre sua subárvore em profundidade na própria thread e só repassa
+    subdiretórios ao pool enquanto houver threads ociosas, evitando o custo de agendar
+    uma tarefa por diretório em árvores com muitos diretórios pequenos.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, max_workers: int, index: Optional[TreeIndexSession],
+                 budget: WalkBudget, stats: bool = False):
+        self.executor = executor
+        self.max_workers = max_workers
+        self.index = index
+        self.budget = budget
+        self.stats = stats
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.finished = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def submit(self, task: tuple) -> None:
+        with self.lock:
+            self.outstanding += 1
+        self.executor.submit(self.run, task)
+
+    def run(self, task: tuple) -> None:
+        stack: Deque[tuple] = deque([task])
+        try:
+            while stack and self.error is None:
+                reason = self.budget.stop_reason()
+                if reason is not None:
+                    # Tudo o que ainda estava na fila fica marcado na árvore parcial
+                    for pending in stack:
+                        self.budget.skip(pending[0], reason)
+                    break
+                stack.extend(_scan_directory(*stack.pop(), self.index, self.budget, self.stats))
+                # Entrega as subárvores mais rasas (as maiores) para threads ociosas
+                while len(stack) > 1 and self.outstanding < self.max_workers:
+                    self.submit(stack.popleft())
+        except BaseException as e:
+            self.error = self.error or e
+        with self.lock:
+            self.outstanding -= 1
+            if self.outstanding == 0:
+                self.finished.set()
+
+
+def walk_tree(path: str, matcher: Optional[IgnoreMatcher] = None, max_workers: Optional[int] = None,
+              index: Optional[TreeIndex] = None, stats: bool = False, budget: Optional[WalkBudget] = None) -> dict:
+    """
+    Constrói a árvore de diretórios e arquivos a partir de `path`.
+
+    Os diretórios são listados por um pool de threads limitado, de modo que subárvores
+    irmãs são exploradas em paralelo. A ordem do resultado é a mesma de uma busca
+    recursiva: pastas ordenadas primeiro, depois arquivos ordenados.
+    Diretórios ignorados são podados antes de serem listados.
+
+    Args:
+        path (str): Caminho do diretório a ser explorado.
+        matcher (Optional[IgnoreMatcher]): Regras de arquivos/diretórios a serem ignorados. Quando
+                                           fornecido, os `.gitignore` encontrados na árvore também são aplicados.
+        max_workers (Optional[int]): Número máximo de threads. Padrão: `DEFAULT_MAX_WORKERS`.
+        index (Optional[TreeIndex]): Índice persistente; apenas diretórios alterados desde a
+                                     última varredura são listados novamente.
+        stats (bool): Inclui `size` e `mtime_ns` em cada arquivo. Como o índice não guarda esses
+                      dados, com `stats` ele não é usado.
+        budget (Optional[WalkBudget]): Limites da varredura; depois dela, `budget.skipped` diz quantos
+                                       diretórios ficaram sem listar e por quê. Padrão: sem limites.
+
+    Returns:
+        dict: Dicionário representando a estrutura de diretórios e arquivos.
+    """
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    budget = budget or WalkBudget()
+    budget.start()
+    root = {"name": os.path.basename(path), "children": []}
+    session = None
+    if stats:
+        index = None
+    if index is not None:
+        # As chaves do índice são caminhos absolutos
+        path = os.path.abspath(path)
+        session = index.open_session(path)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="walker") as executor:
+        walk = _Walk(executor, max_workers, session, budget, stats)
+        walk.submit((root, path, "", matcher, 0, ()))
+        walk.finished.wait()
+    if walk.error is not None:
+        raise walk.error
+
+    if index is not None:
+        index.commit(path, session)
+    return root
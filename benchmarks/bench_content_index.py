@@ -0,0 +1,130 @@
+"""
+Benchmark do índice de conteúdo (`ai_assistant.content_index`) usado por `search_directory_content`.
+
+Gera uma árvore de arquivos de texto com identificadores sintéticos e mede a indexação
+completa (num só processo e em paralelo), a atualização incremental depois de alterar alguns
+arquivos e a latência das buscas, comparada com uma varredura de todos os arquivos (como um
+`grep`). Confere que o índice acha todos os arquivos em que a consulta aparece no início de uma
+palavra e nenhum em que ela não aparece.
+
+Uso:
+    python benchmarks/bench_content_index.py --files 5000 --changes 20
+"""
+import argparse
+import itertools
+import os
+import random
+import re
+import shutil
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_assistant.content_index import ContentIndex  # noqa: E402
+from benchmarks.bench_walker import generate_tree  # noqa: E402
+
+
+def _files(root: str):
+    for directory, _, files in os.walk(root):
+        for name in files:
+            yield os.path.join(directory, name)
+
+
+def fill_files(root: str, lines: int, vocabulary: int, seed: int = 0):
+    """Escreve em cada arquivo `lines` linhas de identificadores (frequência de Zipf); retorna o vocabulário."""
+    rng = random.Random(seed)
+    parts = sorted({"".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(vocabulary // 4)})
+    words = []
+    for _ in range(vocabulary):
+        picked = rng.sample(parts, rng.randint(1, 3))
+        # snake_case e camelCase, como em código de verdade
+        words.append("_".join(picked) if rng.random() < 0.5 else picked[0] + "".join(p.title() for p in picked[1:]))
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    for path in _files(root):
+        with open(path, "w") as file:
+            for _ in range(lines):
+                file.write(" = ".join(rng.choices(words, cum_weights=cum_weights, k=3)) + "\n")
+    return words
+
+
+def grep(root: str, query: str, word_start: bool = False):
+    """Arquivos com `query` (sem diferenciar maiúsculas), lendo a árvore inteira; opcionalmente só no início de palavras."""
+    prefix = rb"(?<![A-Za-z0-9\x80-\xff])" if word_start else b""
+    pattern = re.compile(prefix + re.escape(query.encode("utf-8")), re.IGNORECASE)
+    matched = set()
+    for path in _files(root):
+        with open(path, "rb") as file:
+            if pattern.search(file.read()):
+                matched.add(os.path.relpath(path, root))
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_content_index_")
+    try:
+        root = os.path.join(workdir, "tree")
+        os.mkdir(root)
+        # 25 arquivos e 8 subpastas por pasta
+        generate_tree(root, args.files * 33 // 25, fanout=8, files_per_dir=25)
+        words = fill_files(root, args.lines, args.vocabulary)
+        files = sorted(_files(root))
+        print(f"{len(files)} arquivos, {sum(os.path.getsize(path) for path in files) / 1e6:.1f} MB")
+        # Fora da janela "racy": os arquivos recém-escritos já podem ter o mtime guardado
+        past = time.time() - 10
+        for path in files:
+            os.utime(path, (past, past))
+
+        for workers in sorted({1, args.workers}):
+            index = ContentIndex(os.path.join(workdir, f"index_{workers}.sqlite"), workers=workers,
+                                 parallel_min_files=1)
+            stats = index.update(root)
+            print(f"indexação completa ({workers} processo(s)): {stats.seconds:.2f}s, {stats.indexed} arquivos")
+
+        unchanged = index.update(root)
+        print(f"atualização sem mudanças: {unchanged.seconds * 1000:.0f} ms ({unchanged.unchanged} inalterados)")
+
+        rng = random.Random(1)
+        for i, path in enumerate(rng.sample(files, min(len(files), args.changes))):
+            with open(path, "a") as file:
+                file.write(f"marcador_unico_{i} = {i}\n")
+            os.utime(path, (past + 1, past + 1))
+        changed = index.update(root)
+        print(f"atualização incremental: {changed.seconds * 1000:.0f} ms ({changed.indexed} arquivos relidos)")
+
+        # Palavras inteiras, começos de palavras e uma consulta muito frequente
+        sample = rng.sample(words, args.queries)
+        queries = ["marcador_unico_1", words[0][:3]] + sample[::2] + [word[:len(word) // 2 + 2] for word in sample[1::2]]
+        index_ms, grep_ms = [], []
+        for query in queries:
+            start = time.perf_counter()
+            result = index.search(root, query, max_results=10**9, max_per_file=1)
+            index_ms.append(1000 * (time.perf_counter() - start))
+            start = time.perf_counter()
+            expected = grep(root, query)
+            grep_ms.append(1000 * (time.perf_counter() - start))
+            # O índice acha as ocorrências no início de palavras (e de partes de identificadores), e só ocorrências reais
+            found = {hit.path for hit in result.hits}
+            if not grep(root, query, word_start=True) <= found <= expected:
+                print(f"resultado inconsistente com a varredura para '{query}'", file=sys.stderr)
+                sys.exit(1)
+        print(f"busca pelo índice: mediana {statistics.median(index_ms):.1f} ms, máximo {max(index_ms):.1f} ms")
+        print(f"varredura completa: mediana {statistics.median(grep_ms):.1f} ms, máximo {max(grep_ms):.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
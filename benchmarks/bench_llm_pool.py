@@ -0,0 +1,97 @@
+"""
+Benchmark do pool de LLMs (`ai_assistant.llm_pool`) contra stubs locais (`stub_llm_server.py`).
+
+Sobe três provedores falsos: um rápido mas instável (Groq), um lento e estável (Ollama) e um
+fora do ar (porta fechada). Faz chamadas em sequência (normais e em streaming) e mostra a
+latência vista pelo cliente, quantas chamadas cada provedor atendeu, a latência média (EWMA)
+aprendida e as conexões abertas em cada stub (keep-alive: bem menos conexões que requisições).
+
+Uso:
+    python benchmarks/bench_llm_pool.py
+    python benchmarks/bench_llm_pool.py --calls 200 --fail-rate 0.3
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_llm_server import StubLLMServer  # noqa: E402
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--fast-latency", type=float, default=0.02)
+    parser.add_argument("--slow-latency", type=float, default=0.1)
+    parser.add_argument("--fail-rate", type=float, default=0.2, help="Taxa de falhas do provedor rápido.")
+    args = parser.parse_args()
+
+    from ai_assistant.env import EnvConfig, LLMProviderConfig
+    from ai_assistant.llm_pool import LLMPoolError, build_llm_pool
+
+    fast = StubLLMServer(latency_s=args.fast_latency, fail_rate=args.fail_rate).start()
+    slow = StubLLMServer(latency_s=args.slow_latency).start()
+    config = EnvConfig(
+        AI_API_KEY="bench",
+        LLM_PROVIDERS=[
+            LLMProviderConfig(kind="groq", model="stub", name="fast", base_url=fast.url),
+            LLMProviderConfig(kind="ollama", model="stub", name="slow", base_url=slow.url),
+            LLMProviderConfig(kind="groq", model="stub", name="down", base_url=f"http://127.0.0.1:{_closed_port()}"),
+        ],
+        LLM_TIMEOUT_SECONDS=5,
+        # Pausa curta para o provedor rápido voltar logo depois das falhas
+        LLM_FAILURE_COOLDOWN_SECONDS=0.2,
+        LLM_BACKOFF_SECONDS=0.05,
+    )
+    pool = build_llm_pool(config)
+
+    results = {}
+    for mode in ("invoke", "stream"):
+        latencies, served, errors = [], {}, 0
+        for i in range(args.calls):
+            start = time.perf_counter()
+            try:
+                if mode == "invoke":
+                    message = pool.invoke(f"pergunta {i}")
+                else:
+                    message = None
+                    for chunk in pool.stream(f"pergunta {i}"):
+                        message = chunk if message is None else message + chunk
+            except LLMPoolError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            backend = message.response_metadata.get("llm_pool_backend")
+            served[backend] = served.get(backend, 0) + 1
+        ordered = sorted(latencies)
+        results[mode] = {
+            "p50_ms": 1000 * statistics.median(ordered) if ordered else None,
+            "p95_ms": 1000 * ordered[int(0.95 * (len(ordered) - 1))] if ordered else None,
+            "served": served,
+            "errors": errors,
+        }
+
+    results["backends"] = pool.stats()
+    results["stubs"] = {
+        name: {"requests": stub.requests, "connections": stub.connections, "failures": stub.failures}
+        for name, stub in (("fast", fast), ("slow", slow))
+    }
+    print(json.dumps(results, indent=2))
+    fast.shutdown()
+    slow.shutdown()
+
+
+if __name__ == "__main__":
+    main()
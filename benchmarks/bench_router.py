@@ -0,0 +1,86 @@
+"""
+Avaliação do roteador local (`ai_assistant.router`) contra exemplos rotulados.
+
+Mostra, para cada `threshold`, a acurácia, a precisão e a cobertura de `evaluate()`
+(fração dos pedidos de mapeamento que seguiriam pelo caminho rápido), e o tempo de
+classificação medido pelo próprio `RouterMetrics`. Sem `--examples`, usa o conjunto
+embutido abaixo; o arquivo é um JSONL com `{"text": ..., "map": true/false}` por linha.
+
+Uso:
+    python benchmarks/bench_router.py
+    python benchmarks/bench_router.py --examples rotulados.jsonl --thresholds 0.6 0.7 0.8 0.9
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_assistant.router import IntentRouter, evaluate  # noqa: E402
+
+EXAMPLES: List[Tuple[str, bool]] = [
+    ("mapeie a pasta ~/projetos/api", True),
+    ("mapeie /home/thielson/my_project e salve em json", True),
+    ("gere a árvore de diretórios de /var/www", True),
+    ("mostre a estrutura de pastas do projeto ./frontend", True),
+    ("salve a estrutura de /tmp/dados em txt", True),
+    ("map the directory tree of /srv/app", True),
+    ("liste a estrutura do diretório ~/docs", True),
+    ("quero o mapa das pastas de ../backend", True),
+    ("expanda a pasta src do handle tree-1a2b3c4d", True),
+    ("quais pastas ocupam mais espaço em ~/Downloads?", True),
+    ("exporte a árvore de ~/fotos para json", True),
+    ("mapear diretório C:\\Users\\ana\\projetos", True),
+    ("o que é uma árvore de diretórios?", False),
+    ("explique como funciona o .gitignore", False),
+    ("como faço um script python para listar pastas?", False),
+    ("qual a diferença entre json e yaml?", False),
+    ("oi, tudo bem?", False),
+    ("por que meu código python está lento?", False),
+    ("what is a directory tree?", False),
+    ("não mapeie nada, só me explique o que é uma pasta", False),
+    ("escreva uma função bash que conta arquivos", False),
+    ("obrigado pela ajuda!", False),
+    ("me conte uma piada", False),
+]
+
+
+def read_examples(path: str) -> List[Tuple[str, bool]]:
+    with open(path, encoding="utf-8") as file:
+        return [(record["text"], bool(record["map"])) for record in map(json.loads, file) if record]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", help="JSONL com exemplos rotulados (padrão: conjunto embutido).")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument("--repeat", type=int, default=200, help="Repetições de cada exemplo na medição de tempo.")
+    args = parser.parse_args()
+
+    examples = read_examples(args.examples) if args.examples else EXAMPLES
+    positives = sum(label for _, label in examples)
+    print(f"{len(examples)} exemplos ({positives} de mapeamento)\n")
+    print("threshold  acurácia  precisão  cobertura")
+    for threshold in args.thresholds:
+        result = evaluate(IntentRouter(threshold), examples)
+        print(f"{threshold:9.2f}  {result['accuracy']:8.1%}  {result['precision']:8.1%}  {result['coverage']:9.1%}")
+
+    router = IntentRouter()
+    for _ in range(args.repeat):
+        for text, _ in examples:
+            router.route(text)
+    snapshot = router.metrics.snapshot()
+    print(f"\nclassificação: média {snapshot['latency_avg_ms'] * 1000:.1f} µs, "
+          f"máx {snapshot['latency_max_ms'] * 1000:.1f} µs ({snapshot['fast_routes'] + snapshot['fallbacks']} decisões)")
+
+    misses = [(text, label) for text, label in examples if (router.score(text) >= router.threshold) != label]
+    if misses:
+        print(f"\nerros no threshold {router.threshold}:")
+        for text, label in misses:
+            print(f"  {'mapeamento' if label else 'outro':10} {router.score(text):.2f}  {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark dos snapshots de Merkle (`ai_assistant.snapshot`) e do diff entre eles.
+
+Gera uma árvore sintética, registra um snapshot, aplica algumas mudanças (arquivos
+modificados, criados e removidos e um diretório novo), registra outro e compara os dois.
+Confere que o diff encontra exatamente as mudanças feitas e mostra quantos diretórios
+precisaram ser comparados: com poucas mudanças, uma fração mínima da árvore.
+
+Uso:
+    python benchmarks/bench_snapshot.py --entries 100000 --changes 10
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_assistant.result_store import count_tree  # noqa: E402
+from ai_assistant.snapshot import SnapshotStore  # noqa: E402
+from ai_assistant.walker import walk_tree  # noqa: E402
+from benchmarks.bench_walker import generate_tree  # noqa: E402
+
+
+def _files(root: str):
+    for directory, _, files in os.walk(root):
+        for name in files:
+            yield os.path.relpath(os.path.join(directory, name), root)
+
+
+def mutate(root: str, changes: int, seed: int = 0):
+    """Modifica, remove e cria arquivos e cria um diretório; retorna o diff esperado."""
+    rng = random.Random(seed)
+    files = sorted(_files(root))
+    picked = rng.sample(files, min(len(files), 2 * changes))
+    modified, removed = picked[:changes], picked[changes:]
+    for path in modified:
+        with open(os.path.join(root, path), "a") as f:
+            f.write("x")
+    for path in removed:
+        os.remove(os.path.join(root, path))
+    added = []
+    for i, path in enumerate(rng.sample(files, min(len(files), changes))):
+        new_path = os.path.join(os.path.dirname(path), f"new_{i}.txt")
+        open(os.path.join(root, new_path), "w").close()
+        added.append(new_path)
+    os.mkdir(os.path.join(root, "new_dir"))
+    open(os.path.join(root, "new_dir", "inside.txt"), "w").close()
+    added.append("new_dir/")
+    return sorted(set(added)), sorted(removed), sorted(modified)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--changes", type=int, default=10)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--files-per-dir", type=int, default=24)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_snapshot_")
+    try:
+        root = os.path.join(workdir, "tree")
+        os.mkdir(root)
+        generate_tree(root, args.entries, args.fanout, args.files_per_dir)
+        store = SnapshotStore(os.path.join(workdir, "snapshots.sqlite"))
+
+        def snapshot():
+            start = time.perf_counter()
+            tree = walk_tree(root, stats=True)
+            walked = time.perf_counter()
+            info = store.create(root, tree, counts=count_tree(tree))
+            return info, walked - start, time.perf_counter() - walked
+
+        first, walk_s, save_s = snapshot()
+        print(f"snapshot 1: {first.directories} pastas, {first.files} arquivos | "
+              f"varredura {walk_s:.2f}s, hash e gravação {save_s:.2f}s")
+
+        # Garante um mtime diferente mesmo em sistemas de arquivos de baixa resolução
+        time.sleep(0.01)
+        expected = mutate(root, args.changes)
+        second, walk_s, save_s = snapshot()
+        print(f"snapshot 2: varredura {walk_s:.2f}s, hash e gravação {save_s:.3f}s (só grava os diretórios alterados)")
+
+        start = time.perf_counter()
+        diff = store.diff(first.id, second.id)
+        diff_s = time.perf_counter() - start
+        print(f"diff: {diff_s * 1000:.1f} ms, {diff.visited_directories} de {first.directories + 1} diretórios "
+              f"comparados; +{len(diff.added)} -{len(diff.removed)} ~{len(diff.modified)}")
+
+        start = time.perf_counter()
+        same = store.diff(second.id, second.id)
+        print(f"diff sem mudanças: {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{same.visited_directories} diretórios comparados")
+
+        if (diff.added, diff.removed, diff.modified) != expected:
+            print("diff diferente do esperado", file=sys.stderr)
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
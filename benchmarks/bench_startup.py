@@ -0,0 +1,88 @@
+"""
+Benchmark do tempo de inicialização do CLI.
+
+Mede, em processos novos:
+- o tempo de importação de `ai_assistant.chat` segundo `python -X importtime`, comparado
+  com um orçamento (o script sai com código 1 se o orçamento for estourado);
+- o tempo até o prompt do chat poder aparecer (importar o módulo, em tempo de relógio);
+- o tempo até o grafo estar pronto (`get_graph()`), que o chat faz em background.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 100 --runs 5 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env(tmp: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("AI_API_KEY", "bench")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["CHECKPOINT_DB_PATH"] = os.path.join(tmp, "checkpoints.sqlite")
+    env["LLM_CACHE_PATH"] = os.path.join(tmp, "llm_cache.sqlite")
+    env["TREE_INDEX_PATH"] = ""
+    return env
+
+
+def wall_time(code: str, env: dict, runs: int) -> float:
+    """Melhor tempo (em segundos) de `python -c code` entre `runs` execuções."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True, cwd=ROOT)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_times(module: str, env: dict):
+    """Retorna `(cumulativo do módulo em µs, [(cumulativo µs, módulo)])` via `-X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, check=True, cwd=ROOT, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        rows.append((int(cumulative_us), name.strip()))
+    total = next(cumulative for cumulative, name in reversed(rows) if name == module)
+    return total, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Orçamento do import de ai_assistant.chat")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Quantos imports mais caros listar")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(tmp)
+        total_us, rows = import_times("ai_assistant.chat", env)
+        print(f"import ai_assistant.chat (-X importtime): {total_us / 1000:.1f} ms (orçamento {args.budget_ms:.0f} ms)")
+        # Imports mais caros pelo tempo cumulativo (o próprio módulo e suas dependências)
+        for cumulative, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+        baseline = wall_time("pass", env, args.runs)
+        prompt = wall_time("import ai_assistant.chat", env, args.runs)
+        ready = wall_time("from ai_assistant.graph import get_graph; get_graph()", env, args.runs)
+        print(f"interpretador vazio:      {baseline * 1000:8.1f} ms")
+        print(f"até o prompt do chat:     {prompt * 1000:8.1f} ms")
+        print(f"até o grafo pronto:       {ready * 1000:8.1f} ms  (em background no chat)")
+
+    if total_us / 1000 > args.budget_ms:
+        print("orçamento de importação estourado", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
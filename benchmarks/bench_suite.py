@@ -0,0 +1,217 @@
+"""
+Suíte de benchmarks do assistente com um LLM falso e determinístico (`fake_llm.ScriptedChatModel`).
+
+Mede:
+- o overhead por turno do grafo no fluxo `primary_assistant` → `enter_directory_map_assistant`
+  → tools → `leave_skill` (total e por nó);
+- o crescimento do banco de checkpoints numa sessão longa;
+- a vazão de `get_directory_tree` e `save_json_structure_as_txt` em árvores geradas
+  (por padrão de 1k a 1M de entradas);
+- o pico de memória (tracemalloc) de cada etapa e o RSS máximo do processo.
+
+O resultado é um JSON (no stdout ou em `--output`) para comparar versões entre si.
+
+Uso:
+    python benchmarks/bench_suite.py --output resultados.json
+    python benchmarks/bench_suite.py --sizes 1000,10000 --turns 20 --skip-memory
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_assistant.batch import percentile  # noqa: E402
+from benchmarks.bench_walker import generate_tree  # noqa: E402
+
+
+@contextmanager
+def _peak_memory(result: dict, enabled: bool):
+    """Guarda em `result["peak_memory_bytes"]` o pico alocado pelo Python dentro do bloco."""
+    if not enabled:
+        yield
+        return
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+
+def _db_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def bench_turns(workdir: str, turns: int, checkpoint_every: int, keep_last: int) -> Dict[str, object]:
+    from ai_assistant.env import EnvConfig
+    from ai_assistant.graph import build_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    os.makedirs(workdir)
+    target = os.path.join(workdir, "small_tree")
+    os.makedirs(target)
+    generate_tree(target, 200, 4, 8)
+    db_path = os.path.join(workdir, "checkpoints.sqlite")
+    config = EnvConfig(
+        AI_API_KEY="bench",
+        CHECKPOINT_DB_PATH=db_path,
+        CHECKPOINT_KEEP_LAST=keep_last,
+        LLM_CACHE_ENABLED=False,
+        # Sem índice persistente, para medir o walk em si
+        TREE_INDEX_PATH="",
+        # O roteador local pularia o primary_assistant, que faz parte do fluxo medido
+        ROUTER_ENABLED=False,
+    )
+    llm = ScriptedChatModel(target_path=target, output_dir=workdir)
+    graph = build_graph(config, llm=llm)
+    thread = {"configurable": {"thread_id": "bench"}}
+
+    totals: List[float] = []
+    node_times: Dict[str, List[float]] = {}
+    growth = []
+    for turn in range(1, turns + 1):
+        start = last = time.perf_counter()
+        # Cada atualização chega quando o nó termina: o intervalo desde a anterior é a duração dele
+        for update in graph.stream({"messages": [("user", f"mapeie {target}")]}, thread, stream_mode="updates"):
+            now = time.perf_counter()
+            for node in update:
+                node_times.setdefault(node, []).append(now - last)
+            last = now
+        totals.append(time.perf_counter() - start)
+        if turn % checkpoint_every == 0 or turn == turns:
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+                writes = conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+            messages = len(graph.get_state(thread).values["messages"])
+            growth.append({"turn": turn, "db_bytes": _db_size(db_path), "checkpoints": rows,
+                           "writes": writes, "messages": messages})
+
+    return {
+        "turns": turns,
+        "llm_calls": llm.calls,
+        "turn_ms": {
+            "mean": 1000 * statistics.mean(totals),
+            "p50": 1000 * percentile(totals, 0.5),
+            "p95": 1000 * percentile(totals, 0.95),
+            "first": 1000 * totals[0],
+        },
+        "node_ms": {node: 1000 * statistics.mean(times) for node, times in sorted(node_times.items())},
+        "checkpoint_growth": growth,
+    }
+
+
+def bench_tree(workdir: str, entries: int, measure_memory: bool) -> Dict[str, object]:
+    from ai_assistant.env import EnvConfig
+    from ai_assistant.tools import DirectoryTools
+
+    tools = DirectoryTools(EnvConfig(AI_API_KEY="bench", TREE_INDEX_PATH=""))
+
+    root = os.path.join(workdir, f"tree_{entries}")
+    os.makedirs(root)
+    generate_tree(root, entries, 8, 24)
+    output_path = os.path.join(workdir, f"tree_{entries}.txt")
+    result: Dict[str, object] = {"entries": entries}
+
+    start = time.perf_counter()
+    text = tools.get_directory_tree(root)
+    walk = time.perf_counter() - start
+    handle = text.split("\n", 1)[0].removeprefix("handle: ")
+
+    start = time.perf_counter()
+    tools.save_json_structure_as_txt(handle, output_path)
+    save = time.perf_counter() - start
+
+    result.update({
+        "get_directory_tree_s": walk,
+        "get_directory_tree_entries_per_s": entries / walk,
+        "save_txt_s": save,
+        "save_txt_entries_per_s": entries / save,
+        "txt_bytes": os.path.getsize(output_path),
+        "response_chars": len(text),
+    })
+
+    # Segunda passada só para medir memória: o tracemalloc deixa a execução bem mais lenta
+    memory: Dict[str, int] = {}
+    with _peak_memory(memory, measure_memory):
+        if measure_memory:
+            text = tools.get_directory_tree(root)
+            handle = text.split("\n", 1)[0].removeprefix("handle: ")
+            tools.save_json_structure_as_txt(handle, output_path)
+    if memory:
+        result["peak_memory_bytes"] = memory["peak_memory_bytes"]
+
+    shutil.rmtree(root, ignore_errors=True)
+    os.remove(output_path)
+    return result
+
+
+def _git_version() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="Tamanhos das árvores geradas, separados por vírgula.")
+    parser.add_argument("--turns", type=int, default=50, help="Turnos da sessão simulada.")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Intervalo das amostras do banco.")
+    parser.add_argument("--keep-last", type=int, default=10, help="CHECKPOINT_KEEP_LAST da sessão simulada.")
+    parser.add_argument("--skip-memory", action="store_true", help="Não mede o pico de memória (tracemalloc).")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        results: Dict[str, object] = {
+            "version": _git_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        }
+        # O grafo e as tools podem imprimir no stdout, que fica reservado para o JSON
+        with redirect_stdout(sys.stderr):
+            session = bench_turns(os.path.join(workdir, "session"), args.turns, args.checkpoint_every, args.keep_last)
+            if not args.skip_memory:
+                # Sessão repetida só para medir memória: o tracemalloc distorceria os tempos
+                memory: Dict[str, int] = {}
+                with _peak_memory(memory, True):
+                    bench_turns(os.path.join(workdir, "session_memory"), args.turns, args.checkpoint_every, args.keep_last)
+                session["peak_memory_bytes"] = memory["peak_memory_bytes"]
+            results["session"] = session
+            results["trees"] = []
+            for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+                print(f"árvore com {size} entradas...")
+                results["trees"].append(bench_tree(workdir, size, not args.skip_memory))
+        # ru_maxrss é em KiB no Linux
+        results["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark do modo de uso de espaço (`get_directory_usage` / `ai_assistant.tree_usage`).
+
+Gera uma árvore sintética com arquivos de tamanhos variados e compara três caminhos:
+só o mapa de nomes (`walk_tree`), o mapa com tamanhos somados na mesma varredura
+(`walk_tree(..., stats=True)` + `aggregate_usage`) e o mapa de nomes seguido de uma
+segunda varredura com `os.walk` + `os.stat`, como seria preciso sem o modo de uso.
+Confere que os totais batem e mostra o tamanho do resumo entregue ao LLM.
+
+Uso:
+    python benchmarks/bench_usage.py --entries 200000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_assistant.tokens import estimate_tokens  # noqa: E402
+from ai_assistant.tree_usage import aggregate_usage, render_usage  # noqa: E402
+from ai_assistant.walker import walk_tree  # noqa: E402
+from benchmarks.bench_walker import generate_tree, timed  # noqa: E402
+
+EXTENSIONS = (".py", ".json", ".png", ".txt", ".so", "")
+
+
+def fill_sizes(root: str, seed: int = 0) -> None:
+    """Renomeia os arquivos com extensões variadas e dá a eles tamanhos de 0 a 64 KB (arquivos esparsos)."""
+    rng = random.Random(seed)
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            new_path = os.path.splitext(path)[0] + rng.choice(EXTENSIONS)
+            os.rename(path, new_path)
+            os.truncate(new_path, rng.randrange(64 * 1024))
+
+
+def second_walk(root: str):
+    """Totais por uma segunda varredura completa, com um `stat` por arquivo."""
+    size = directories = files = 0
+    for directory, subdirectories, names in os.walk(root):
+        directories += len(subdirectories)
+        for name in names:
+            size += os.stat(os.path.join(directory, name)).st_size
+            files += 1
+    return size, directories, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--files-per-dir", type=int, default=24)
+    parser.add_argument("--max-depth", type=int, default=2)
+    parser.add_argument("--max-tokens", type=int, default=1500)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_usage_")
+    try:
+        generate_tree(root, args.entries, args.fanout, args.files_per_dir)
+        fill_sizes(root)
+
+        _, names_s = timed(walk_tree, root)
+        print(f"só nomes (walk_tree):               {names_s:.2f}s")
+
+        start = time.perf_counter()
+        tree = walk_tree(root, stats=True)
+        usage = aggregate_usage(tree)
+        summary = render_usage(tree, usage, args.max_depth, max_tokens=args.max_tokens)
+        usage_s = time.perf_counter() - start
+        print(f"nomes + uso na mesma varredura:     {usage_s:.2f}s")
+
+        expected, stat_s = timed(second_walk, root)
+        print(f"nomes + segunda varredura com stat: {names_s + stat_s:.2f}s")
+
+        totals = usage[id(tree)]
+        if (totals.size, totals.directories, totals.files) != expected:
+            print(f"totais diferentes: {totals[:3]} != {expected}", file=sys.stderr)
+            sys.exit(1)
+        print(f"resumo: {len(summary.splitlines())} linhas, ~{estimate_tokens(summary)} tokens "
+              f"(limite {args.max_tokens}); totais conferidos")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark do `walk_tree` contra a implementação recursiva original baseada em `os.listdir`.
+
+Gera uma árvore sintética (por padrão com 1M de entradas), executa as duas
+implementações e confere que o JSON produzido é idêntico.
+
+Uso:
+    python benchmarks/bench_walker.py --entries 1000000
+    python benchmarks/bench_walker.py --root /tmp/arvore --keep
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_assistant.gitignore import IgnoreMatcher  # noqa: E402
+from ai_assistant.walker import DEFAULT_MAX_WORKERS, walk_tree  # noqa: E402
+
+
+def legacy_build_tree(current_path: str, ignore_dirs) -> dict:
+    """Implementação original de `get_directory_tree`, mantida como referência."""
+    tree = {"name": os.path.basename(current_path), "children": []}
+    try:
+        entries = os.listdir(current_path)
+        entries = [entry for entry in entries if entry not in ignore_dirs]
+        directories = sorted([entry for entry in entries if os.path.isdir(os.path.join(current_path, entry))])
+        files = sorted([entry for entry in entries if os.path.isfile(os.path.join(current_path, entry))])
+        for directory in directories:
+            tree["children"].append(legacy_build_tree(os.path.join(current_path, directory), ignore_dirs))
+        for file in files:
+            tree["children"].append({"name": file})
+    except PermissionError:
+        pass
+    return tree
+
+
+def generate_tree(root: str, entries: int, fanout: int, files_per_dir: int) -> int:
+    """Cria uma árvore com aproximadamente `entries` entradas (pastas + arquivos)."""
+    created = 0
+    level = [root]
+    while created < entries:
+        next_level = []
+        for directory in level:
+            for i in range(files_per_dir):
+                if created >= entries:
+                    return created
+                open(os.path.join(directory, f"file_{i}.txt"), "w").close()
+                created += 1
+            for i in range(fanout):
+                if created >= entries:
+                    return created
+                child = os.path.join(directory, f"dir_{i}")
+                os.mkdir(child)
+                next_level.append(child)
+                created += 1
+        level = next_level
+    return created
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--files-per-dir", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--root", help="Diretório da árvore sintética (reaproveitado se já existir).")
+    parser.add_argument("--keep", action="store_true", help="Não remove a árvore gerada ao final.")
+    parser.add_argument("--skip-legacy", action="store_true", help="Executa apenas o walker novo.")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix="bench_walker_")
+    try:
+        if not os.path.exists(root) or not os.listdir(root):
+            os.makedirs(root, exist_ok=True)
+            _, elapsed = timed(generate_tree, root, args.entries, args.fanout, args.files_per_dir)
+            print(f"Árvore com {args.entries} entradas gerada em {elapsed:.2f}s ({root})")
+
+        ignore = {".git", "node_modules"}
+        tree, walker_time = timed(walk_tree, root, IgnoreMatcher(ignore), args.workers)
+        print(f"walk_tree ({args.workers} threads): {walker_time:.2f}s")
+
+        if not args.skip_legacy:
+            legacy_tree, legacy_time = timed(legacy_build_tree, root, ignore)
+            print(f"listdir recursivo:        {legacy_time:.2f}s")
+            print(f"speedup:                  {legacy_time / walker_time:.1f}x")
+            if json.dumps(tree) != json.dumps(legacy_tree):
+                raise SystemExit("ERRO: as duas implementações produziram JSON diferente")
+            print("JSON idêntico nas duas implementações")
+    finally:
+        if not args.keep and not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Modelo de chat falso e determinístico para benchmarks (e testes manuais) sem rede.
+
+Simula o fluxo de mapeamento completo do grafo:
+`primary_assistant` → `enter_directory_map_assistant` → `get_directory_tree` →
+`save_json_structure_as_txt` → `CompleteOrEscalate` (`leave_skill`) → resposta final.
+
+Uso:
+    from ai_assistant.graph import build_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    graph = build_graph(config, llm=ScriptedChatModel(target_path="/tmp/x", output_dir="/tmp"))
+"""
+import itertools
+import json
+import os
+import re
+import time
+from typing import Any, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+_HANDLE = re.compile(r"^handle: (\S+)")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Responde de acordo com as tools vinculadas e a última mensagem, sem aleatoriedade.
+
+    `latency_s` simula o tempo de resposta do provedor; com o padrão (zero) o tempo de cada
+    turno é só o custo do próprio grafo, checkpoints e tools.
+    """
+
+    target_path: str
+    output_dir: str
+    latency_s: float = 0.0
+    calls: int = 0
+    counter: Any = Field(default_factory=itertools.count, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _tool_call(self, name: str, args: dict) -> AIMessage:
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{next(self.counter)}"}])
+
+    def _respond(self, messages: List[BaseMessage], tools: List[dict]) -> AIMessage:
+        tool_names = {tool["function"]["name"] for tool in tools}
+        last = messages[-1]
+        if "get_directory_tree" in tool_names:
+            if isinstance(last, ToolMessage) and (match := _HANDLE.match(str(last.content))):
+                output_path = os.path.join(self.output_dir, f"tree_{next(self.counter)}.txt")
+                return self._tool_call("save_json_structure_as_txt", {"handle": match.group(1), "output_path": output_path})
+            if isinstance(last, ToolMessage) and last.name == "save_json_structure_as_txt":
+                return self._tool_call("CompleteOrEscalate", {"reason": "Estrutura mapeada e salva"})
+            return self._tool_call("get_directory_tree", {"path": self.target_path})
+        if "ToDirectoryMapAssistant" in tool_names:
+            if isinstance(last, HumanMessage):
+                return self._tool_call("ToDirectoryMapAssistant", {"request": f"Mapear e salvar {self.target_path}"})
+            return AIMessage(content="<think>ok</think>Pronto, a estrutura foi salva.")
+        # Sem tools: o resumidor do histórico
+        return AIMessage(content="Resumo: o usuário pediu mapeamentos de diretórios.")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs.get("tools", [])))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._generate(messages, stop, run_manager, **kwargs).generations[0].message
+        chunk = AIMessageChunk(
+            content=message.content,
+            tool_call_chunks=[
+                {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+                for i, tc in enumerate(message.tool_calls)
+            ],
+        )
+        generation = ChatGenerationChunk(message=chunk)
+        if run_manager:
+            run_manager.on_llm_new_token(str(message.content), chunk=generation)
+        yield generation
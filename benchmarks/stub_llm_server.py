@@ -0,0 +1,150 @@
+"""
+Servidor HTTP local que imita as APIs de chat do Groq (compatível com a OpenAI) e do Ollama.
+
+Serve para testar o pool de LLMs (`ai_assistant.llm_pool`) sem rede: cada instância tem a sua
+latência e taxa de falhas (respostas 503), e conta as requisições e conexões recebidas (para
+ver o keep-alive funcionando).
+
+Rotas:
+- `POST /openai/v1/chat/completions`: formato do Groq/OpenAI, com e sem `stream`.
+- `POST /api/chat`: formato do Ollama, com e sem `stream`.
+
+Uso:
+    python benchmarks/stub_llm_server.py --port 9001 --latency 0.2 --fail-rate 0.1
+
+    LLM_PROVIDERS='[{"kind": "groq", "model": "stub", "base_url": "http://127.0.0.1:9001"},
+                    {"kind": "ollama", "model": "stub", "base_url": "http://127.0.0.1:9001"}]'
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_s: float = 0.0, fail_rate: float = 0.0, reply: str = "ok"):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_s = latency_s
+        self.fail_rate = fail_rate
+        self.reply = reply
+        self.requests = 0
+        self.connections = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "StubLLMServer":
+        threading.Thread(target=self.serve_forever, name="stub-llm", daemon=True).start()
+        return self
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubLLMServer
+
+    def setup(self):
+        super().setup()
+        self.server._count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, content_type: str, lines) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for line in lines:
+            data = line.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        self.server._count("requests")
+        time.sleep(self.server.latency_s)
+        if random.random() < self.server.fail_rate:
+            self.server._count("failures")
+            self._send(503, b'{"error": {"message": "stub indisponivel"}}')
+            return
+        model = payload.get("model", "stub")
+        words = self.server.reply.split(" ")
+        if self.path == "/openai/v1/chat/completions":
+            self._openai(model, words, payload.get("stream", False))
+        elif self.path == "/api/chat":
+            self._ollama(model, words, payload.get("stream", False))
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def _openai(self, model: str, words, stream: bool) -> None:
+        base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": model}
+        usage = {"prompt_tokens": 10, "completion_tokens": len(words), "total_tokens": 10 + len(words)}
+        if not stream:
+            body = {**base, "object": "chat.completion", "usage": usage, "choices": [{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": " ".join(words)},
+            }]}
+            self._send(200, json.dumps(body).encode("utf-8"))
+            return
+        events = []
+        for i, word in enumerate(words):
+            delta = {"role": "assistant", "content": word if i == 0 else " " + word}
+            events.append({**base, "object": "chat.completion.chunk",
+                           "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        events.append({**base, "object": "chat.completion.chunk", "x_groq": {"usage": usage},
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        lines = [f"data: {json.dumps(event)}\n\n" for event in events] + ["data: [DONE]\n\n"]
+        self._send_stream("text/event-stream", lines)
+
+    def _ollama(self, model: str, words, stream: bool) -> None:
+        base = {"model": model, "created_at": "2025-01-01T00:00:00Z"}
+        done = {"done": True, "done_reason": "stop", "prompt_eval_count": 10, "eval_count": len(words)}
+        if not stream:
+            body = {**base, "message": {"role": "assistant", "content": " ".join(words)}, **done}
+            self._send(200, json.dumps(body).encode("utf-8"))
+            return
+        lines = [
+            json.dumps({**base, "message": {"role": "assistant", "content": word if i == 0 else " " + word},
+                        "done": False}) + "\n"
+            for i, word in enumerate(words)
+        ]
+        lines.append(json.dumps({**base, "message": {"role": "assistant", "content": ""}, **done}) + "\n")
+        self._send_stream("application/x-ndjson", lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Atraso de cada resposta, em segundos.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fração das requisições que recebem 503.")
+    parser.add_argument("--reply", default="Olá, sou o stub.")
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.port, args.latency, args.fail_rate, args.reply)
+    print(f"Stub ouvindo em {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+# As configurações são lidas no primeiro uso; os testes não usam a rede nem os caches da home
+os.environ.setdefault("AI_API_KEY", "test")
+for name in ("TREE_INDEX_PATH", "SNAPSHOT_DB_PATH", "CONTENT_INDEX_PATH", "LLM_CACHE_PATH"):
+    os.environ.setdefault(name, "")
@@ -0,0 +1,48 @@
+import pytest
+
+from ai_assistant.batch import format_summary, parse_args, percentile
+
+
+@pytest.mark.parametrize("argv", [
+    ["--concurrency", "0"],
+    ["-c", "-1"],
+    ["-c", "x"],
+    ["--burst", "0"],
+    ["--rate", "-1"],
+    ["--rate", "nan"],
+    ["--timeout", "0"],
+])
+def test_invalid_limits_are_rejected(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        parse_args(["prompts.jsonl", *argv])
+    assert exc.value.code == 2
+    assert "esperado" in capsys.readouterr().err
+
+
+def test_valid_limits_are_accepted():
+    args = parse_args(["prompts.jsonl", "-c", "1", "--burst", "1", "--rate", "0", "--timeout", "0.5"])
+    assert (args.concurrency, args.burst, args.rate, args.timeout) == (1, 1, 0.0, 0.5)
+
+
+@pytest.mark.parametrize("values, fraction, expected", [
+    ([1, 2, 3, 4], 0.5, 2),
+    ([1, 2, 3, 4], 0.75, 3),
+    ([1, 2, 3, 4], 0.99, 4),
+    ([4, 3, 2, 1], 0.25, 1),
+    (list(range(1, 11)), 0.9, 9),
+    (list(range(1, 101)), 0.95, 95),
+    ([7], 0.5, 7),
+    ([1, 2], 0.0, 1),
+    ([1, 2], 1.0, 2),
+])
+def test_percentile_is_nearest_rank(values, fraction, expected):
+    assert percentile(values, fraction) == expected
+
+
+def test_format_summary():
+    records = [{"latency_s": float(i)} for i in range(1, 11)] + [{"error": "timeout", "latency_s": 60.0}]
+
+    assert format_summary(records, total=12, elapsed_s=5.0) == (
+        "11/12 prompts em 5.0s (2.20 prompts/s), 10 ok, 1 com erro\n"
+        "latência: p50 5.00s, p90 9.00s, p95 10.00s, p99 10.00s, máx 10.00s"
+    )
@@ -0,0 +1,99 @@
+import asyncio
+import sqlite3
+from typing import Optional
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from ai_assistant.checkpoint import COMPRESS_MIN_BYTES, SqliteCheckpointSaver
+
+
+def _config(thread_id: str, checkpoint_id: Optional[str] = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id is not None:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def _put(saver: SqliteCheckpointSaver, thread_id: str, messages: list, parent: Optional[dict] = None) -> dict:
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": messages}
+    return saver.put(parent or _config(thread_id), checkpoint, {"source": "loop", "step": len(messages)}, {})
+
+
+def _checkpoint_types(db_path) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        return [type_ for (type_,) in conn.execute("SELECT type FROM checkpoints ORDER BY checkpoint_id")]
+    finally:
+        conn.close()
+
+
+def test_put_get_round_trip(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    first = _put(saver, "t1", ["oi"])
+    second = _put(saver, "t1", ["oi", "olá"], parent=first)
+    saver.put_writes(second, [("messages", "pendente")], task_id="task-1")
+
+    latest = saver.get_tuple(_config("t1"))
+    assert latest.config == second
+    assert latest.parent_config == first
+    assert latest.checkpoint["channel_values"] == {"messages": ["oi", "olá"]}
+    assert latest.metadata == {"source": "loop", "step": 2}
+    assert latest.pending_writes == [("task-1", "messages", "pendente")]
+    assert saver.get_tuple(first).checkpoint["channel_values"] == {"messages": ["oi"]}
+    assert saver.get_tuple(_config("t2")) is None
+
+
+def test_large_values_are_compressed(tmp_path):
+    db_path = tmp_path / "checkpoints.sqlite"
+    saver = SqliteCheckpointSaver(str(db_path))
+    _put(saver, "small", ["oi"])
+    large = ["x" * COMPRESS_MIN_BYTES]
+    _put(saver, "large", large)
+
+    small_type, large_type = _checkpoint_types(db_path)
+    assert not small_type.endswith("+zlib")
+    assert large_type.endswith("+zlib")
+    assert saver.get_tuple(_config("large")).checkpoint["channel_values"] == {"messages": large}
+
+
+def test_prune_keeps_last_checkpoints(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), keep_last=3)
+    configs = []
+    for step in range(5):
+        configs.append(_put(saver, "t1", ["m"] * step, parent=configs[-1] if configs else None))
+        saver.put_writes(configs[-1], [("messages", step)], task_id="task")
+    _put(saver, "other", ["m"])
+
+    kept = [item.config for item in saver.list(_config("t1"))]
+    assert kept == configs[:1:-1]
+    # Os writes dos checkpoints descartados também saem
+    assert saver.get_tuple(configs[1]) is None
+    assert [item.pending_writes for item in saver.list(_config("t1"), limit=1)] == [[("task", "messages", 4)]]
+    assert len(list(saver.list(_config("other")))) == 1
+
+
+def test_list_threads_most_recent_first(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    for thread_id in ("a", "b", "a", "c"):
+        _put(saver, thread_id, [])
+
+    assert saver.list_threads() == ["c", "a", "b"]
+
+
+def test_async_methods(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+
+    async def run():
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": ["oi"]}
+        config = await saver.aput(_config("t1"), checkpoint, {"step": 1}, {})
+        await saver.aput_writes(config, [("messages", "pendente")], task_id="task")
+        latest = await saver.aget_tuple(_config("t1"))
+        listed = [item async for item in saver.alist(_config("t1"))]
+        return config, latest, listed
+
+    config, latest, listed = asyncio.run(run())
+    assert latest.config == config
+    assert latest.pending_writes == [("task", "messages", "pendente")]
+    assert [item.config for item in listed] == [config]
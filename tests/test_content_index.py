@@ -0,0 +1,95 @@
+import pytest
+
+from ai_assistant.content_index import ContentIndex, _at_part_start, tokenize
+from ai_assistant.env import get_env
+from ai_assistant.graph import create_directory_map_assistant_prompt
+from ai_assistant.tools import DirectoryTools, build_directory_tools
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_search_tool_is_offered_only_with_an_index(tmp_path, enabled):
+    index_path = str(tmp_path / "content_index.sqlite") if enabled else ""
+    names = {directory_tool.name for directory_tool in
+             build_directory_tools(get_env().model_copy(update={"CONTENT_INDEX_PATH": index_path}))}
+    prompt = create_directory_map_assistant_prompt(names).messages[0].prompt.template
+
+    assert ("search_directory_content" in names) == enabled
+    assert ("search_directory_content" in prompt) == enabled
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ContentIndex(str(tmp_path / "content_index.sqlite"), workers=1)
+
+
+def _write(root, files: dict) -> str:
+    for name, content in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(content)
+    return str(root)
+
+
+def test_tokenize_splits_identifier_parts():
+    tokens = tokenize(b"getDirectoryTree HTTPServer get_directory_tree v2beta")
+
+    assert {b"getdirectorytree", b"get", b"directory", b"tree", b"httpserver", b"http", b"server",
+            b"get_directory_tree", b"v2beta", b"beta"} <= tokens
+    assert b"irectory" not in tokens
+
+
+@pytest.mark.parametrize("data, pos, expected", [
+    (b"tree", 0, True),
+    (b"get_tree", 4, True),
+    (b"get tree", 4, True),
+    (b"getTree", 3, True),
+    (b"HTTPServer", 4, True),
+    (b"v2beta", 2, True),
+    (b"street", 2, False),
+    (b"HTTPServer", 1, False),
+    (b"getTree", 4, False),
+])
+def test_at_part_start(data, pos, expected):
+    assert _at_part_start(data, pos) == expected
+
+
+def test_search_matches_only_at_word_or_part_start(tmp_path, index):
+    root = _write(tmp_path / "repo", {
+        "a.py": "def get_directory_tree():\n    pass\n",
+        "b.py": "class DirectoryTree:\n    pass\n",
+        "c.txt": "street map\n",
+        "d.py": "server = HTTPServer()\n",
+    })
+    index.update(root)
+
+    def matched(query):
+        return sorted(hit.path for hit in index.search(root, query).hits)
+
+    assert matched("tree") == ["a.py", "b.py"]
+    assert matched("TREE") == ["a.py", "b.py"]
+    assert matched("directory_tree") == ["a.py"]
+    assert matched("Server") == ["d.py"]
+    assert matched("reet") == []
+
+
+def test_search_stops_scanning_at_max_results(tmp_path, index):
+    root = _write(tmp_path / "repo", {f"f{i:02}.txt": "needle\n" * 3 for i in range(20)})
+    index.update(root)
+
+    result = index.search(root, "needle", max_results=4, max_per_file=3)
+
+    assert len(result.hits) == 4
+    assert result.candidates == 20
+    # 3 linhas do primeiro arquivo e 1 do segundo; os outros 18 candidatos nem são abertos
+    assert result.scanned == 2
+    assert result.files_matched == 2
+    assert [hit.line for hit in result.hits] == [1, 2, 3, 1]
+
+
+def test_search_tool_reports_unchecked_candidates(tmp_path):
+    root = _write(tmp_path / "repo", {f"f{i:02}.txt": "needle\n" for i in range(10)})
+    tools = DirectoryTools(get_env().model_copy(update={"CONTENT_INDEX_PATH": str(tmp_path / "index.sqlite")}))
+
+    result = tools.search_directory_content(root, "needle", max_results=3)
+
+    assert result.startswith("3 linhas em 3 arquivos (10 candidatos de 10 arquivos indexados)")
+    assert result.endswith("... resultados limitados a 3 linhas (7 arquivos candidatos não conferidos)")
@@ -0,0 +1,39 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+
+from ai_assistant.context import ContextPolicy
+from ai_assistant.graph import merge_context_summaries
+
+
+def _conversation(turns: int) -> list:
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"pergunta {i} " + "x" * 200, id=f"h{i}"))
+        messages.append(AIMessage(content=f"resposta {i} " + "y" * 200, id=f"a{i}"))
+    return messages
+
+
+def test_assistants_keep_separate_summaries():
+    calls = []
+
+    def summarize(inputs):
+        calls.append(inputs)
+        return AIMessage(content=f"{inputs['summary']} + {inputs['transcript'].count('human:')} turnos")
+
+    summarizer = RunnableLambda(summarize)
+    wide = ContextPolicy("primary_assistant", max_tokens=500, summarizer=summarizer)
+    narrow = ContextPolicy("directory_map_assistant", max_tokens=150, summarizer=summarizer)
+    state = {"messages": _conversation(6)}
+
+    for policy in (wide, narrow, wide, narrow):
+        window, update = policy.prepare(state)
+        state = {**state, "context_summaries": merge_context_summaries(state.get("context_summaries"),
+                                                                       update.get("context_summaries"))}
+        assert isinstance(window[0], SystemMessage)
+
+    summaries = state["context_summaries"]
+    assert set(summaries) == {"primary_assistant", "directory_map_assistant"}
+    # A janela menor deixa mais turnos de fora, e cada assistente resume só os seus uma vez
+    assert summaries["primary_assistant"]["summarized_id"] < summaries["directory_map_assistant"]["summarized_id"]
+    assert len(calls) == 2
+    assert summaries["primary_assistant"]["summary"] != summaries["directory_map_assistant"]["summary"]
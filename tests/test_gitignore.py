@@ -0,0 +1,194 @@
+"""
+Compara `ai_assistant.gitignore` com o próprio git (`git check-ignore` e `git ls-files`).
+
+Cada cenário cria um repositório temporário com arquivos e `.gitignore`; o resultado do
+matcher (e da varredura do `walk_tree`) precisa ser o mesmo que o git calcula.
+"""
+import os
+import shutil
+import subprocess
+from typing import Dict, List
+
+import pytest
+
+from ai_assistant.gitignore import IgnoreMatcher
+from ai_assistant.walker import walk_tree
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git não está instalado")
+
+# Cada cenário: caminho -> conteúdo. Os `.gitignore` são arquivos como os outros;
+# caminhos terminados em `/` criam diretórios vazios.
+SCENARIOS: Dict[str, Dict[str, str]] = {
+    "negation": {
+        ".gitignore": "*.log\n!keep.log\n!/sub/also.log\n",
+        "a.log": "",
+        "keep.log": "",
+        "also.log": "",
+        "sub/b.log": "",
+        "sub/keep.log": "",
+        "sub/also.log": "",
+        "sub/readme.md": "",
+    },
+    "negation_inside_excluded_directory": {
+        ".gitignore": "build/\n!build/keep.txt\ndist/*\n!dist/keep.txt\n",
+        "build/keep.txt": "",
+        "build/out.bin": "",
+        "dist/keep.txt": "",
+        "dist/out.bin": "",
+        "dist/nested/keep.txt": "",
+    },
+    "nested_gitignore": {
+        ".gitignore": "*.tmp\nsecret/\n",
+        "a.tmp": "",
+        "sub/.gitignore": "!important.tmp\n*.txt\n/local/\n",
+        "sub/important.tmp": "",
+        "sub/other.tmp": "",
+        "sub/notes.txt": "",
+        "sub/local/file.py": "",
+        "sub/deep/local/file.py": "",
+        "sub/deep/.gitignore": "!notes.txt\n",
+        "sub/deep/notes.txt": "",
+        "sub/deep/more.txt": "",
+        "sub/secret/key.pem": "",
+        "local/file.py": "",
+    },
+    "anchored": {
+        ".gitignore": "/root_only.txt\ndocs/*.md\nconfig/local.*\n",
+        "root_only.txt": "",
+        "sub/root_only.txt": "",
+        "docs/a.md": "",
+        "docs/x/b.md": "",
+        "sub/docs/c.md": "",
+        "config/local.json": "",
+        "config/prod.json": "",
+        "sub/config/local.json": "",
+    },
+    "double_star": {
+        ".gitignore": "**/cache\nlogs/**\na/**/z.txt\n**/*.bak\nfoo**bar\n",
+        "cache/x": "",
+        "src/cache/y": "",
+        "src/deep/cache": "",
+        "logs/app/1.log": "",
+        "logs/keep": "",
+        "a/z.txt": "",
+        "a/b/z.txt": "",
+        "a/b/c/z.txt": "",
+        "b/a/z.txt": "",
+        "file.bak": "",
+        "x/y/file.bak": "",
+        "fooXbar": "",
+        "foo/bar": "",
+    },
+    "dir_only": {
+        ".gitignore": "out/\nbin/\n*.d/\n",
+        "out/a.o": "",
+        "sub/out": "",
+        "sub/bin/tool": "",
+        "bin": "",
+        "conf.d/x.conf": "",
+        "file.d": "",
+        "empty_out/": "",
+    },
+    "classes_and_escapes": {
+        ".gitignore": "*.py[co]\nfile?.txt\n[!a]*.tmp\n\\#hash\n\\!bang\ntrailing.txt   \n# comentário\n",
+        "x.pyc": "",
+        "x.pyo": "",
+        "x.py": "",
+        "file1.txt": "",
+        "file10.txt": "",
+        "a.tmp": "",
+        "b.tmp": "",
+        "#hash": "",
+        "!bang": "",
+        "trailing.txt": "",
+    },
+}
+
+
+def _make_repo(root: str, files: Dict[str, str]) -> None:
+    subprocess.run(["git", "init", "-q", root], check=True)
+    for rel_path, content in files.items():
+        path = os.path.join(root, rel_path)
+        if rel_path.endswith("/"):
+            os.makedirs(path, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+
+def _all_paths(root: str) -> List[str]:
+    """Todos os arquivos e diretórios do repositório (menos o `.git`), relativos à raiz."""
+    paths = []
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if name != ".git"]
+        rel_dir = os.path.relpath(directory, root).replace(os.sep, "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        paths.extend(prefix + name for name in subdirectories + files)
+    return sorted(paths)
+
+
+def _git_ignored(root: str, paths: List[str]) -> Dict[str, bool]:
+    """Veredito do `git check-ignore` para cada caminho (considera os diretórios pais ignorados)."""
+    result = subprocess.run(
+        ["git", "check-ignore", "--stdin", "-z", "-v", "-n"],
+        cwd=root, input="\0".join(paths) + "\0", capture_output=True, text=True,
+    )
+    # Saída com -z: source, linha, padrão e caminho, cada um terminado em NUL
+    fields = result.stdout.split("\0")
+    verdicts = {}
+    for i in range(0, len(fields) - 1, 4):
+        _, _, pattern, path = fields[i:i + 4]
+        verdicts[path] = bool(pattern) and not pattern.startswith("!")
+    return verdicts
+
+
+def _matcher_ignored(root: str, rel_path: str) -> bool:
+    """Veredito do `IgnoreMatcher`, empilhando os `.gitignore` como o `walk_tree` faz."""
+    matcher = IgnoreMatcher()
+    parts = rel_path.split("/")
+    for depth in range(len(parts)):
+        rel_dir = "/".join(parts[:depth])
+        gitignore = os.path.join(root, rel_dir, ".gitignore")
+        if os.path.isfile(gitignore):
+            matcher = matcher.with_gitignore(gitignore, rel_dir)
+        current = "/".join(parts[:depth + 1])
+        # Um diretório pai ignorado esconde tudo o que está dentro dele
+        if matcher.is_ignored(current, os.path.isdir(os.path.join(root, current))):
+            return True
+    return False
+
+
+def _walked_files(tree: dict, prefix: str = "") -> List[str]:
+    files = []
+    for child in tree["children"]:
+        path = prefix + child["name"]
+        if "children" in child:
+            files.extend(_walked_files(child, path + "/"))
+        else:
+            files.append(path)
+    return files
+
+
+@pytest.fixture(params=sorted(SCENARIOS))
+def repo(request, tmp_path):
+    root = str(tmp_path / "repo")
+    _make_repo(root, SCENARIOS[request.param])
+    return root
+
+
+def test_matches_git_check_ignore(repo):
+    paths = _all_paths(repo)
+    expected = _git_ignored(repo, paths)
+    actual = {path: _matcher_ignored(repo, path) for path in paths}
+    assert actual == expected
+
+
+def test_walk_tree_matches_git_ls_files(repo):
+    result = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+        cwd=repo, capture_output=True, text=True, check=True,
+    )
+    expected = sorted(path for path in result.stdout.split("\0") if path)
+    tree = walk_tree(repo, IgnoreMatcher([".git"]))
+    assert sorted(_walked_files(tree)) == expected
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+
+from langchain_core.messages import ToolMessage
+
+from ai_assistant.env import get_env
+from ai_assistant.graph import build_graph, get_router
+from ai_assistant.streaming import reply_text
+from benchmarks.fake_llm import ScriptedChatModel
+
+
+def _config(tmp_path, **update):
+    return get_env().model_copy(update={
+        "CHECKPOINT_DB_PATH": str(tmp_path / "checkpoints.sqlite"),
+        "LLM_CACHE_ENABLED": False,
+        **update,
+    })
+
+
+def test_graph_without_router_compiles_and_answers(tmp_path):
+    target = tmp_path / "target"
+    (target / "src").mkdir(parents=True)
+    (target / "src" / "main.py").write_text("")
+    llm = ScriptedChatModel(target_path=str(target), output_dir=str(tmp_path))
+
+    graph = build_graph(_config(tmp_path, ROUTER_ENABLED=False), llm=llm)
+
+    assert "fast_router" not in graph.nodes
+    result = graph.invoke({"messages": [{"role": "user", "content": f"mapeie {target}"}]},
+                          {"configurable": {"thread_id": "sem-roteador"}})
+    assert reply_text(result["messages"]) == "Pronto, a estrutura foi salva."
+
+
+def test_get_router_respects_router_enabled(monkeypatch):
+    monkeypatch.setenv("ROUTER_ENABLED", "false")
+    get_env.cache_clear()
+    get_router.cache_clear()
+    try:
+        assert get_router() is None
+    finally:
+        get_env.cache_clear()
+        get_router.cache_clear()
+
+
+def test_tools_use_the_graph_config(tmp_path):
+    target = tmp_path / "target"
+    (target / "src" / "deep").mkdir(parents=True)
+    (target / "src" / "deep" / "main.py").write_text("")
+    llm = ScriptedChatModel(target_path=str(target), output_dir=str(tmp_path))
+
+    graph = build_graph(_config(tmp_path, ROUTER_ENABLED=False, WALK_MAX_DEPTH=1), llm=llm)
+    result = graph.invoke({"messages": [{"role": "user", "content": f"mapeie {target}"}]},
+                          {"configurable": {"thread_id": "limites"}})
+
+    tree_result = next(message for message in result["messages"]
+                       if isinstance(message, ToolMessage) and message.name == "get_directory_tree")
+    assert "Resultado parcial" in tree_result.content and "profundidade máxima" in tree_result.content
+
+
+def test_import_does_not_read_the_environment(tmp_path):
+    env = {key: value for key, value in os.environ.items() if key not in ("AI_API_KEY", "SNAPSHOT_DB_PATH",
+                                                                          "CONTENT_INDEX_PATH", "TREE_INDEX_PATH")}
+    env["HOME"] = str(tmp_path)
+    result = subprocess.run([sys.executable, "-c", "import ai_assistant.graph, ai_assistant.tools"],
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    # Nenhum banco é aberto (nem criado em ~/.cache) só por importar
+    assert not (tmp_path / ".cache").exists()
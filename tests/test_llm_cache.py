@@ -0,0 +1,105 @@
+import time
+
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration
+
+from ai_assistant.llm_cache import ResponseCache
+
+LLM_STRING = "groq:deepseek-r1-distill-llama-70b:temperature=0"
+
+
+def _prompt(*messages) -> str:
+    return dumps(list(messages))
+
+
+def _tool_call_response(call_id: str = "call_original") -> list:
+    message = AIMessage(
+        content="",
+        id="run-1",
+        tool_calls=[{"name": "get_directory_tree", "args": {"path": "/tmp"}, "id": call_id}],
+        additional_kwargs={"tool_calls": [
+            {"id": call_id, "type": "function",
+             "function": {"name": "get_directory_tree", "arguments": '{"path": "/tmp"}'}},
+        ]},
+    )
+    return [ChatGeneration(message=message)]
+
+
+def test_miss_then_hit():
+    cache = ResponseCache()
+    prompt = _prompt(HumanMessage("mapeie /tmp"))
+
+    assert cache.lookup(prompt, LLM_STRING) is None
+    cache.update(prompt, LLM_STRING, [ChatGeneration(message=AIMessage("pronto"))])
+    (generation,) = cache.lookup(prompt, LLM_STRING)
+
+    assert generation.message.content == "pronto"
+    assert cache.lookup(prompt, "outro-modelo") is None
+    assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 2}
+
+
+def test_disk_cache_survives_restart(tmp_path):
+    db_path = str(tmp_path / "llm_cache.sqlite")
+    prompt = _prompt(HumanMessage("mapeie /tmp"))
+    ResponseCache(db_path).update(prompt, LLM_STRING, [ChatGeneration(message=AIMessage("pronto"))])
+
+    cache = ResponseCache(db_path)
+    assert cache.lookup(prompt, LLM_STRING)[0].message.content == "pronto"
+    assert cache.lookup(prompt, LLM_STRING)[0].message.content == "pronto"
+    assert cache.stats() == {"hits": 2, "disk_hits": 1, "misses": 0}
+
+
+def test_entries_expire(tmp_path, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache = ResponseCache(str(tmp_path / "llm_cache.sqlite"), ttl_seconds=60)
+    prompt = _prompt(HumanMessage("mapeie /tmp"))
+    cache.update(prompt, LLM_STRING, [ChatGeneration(message=AIMessage("pronto"))])
+
+    monkeypatch.setattr(time, "time", lambda: now + 59)
+    assert cache.lookup(prompt, LLM_STRING) is not None
+    # Vencida tanto em memória quanto no disco
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.lookup(prompt, LLM_STRING) is None
+
+
+def test_memory_lru_keeps_max_entries():
+    cache = ResponseCache(max_memory_entries=2)
+    prompts = [_prompt(HumanMessage(f"pergunta {i}")) for i in range(3)]
+    for prompt in prompts:
+        cache.update(prompt, LLM_STRING, [ChatGeneration(message=AIMessage("ok"))])
+
+    assert cache.lookup(prompts[0], LLM_STRING) is None
+    assert all(cache.lookup(prompt, LLM_STRING) is not None for prompt in prompts[1:])
+
+
+def test_hits_get_fresh_message_and_tool_call_ids():
+    cache = ResponseCache()
+    prompt = _prompt(HumanMessage("mapeie /tmp"))
+    cache.update(prompt, LLM_STRING, _tool_call_response())
+
+    first = cache.lookup(prompt, LLM_STRING)[0].message
+    second = cache.lookup(prompt, LLM_STRING)[0].message
+
+    assert first.id is None
+    assert first.tool_calls[0]["id"] != "call_original"
+    assert first.tool_calls[0]["id"] != second.tool_calls[0]["id"]
+    # A tool call crua continua apontando para a mesma id da tool call parseada
+    assert first.additional_kwargs["tool_calls"][0]["id"] == first.tool_calls[0]["id"]
+
+
+def test_key_ignores_ids_and_metadata():
+    def conversation(suffix: str, answer: str = "2 pastas") -> str:
+        return _prompt(
+            HumanMessage("mapeie /tmp", id=f"human-{suffix}"),
+            _tool_call_response(f"call_{suffix}")[0].message,
+            ToolMessage(answer, tool_call_id=f"call_{suffix}", id=f"tool-{suffix}"),
+            AIMessage("pronto", id=f"run-{suffix}", response_metadata={"model": suffix},
+                      usage_metadata={"input_tokens": 1, "output_tokens": 1, "total_tokens": 2}),
+        )
+
+    key = ResponseCache._key
+    assert key(conversation("a"), LLM_STRING) == key(conversation("b"), LLM_STRING)
+    assert key(conversation("a"), LLM_STRING) != key(conversation("a", "3 pastas"), LLM_STRING)
+    assert key(conversation("a"), LLM_STRING) != key(conversation("a"), "outro-modelo")
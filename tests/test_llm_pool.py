@@ -0,0 +1,89 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from ai_assistant.llm_pool import Backend, LLMPool, LLMPoolError
+from benchmarks.fake_llm import ScriptedChatModel
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _FailingModel(ScriptedChatModel):
+    """Falha todas as chamadas com `error` (um status HTTP ou uma exceção pronta)."""
+
+    error: object
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        raise _HTTPError(self.error) if isinstance(self.error, int) else self.error
+
+
+def _model(error=None) -> ScriptedChatModel:
+    if error is None:
+        return ScriptedChatModel(target_path="/tmp", output_dir="/tmp")
+    return _FailingModel(target_path="/tmp", output_dir="/tmp", error=error)
+
+
+def _pool(*models, max_attempts: int = 3) -> LLMPool:
+    backends = [Backend(f"b{i}", model, cooldown_seconds=60, params={}) for i, model in enumerate(models)]
+    return LLMPool(backends=backends, max_attempts=max_attempts, backoff_seconds=0, cache=False)
+
+
+@pytest.mark.parametrize("error", [429, 503, ConnectionError("recusada"), TimeoutError()])
+def test_transient_error_fails_over(error):
+    failing, healthy = _model(error), _model()
+    pool = _pool(failing, healthy)
+
+    reply = pool.invoke([HumanMessage("oi")])
+
+    assert reply.response_metadata["llm_pool_backend"] == "b1"
+    assert (failing.calls, healthy.calls) == (1, 1)
+    first, second = pool.stats()
+    assert not first["healthy"] and first["errors"] == 1
+    assert second["healthy"] and second["latency_s"] is not None
+
+
+def test_client_error_is_not_retried():
+    failing, healthy = _model(400), _model()
+    pool = _pool(failing, healthy)
+
+    with pytest.raises(_HTTPError):
+        pool.invoke([HumanMessage("oi")])
+    assert (failing.calls, healthy.calls) == (1, 0)
+    # Um pedido inválido não é culpa do provedor: ele continua saudável
+    assert pool.stats()[0]["healthy"]
+
+
+def test_cooled_down_backend_is_skipped():
+    failing, healthy = _model(429), _model()
+    pool = _pool(failing, healthy)
+    pool.invoke([HumanMessage("oi")])
+
+    for _ in range(3):
+        pool.invoke([HumanMessage("oi")])
+    assert (failing.calls, healthy.calls) == (1, 4)
+
+
+def test_backend_in_cooldown_is_still_used_as_last_resort():
+    failing, recovering = _model(503), _model(503)
+    pool = _pool(failing, recovering, max_attempts=4)
+
+    with pytest.raises(LLMPoolError) as excinfo:
+        pool.invoke([HumanMessage("oi")])
+
+    assert [name for name, _ in excinfo.value.errors] == ["b0", "b1", "b0", "b1"]
+    assert isinstance(excinfo.value.__cause__, _HTTPError)
+
+
+def test_stream_fails_over_before_the_first_chunk():
+    failing, healthy = _model(429), _model()
+    pool = _pool(failing, healthy)
+
+    chunks = list(pool.stream([HumanMessage("oi")]))
+
+    assert "".join(chunk.content for chunk in chunks) == "Resumo: o usuário pediu mapeamentos de diretórios."
+    assert chunks[0].response_metadata["llm_pool_backend"] == "b1"
+    assert (failing.calls, healthy.calls) == (1, 1)
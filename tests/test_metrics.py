@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from ai_assistant.env import get_env
+from ai_assistant.graph import build_graph
+from ai_assistant.metrics import MetricsRecorder, notify_retry
+from benchmarks.fake_llm import ScriptedChatModel
+
+USAGE = {"input_tokens": 10, "output_tokens": 2, "total_tokens": 12}
+
+
+class _EmptyFirstModel(ScriptedChatModel):
+    """Devolve uma resposta vazia na primeira chamada, forçando uma nova tentativa do `Agent`."""
+
+    empty_replies: int = 1
+
+    def _respond(self, messages, tools) -> AIMessage:
+        if self.empty_replies:
+            self.empty_replies -= 1
+            return AIMessage(content="", usage_metadata=USAGE)
+        message = super()._respond(messages, tools)
+        message.usage_metadata = USAGE
+        return message
+
+
+def _run_graph(tmp_path, use_async: bool = False):
+    target = tmp_path / "target"
+    (target / "src").mkdir(parents=True)
+    (target / "src" / "main.py").write_text("")
+    jsonl_path = tmp_path / "metrics.jsonl"
+    prometheus_path = tmp_path / "metrics.prom"
+    config = get_env().model_copy(update={
+        "CHECKPOINT_DB_PATH": str(tmp_path / "checkpoints.sqlite"),
+        "LLM_CACHE_ENABLED": False,
+        "ROUTER_ENABLED": False,
+        "METRICS_ENABLED": True,
+        "METRICS_JSONL_PATH": str(jsonl_path),
+        "METRICS_PROMETHEUS_PATH": str(prometheus_path),
+    })
+    llm = _EmptyFirstModel(target_path=str(target), output_dir=str(tmp_path))
+    graph = build_graph(config, llm=llm)
+    state = {"messages": [{"role": "user", "content": f"mapeie {target}"}]}
+    run_config = {"configurable": {"thread_id": "metricas"}}
+    if use_async:
+        asyncio.run(graph.ainvoke(state, run_config))
+    else:
+        graph.invoke(state, run_config)
+    events = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+    return llm, events, prometheus_path.read_text()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_graph_run_records_nodes_llm_calls_tools_and_retries(tmp_path, use_async):
+    llm, events, prometheus = _run_graph(tmp_path, use_async)
+
+    nodes = [event["node"] for event in events if event["event"] == "node"]
+    assert {"primary_assistant", "enter_directory_map_assistant", "directory_map_assistant",
+            "directory_map_assistant_tools", "leave_skill"} <= set(nodes)
+    assert nodes.count("primary_assistant") == 2
+
+    llm_events = [event for event in events if event["event"] == "llm"]
+    assert len(llm_events) == llm.calls
+    assert all(event["prompt_tokens"] == 10 and event["completion_tokens"] == 2 for event in llm_events)
+    retries = [(event["node"], event["attempt"]) for event in events if event["event"] == "retry"]
+    assert retries == [("primary_assistant", 1)]
+    tools = [event["tool"] for event in events if event["event"] == "tool"]
+    assert tools == ["get_directory_tree", "save_json_structure_as_txt"]
+    assert [event["event"] for event in events][-1] == "turn"
+
+    assert 'ai_assistant_node_duration_seconds_count{node="primary_assistant"} 2' in prometheus
+    assert 'ai_assistant_llm_retries_total{node="primary_assistant"} 1' in prometheus
+    # Três chamadas no `primary_assistant`: a vazia, a nova tentativa e a resposta final
+    assert 'ai_assistant_llm_prompt_tokens_total{node="primary_assistant"} 30' in prometheus
+    assert 'ai_assistant_tool_errors_total' in prometheus and 'ai_assistant_tool_errors_total{' not in prometheus
+    assert "ai_assistant_turn_duration_seconds_count 1" in prometheus
+
+
+def test_notify_retry_outside_a_run_is_ignored():
+    notify_retry({}, 1)
+
+
+def test_prometheus_escapes_labels():
+    recorder = MetricsRecorder()
+    recorder.record_tool('tool "x"\n', 0.01, 300, error=True)
+
+    rendered = recorder.render_prometheus()
+    assert 'ai_assistant_tool_errors_total{tool="tool \\"x\\"\\n"} 1' in rendered
+    assert 'ai_assistant_tool_result_bytes_bucket{tool="tool \\"x\\"\\n",le="1024"} 1' in rendered
+    assert 'ai_assistant_tool_result_bytes_bucket{tool="tool \\"x\\"\\n",le="256"} 0' in rendered
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from ai_assistant.result_store import ResultStore, count_tree
+
+
+def _tree(files: int) -> dict:
+    """Raiz com uma pasta `src` e `files` arquivos dentro dela: `files + 2` nós."""
+    return {"name": "root", "children": [
+        {"name": "src", "children": [{"name": f"f{i}.py"} for i in range(files)]},
+    ]}
+
+
+def test_count_tree():
+    assert count_tree(_tree(3)) == (1, 3)
+    assert count_tree({"name": "empty", "children": []}) == (0, 0)
+
+
+def test_evicts_least_recently_used_by_nodes():
+    store = ResultStore(max_nodes=10, max_entries=10)
+    first = store.put(_tree(2))
+    second = store.put(_tree(2))
+    # Usar o primeiro o torna o mais recente: o segundo é o descartado
+    store.get(first)
+    third = store.put(_tree(3))
+
+    assert store.get(first) == _tree(2)
+    assert store.get(third) == _tree(3)
+    with pytest.raises(ValueError, match=second):
+        store.get(second)
+
+
+def test_evicts_by_entry_count():
+    store = ResultStore(max_nodes=1000, max_entries=2)
+    handles = [store.put(_tree(1)) for _ in range(3)]
+
+    with pytest.raises(ValueError):
+        store.get(handles[0])
+    assert [store.get(handle) for handle in handles[1:]] == [_tree(1)] * 2
+
+
+def test_keeps_newest_result_over_the_limit():
+    store = ResultStore(max_nodes=5, max_entries=10)
+    small = store.put(_tree(1))
+    large = store.put(_tree(100))
+
+    assert store.get(large) == _tree(100)
+    with pytest.raises(ValueError):
+        store.get(small)
+
+
+def test_large_results_spill_to_disk(tmp_path):
+    spill_dir = tmp_path / "spill"
+    store = ResultStore(max_nodes=10, max_entries=2, spill_dir=str(spill_dir), spill_threshold=5)
+    large = store.put(_tree(50))
+    small = store.put(_tree(1))
+
+    (spill_path,) = spill_dir.iterdir()
+    assert spill_path.name == f"{large}.json"
+    # Em disco, o resultado não conta no limite de nós em memória
+    assert store.get(large) == _tree(50)
+    assert store.get(small) == _tree(1)
+
+    # Descartado pelo limite de entradas, o arquivo também é removido
+    store.put(_tree(1))
+    assert not os.listdir(spill_dir)
+    with pytest.raises(ValueError):
+        store.get(large)
+    assert store.get(small) == _tree(1)
+
+
+def test_unknown_handle():
+    with pytest.raises(ValueError, match="Handle 'tree-missing' não encontrado"):
+        ResultStore(max_nodes=10, max_entries=10).get("tree-missing")
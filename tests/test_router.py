@@ -0,0 +1,82 @@
+import pytest
+
+from ai_assistant.env import get_env
+from ai_assistant.graph import build_graph
+from ai_assistant.router import IntentRouter, evaluate
+from benchmarks.bench_router import EXAMPLES
+from benchmarks.fake_llm import ScriptedChatModel
+
+
+@pytest.mark.parametrize("text", [
+    "mapeie /home/user/projeto",
+    "mapeie a pasta ~/projetos",
+    "gere a árvore de diretórios de /tmp",
+    "salve a estrutura de /tmp/dados em txt",
+    "map the directory tree of /srv/app",
+])
+def test_mapping_requests_take_the_fast_route(text):
+    assert IntentRouter().route(text)[0]
+
+
+@pytest.mark.parametrize("text", [
+    "não mapeie nada, só me explique o que é uma pasta",
+    "não precisa mapear /tmp, só diga o que é",
+    "o que é uma pasta?",
+    "qual a diferença entre pasta e diretório?",
+    "como funciona um diretório no linux?",
+    "me escreva um script python que lista pastas",
+    "crie uma pasta chamada teste",
+    "oi, tudo bem?",
+])
+def test_other_requests_go_to_the_llm(text):
+    assert not IntentRouter().route(text)[0]
+
+
+def test_builtin_examples_have_full_precision():
+    result = evaluate(IntentRouter(), EXAMPLES)
+    assert result["precision"] == 1.0
+    assert result["coverage"] >= 0.9
+
+
+def test_threshold():
+    text = "quais pastas ocupam mais espaço em /var?"
+    score = IntentRouter().score(text)
+    assert IntentRouter(threshold=score).route(text) == (True, score)
+    assert IntentRouter(threshold=score + 0.01).route(text) == (False, score)
+
+
+def test_scorer_is_averaged():
+    router = IntentRouter(scorer=lambda text: 1.0)
+    assert router.score("oi, tudo bem?") == 0.5
+
+
+def test_shadow_mode_never_routes_but_records_metrics():
+    router = IntentRouter(shadow=True)
+    fast, score = router.route("mapeie /home/user/projeto")
+
+    assert not fast and score >= router.threshold
+    snapshot = router.metrics.snapshot()
+    assert (snapshot["fast_routes"], snapshot["fallbacks"]) == (0, 1)
+
+
+@pytest.mark.parametrize("shadow, llm_calls", [(False, 4), (True, 5)])
+def test_graph_fast_route_skips_primary_assistant(tmp_path, shadow, llm_calls):
+    target = tmp_path / "target"
+    target.mkdir()
+    llm = ScriptedChatModel(target_path=str(target), output_dir=str(tmp_path))
+    router = IntentRouter(shadow=shadow)
+    config = get_env().model_copy(update={
+        "CHECKPOINT_DB_PATH": str(tmp_path / "checkpoints.sqlite"),
+        "LLM_CACHE_ENABLED": False,
+    })
+
+    graph = build_graph(config, llm=llm, router=router)
+    graph.invoke({"messages": [{"role": "user", "content": f"mapeie {target}"}]},
+                 {"configurable": {"thread_id": "roteador"}})
+
+    # Pelo caminho rápido o `primary_assistant` não chama o LLM para delegar o pedido
+    assert llm.calls == llm_calls
+    snapshot = router.metrics.snapshot()
+    assert snapshot["fast_routes"] == (0 if shadow else 1)
+    # Em modo sombra a decisão do LLM é comparada com a do roteador
+    assert (snapshot["compared"], snapshot["agreements"]) == ((1, 1) if shadow else (0, 0))
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+from ai_assistant.env import get_env
+from ai_assistant.graph import build_graph
+from ai_assistant.server import AssistantServer
+from benchmarks.fake_llm import ScriptedChatModel
+
+
+@pytest.fixture
+def server(tmp_path):
+    target = tmp_path / "target"
+    (target / "src").mkdir(parents=True)
+    (target / "src" / "main.py").write_text("")
+    config = get_env().model_copy(update={
+        "CHECKPOINT_DB_PATH": str(tmp_path / "checkpoints.sqlite"),
+        "LLM_CACHE_ENABLED": False,
+    })
+    llm = ScriptedChatModel(target_path=str(target), output_dir=str(tmp_path))
+    return AssistantServer(build_graph(config, llm=llm), max_body_bytes=1024), str(target)
+
+
+async def _request(server: AssistantServer, head: str, body: bytes = b"") -> tuple[int, bytes]:
+    listener = await server.serve("127.0.0.1", 0)
+    async with listener:
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+    status_line, _, rest = response.partition(b"\r\n")
+    return int(status_line.split()[1]), rest.partition(b"\r\n\r\n")[2]
+
+
+def _post(path: str, body: bytes, content_length=None) -> tuple[str, bytes]:
+    length = len(body) if content_length is None else content_length
+    return f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {length}\r\n", body
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-1", "+5", "0x10", "1 0"])
+def test_invalid_content_length_is_rejected(server, content_length):
+    status, body = asyncio.run(_request(server[0], *_post("/sessions/s1/invoke", b"{}", content_length)))
+    assert status == 400
+    assert json.loads(body) == {"error": "Content-Length inválido"}
+
+
+def test_body_over_the_limit_is_rejected(server):
+    status, _ = asyncio.run(_request(server[0], *_post("/sessions/s1/invoke", b"", 1025)))
+    assert status == 413
+
+
+def test_invoke_returns_the_reply(server):
+    app, target = server
+    payload = json.dumps({"content": f"mapeie {target}"}).encode("utf-8")
+    status, body = asyncio.run(_request(app, *_post("/sessions/s1/invoke", payload)))
+    assert status == 200
+    assert json.loads(body) == {"session_id": "s1", "reply": "Pronto, a estrutura foi salva."}
+
+
+def test_messages_stream_events(server):
+    app, target = server
+    payload = json.dumps({"content": f"mapeie {target}"}).encode("utf-8")
+    status, body = asyncio.run(_request(app, *_post("/sessions/s2/messages", payload)))
+    assert status == 200
+    events = [
+        (lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: ")))
+        for lines in (block.split("\n") for block in body.decode("utf-8").strip().split("\n\n"))
+    ]
+    names = [event for event, _ in events]
+    assert "tool" in names and "token" in names
+    assert {data["name"] for event, data in events if event == "tool"} >= {"get_directory_tree"}
+    assert events[-1] == ("done", {"session_id": "s2", "reply": "Pronto, a estrutura foi salva."})
@@ -0,0 +1,117 @@
+import sqlite3
+
+import pytest
+
+from ai_assistant.env import get_env
+from ai_assistant.graph import create_directory_map_assistant_prompt
+from ai_assistant.snapshot import SnapshotStore, build_merkle
+from ai_assistant.tools import DirectoryTools, build_directory_tools
+
+
+def _file(name: str, size: int = 1, mtime_ns: int = 1) -> dict:
+    return {"name": name, "size": size, "mtime_ns": mtime_ns}
+
+
+def _tree(readme_size: int = 1, extra: bool = False) -> dict:
+    """Raiz com `docs/` (que muda) e `src/lib/` (que nunca muda)."""
+    docs = [_file("readme.md", readme_size)] + ([_file("new.md")] if extra else [])
+    return {"name": "root", "children": [
+        {"name": "docs", "children": docs},
+        {"name": "src", "children": [{"name": "lib", "children": [_file("a.py"), _file("b.py")]}, _file("main.py")]},
+        _file("setup.py"),
+    ]}
+
+
+def _node_count(store: SnapshotStore) -> int:
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshots.sqlite"), keep_last=2)
+
+
+def test_merkle_hash_depends_only_on_content():
+    root_hash, nodes = build_merkle(_tree())
+    same_hash, _ = build_merkle(_tree())
+    changed_hash, changed_nodes = build_merkle(_tree(readme_size=2))
+
+    assert root_hash == same_hash
+    assert root_hash != changed_hash
+    # Um diretório por nó; `src` e `src/lib` não mudaram e continuam com o mesmo hash
+    assert len(nodes) == 4
+    assert len(set(nodes) & set(changed_nodes)) == 2
+
+
+def test_diff_skips_equal_subtrees(store):
+    a = store.create("/p", _tree())
+    b = store.create("/p", _tree(readme_size=2, extra=True))
+
+    diff = store.diff(a.id, b.id)
+
+    assert diff.added == ["docs/new.md"]
+    assert diff.modified == ["docs/readme.md"]
+    assert diff.removed == []
+    # Só a raiz e `docs/` são comparadas; `src/` tem o mesmo hash nos dois snapshots
+    assert diff.visited_directories == 2
+    assert store.diff(a.id, a.id).visited_directories == 0
+
+
+def test_keep_last_prunes_oldest_and_releases_nodes(store):
+    first = store.create("/p", _tree(readme_size=1))
+    store.create("/p", _tree(readme_size=2))
+    store.create("/other", _tree(readme_size=3))
+    shared_nodes = _node_count(store)
+    third = store.create("/p", _tree(readme_size=4))
+
+    with pytest.raises(ValueError, match="não encontrado"):
+        store.get(first.id)
+    assert store.latest("/p").id == third.id
+    assert store.latest("/other") is not None
+    # Saiu só o par raiz/`docs` exclusivo do primeiro; `src/` segue referenciado pelos outros
+    assert _node_count(store) == shared_nodes
+    assert store.diff(store.latest("/p", exclude=third.id).id, third.id).modified == ["docs/readme.md"]
+
+
+def test_protected_snapshot_survives_pruning(store):
+    first = store.create("/p", _tree(readme_size=1))
+    store.create("/p", _tree(readme_size=2))
+    third = store.create("/p", _tree(readme_size=3), protect={first.id})
+
+    assert store.diff(first.id, third.id).modified == ["docs/readme.md"]
+    # Sem a proteção, o próximo snapshot o descarta normalmente
+    store.create("/p", _tree(readme_size=4))
+    with pytest.raises(ValueError):
+        store.get(first.id)
+
+
+@pytest.mark.parametrize("keep_last", [1, 2])
+def test_diff_oldest_snapshot_against_live_tree(tmp_path, keep_last):
+    target = tmp_path / "target"
+    (target / "src").mkdir(parents=True)
+    (target / "src" / "main.py").write_text("print()")
+    config = get_env().model_copy(update={
+        "SNAPSHOT_DB_PATH": str(tmp_path / "snapshots.sqlite"),
+        "SNAPSHOT_KEEP_LAST": keep_last,
+    })
+    tools = DirectoryTools(config)
+    snapshot_ids = [tools.snapshot_directory_tree(str(target)).split()[1] for _ in range(keep_last)]
+    (target / "src" / "new.py").write_text("")
+
+    result = tools.diff_directory_tree(snapshot_ids[0])
+
+    assert "1 adicionados, 0 removidos, 0 modificados" in result
+    assert "+ src/new.py" in result
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_snapshot_tools_are_offered_only_with_a_database(tmp_path, enabled):
+    db_path = str(tmp_path / "snapshots.sqlite") if enabled else ""
+    names = {directory_tool.name for directory_tool in
+             build_directory_tools(get_env().model_copy(update={"SNAPSHOT_DB_PATH": db_path}))}
+    prompt = create_directory_map_assistant_prompt(names).messages[0].prompt.template
+
+    snapshot_tools = {"snapshot_directory_tree", "diff_directory_tree"}
+    assert names & snapshot_tools == (snapshot_tools if enabled else set())
+    assert ("diff_directory_tree" in prompt) == enabled
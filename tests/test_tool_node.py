@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from ai_assistant.utils import create_tool_node_with_fallback
+
+
+class _Gauge:
+    """Conta quantas tools estão rodando ao mesmo tempo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.running -= 1
+
+
+def _state(count: int) -> dict:
+    calls = [{"name": "slow", "args": {"n": i}, "id": f"call-{i}"} for i in range(count)]
+    return {"messages": [AIMessage(content="", tool_calls=calls)]}
+
+
+def test_sync_tool_calls_are_bounded():
+    gauge = _Gauge()
+
+    @tool
+    def slow(n: int) -> str:
+        """Espera um pouco e devolve `n`."""
+        with gauge:
+            time.sleep(0.05)
+        return str(n)
+
+    node = create_tool_node_with_fallback([slow], max_concurrency=2)
+    result = node.invoke(_state(6))
+
+    assert gauge.peak == 2
+    assert [message.content for message in result["messages"]] == [str(i) for i in range(6)]
+
+
+def test_async_tool_calls_are_bounded():
+    gauge = _Gauge()
+    loops = set()
+
+    @tool
+    async def slow(n: int) -> str:
+        """Espera um pouco e devolve `n`."""
+        loops.add(asyncio.get_running_loop())
+        with gauge:
+            await asyncio.sleep(0.05)
+        return str(n)
+
+    async def run():
+        node = create_tool_node_with_fallback([slow], max_concurrency=2)
+        return await node.ainvoke(_state(6)), asyncio.get_running_loop()
+
+    result, loop = asyncio.run(run())
+
+    assert gauge.peak == 2
+    # Tools assíncronas rodam no próprio event loop, não numa thread à parte
+    assert loops == {loop}
+    assert [message.tool_call_id for message in result["messages"]] == [f"call-{i}" for i in range(6)]
@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from ai_assistant import walker
+from ai_assistant.env import get_env
+from ai_assistant.tools import DirectoryTools
+from ai_assistant.tree_index import RACY_WINDOW_NS, TreeIndex
+from ai_assistant.walker import walk_tree
+
+# mtime bem anterior à janela "racy", para que as listagens possam ser gravadas
+OLD_MTIME_NS = time.time_ns() - 10 * RACY_WINDOW_NS
+
+
+def _make_tree(root, directories) -> str:
+    os.makedirs(root)
+    for directory in directories:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+        open(os.path.join(root, directory, "file.txt"), "w").close()
+    _age(root)
+    return str(root)
+
+
+def _age(root, mtime_ns: int = OLD_MTIME_NS) -> None:
+    """Leva o mtime de `root` e dos seus subdiretórios para fora da janela "racy"."""
+    for path, _, _ in os.walk(root):
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _indexed(index: TreeIndex) -> set:
+    conn = sqlite3.connect(index.db_path)
+    try:
+        return {os.fsdecode(path) for (path,) in conn.execute("SELECT path FROM directories")}
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    """Diretórios efetivamente listados (via `os.scandir`) pelo walker."""
+    paths = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        paths.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(walker.os, "scandir", recording_scandir)
+    return paths
+
+
+def test_only_changed_directory_is_listed_again(tmp_path, listed):
+    root = _make_tree(tmp_path / "root", ["a", "b", "c/d"])
+    index = TreeIndex(str(tmp_path / "index.sqlite"))
+
+    listed.clear()
+    first = walk_tree(root, index=index)
+    assert sorted(listed) == [root] + [os.path.join(root, name) for name in ("a", "b", "c", "c/d")]
+
+    listed.clear()
+    assert walk_tree(root, index=index) == first
+    assert listed == []
+
+    open(os.path.join(root, "b", "new.txt"), "w").close()
+    tree = walk_tree(root, index=index)
+    assert listed == [os.path.join(root, "b")]
+    assert [child["name"] for child in tree["children"][1]["children"]] == ["file.txt", "new.txt"]
+
+
+def test_recent_directory_is_not_recorded(tmp_path, listed):
+    root = _make_tree(tmp_path / "root", ["a", "b"])
+    index = TreeIndex(str(tmp_path / "index.sqlite"))
+    walk_tree(root, index=index)
+
+    # Modificado agora: dentro da janela "racy", então é listado de novo até envelhecer
+    open(os.path.join(root, "a", "new.txt"), "w").close()
+    for _ in range(2):
+        listed.clear()
+        walk_tree(root, index=index)
+        assert listed == [os.path.join(root, "a")]
+
+    _age(os.path.join(root, "a"), OLD_MTIME_NS + 1)
+    listed.clear()
+    walk_tree(root, index=index)
+    assert listed == [os.path.join(root, "a")]
+    listed.clear()
+    walk_tree(root, index=index)
+    assert listed == []
+
+
+def test_session_lookup_checks_mtime_and_inode(tmp_path):
+    root = _make_tree(tmp_path / "root", ["a"])
+    path = os.path.join(root, "a")
+    index = TreeIndex(str(tmp_path / "index.sqlite"))
+    session = index.open_session(root)
+    st = os.stat(path)
+    assert session.lookup(path, st) is None
+    session.record(path, st, [], ["file.txt"])
+    index.commit(root, session)
+
+    session = index.open_session(root)
+    assert session.lookup(path, st) == ([], ["file.txt"])
+    assert session.lookup(path, os.stat_result(st[:8] + (st.st_mtime_ns + 1,) + st[9:])) is None
+    assert (session.hits, session.misses) == (1, 1)
+
+
+def test_least_recently_used_directories_are_evicted(tmp_path, monkeypatch):
+    old = _make_tree(tmp_path / "old", ["a", "b"])
+    new = _make_tree(tmp_path / "new", ["c"])
+    index = TreeIndex(str(tmp_path / "index.sqlite"), max_directories=3)
+    now = time.time()
+
+    monkeypatch.setattr(time, "time", lambda: now - 3600)
+    walk_tree(old, index=index)
+    assert _indexed(index) == {old, os.path.join(old, "a"), os.path.join(old, "b")}
+
+    monkeypatch.setattr(time, "time", lambda: now)
+    walk_tree(new, index=index)
+    indexed = _indexed(index)
+    assert len(indexed) == 3
+    assert {new, os.path.join(new, "c")} <= indexed
+
+
+def test_invalidate(tmp_path):
+    first = _make_tree(tmp_path / "first", ["a"])
+    second = _make_tree(tmp_path / "second", ["b"])
+    # Mesmo prefixo de `first`, mas fora da subárvore dele
+    sibling = _make_tree(tmp_path / "first-sibling", [])
+    index = TreeIndex(str(tmp_path / "index.sqlite"))
+    for root in (first, second, sibling):
+        walk_tree(root, index=index)
+
+    index.invalidate(first)
+    assert _indexed(index) == {second, os.path.join(second, "b"), sibling}
+
+    index.invalidate()
+    assert _indexed(index) == set()
+
+
+def test_tool_uses_configured_index_and_refresh(tmp_path, listed):
+    root = _make_tree(tmp_path / "root", ["a"])
+    db_path = str(tmp_path / "index.sqlite")
+    tools = DirectoryTools(get_env().model_copy(update={"TREE_INDEX_PATH": db_path}))
+    assert tools.tree_index is not None and tools.tree_index.db_path == db_path
+
+    tools.get_directory_tree(root, ignore_dirs=[])
+    listed.clear()
+    tools.get_directory_tree(root, ignore_dirs=[])
+    assert listed == []
+
+    tools.get_directory_tree(root, ignore_dirs=[], refresh=True)
+    assert sorted(listed) == [root, os.path.join(root, "a")]
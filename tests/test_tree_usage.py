@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from ai_assistant.env import get_env
+from ai_assistant.tokens import estimate_tokens
+from ai_assistant.tools import DirectoryTools
+from ai_assistant.tree_usage import NO_EXTENSION, aggregate_usage, format_size, largest_subtrees, render_usage
+
+
+def _file(name: str, size: int) -> dict:
+    return {"name": name, "size": size, "mtime_ns": 0}
+
+
+def _sample_tree() -> dict:
+    return {"name": "root", "children": [
+        {"name": "src", "children": [
+            {"name": "lib", "children": [_file("big.so", 5000), _file("a.py", 100)]},
+            _file("main.py", 300),
+        ]},
+        {"name": "docs", "children": [_file("guide.MD", 1000), _file("LICENSE", 50)]},
+        {"name": "empty", "children": []},
+        _file("README.md", 200),
+    ]}
+
+
+def test_aggregate_usage_sums_bottom_up():
+    tree = _sample_tree()
+    usage = aggregate_usage(tree)
+    src, docs, empty, _ = tree["children"]
+
+    root = usage[id(tree)]
+    assert (root.size, root.directories, root.files) == (6650, 4, 6)
+    assert root.extensions == {".so": (1, 5000), ".py": (2, 400), ".md": (2, 1200), NO_EXTENSION: (1, 50)}
+    assert usage[id(src)][:3] == (5400, 1, 3)
+    assert usage[id(docs)].extensions == {".md": (1, 1000), NO_EXTENSION: (1, 50)}
+    assert usage[id(empty)] == (0, 0, 0, {})
+
+
+def test_aggregate_usage_deep_tree():
+    tree = {"name": "leaf.txt", "size": 7}
+    for i in range(5000):
+        tree = {"name": f"d{i}", "children": [tree]}
+    assert aggregate_usage(tree)[id(tree)][:3] == (7, 4999, 1)
+
+
+def test_largest_subtrees():
+    tree = _sample_tree()
+    largest = largest_subtrees(tree, aggregate_usage(tree), top_n=3)
+
+    # Como no `du`, um diretório e o seu pai aparecem juntos
+    assert [(path, stats.size) for path, stats in largest] == [("src", 5400), ("src/lib", 5100), ("docs", 1050)]
+    assert largest_subtrees(tree, aggregate_usage(tree), top_n=0) == []
+
+
+@pytest.mark.parametrize("size, text", [(0, "0 B"), (1023, "1023 B"), (1024, "1.0 KB"), (5 * 1024 ** 3, "5.0 GB"),
+                                        (3 * 1024 ** 5, "3072.0 TB")])
+def test_format_size(size, text):
+    assert format_size(size) == text
+
+
+def test_render_usage_summary():
+    tree = _sample_tree()
+    lines = render_usage(tree, aggregate_usage(tree), max_depth=1, top_n=2, max_children=2).splitlines()
+
+    assert lines[0] == "root/: 6.5 KB, 6 arquivos, 4 pastas (tamanho aparente dos arquivos)"
+    assert lines[2:6] == [
+        "Extensões (por tamanho):",
+        "  .so: 1 arquivos, 4.9 KB",
+        "  .md: 2 arquivos, 1.2 KB",
+        "  ... (+2 extensões, 450 B)",
+    ]
+    summary = lines[lines.index("Resumo até a profundidade 1:") + 1:]
+    assert summary == [
+        "  src/: 5.3 KB, 3 arquivos, 1 pastas [.so 93%, .py 7%]",
+        "  docs/: 1.0 KB, 2 arquivos, 0 pastas [.md 95%, (sem extensão) 5%]",
+        "  ... (+1 pastas, 0 B)",
+        "  (arquivos soltos: 1, 200 B)",
+    ]
+
+
+def test_render_usage_respects_token_budget():
+    tree = {"name": "root", "children": [
+        {"name": f"dir{i}", "children": [_file("f.txt", i)]} for i in range(200)
+    ]}
+    output = render_usage(tree, aggregate_usage(tree), max_tokens=300, max_children=200)
+
+    assert output.endswith("... (resumo cortado pelo limite de tokens; use um `max_depth` menor ou um subdiretório)")
+    assert sum(estimate_tokens(line) + 1 for line in output.splitlines()[:-1]) <= 300
+
+
+def test_usage_tool_walks_once_with_sizes(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_bytes(b"x" * 2048)
+    (tmp_path / "notes.txt").write_bytes(b"x" * 10)
+    tools = DirectoryTools(get_env())
+
+    result = tools.get_directory_usage(str(tmp_path), max_depth=1)
+
+    handle = result.splitlines()[0].removeprefix("handle: ")
+    assert tools.result_store.get(handle)["children"][0]["children"][0]["size"] == 2048
+    assert f"{os.path.basename(tmp_path)}/: 2.0 KB, 2 arquivos, 1 pastas" in result
+    assert "  src/: 2.0 KB, 1 arquivos, 0 pastas [.py 100%]" in result
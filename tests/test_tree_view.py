@@ -0,0 +1,165 @@
+import random
+import sys
+from typing import List
+
+import pytest
+
+from ai_assistant.env import get_env
+from ai_assistant.tools import DirectoryTools
+from ai_assistant.tree_view import find_subtree, iter_stylized_lines, render_tree
+
+
+def _sample_tree() -> dict:
+    return {"name": "root", "children": [
+        {"name": "a", "children": [
+            {"name": "x", "children": [{"name": "deep.txt"}]},
+            {"name": "f1.py"},
+        ]},
+        {"name": "b", "children": [{"name": f"g{i}.py"} for i in range(30)]},
+        {"name": "top.txt"},
+    ]}
+
+
+def _deep_tree(depth: int) -> dict:
+    """Cadeia de `depth` diretórios aninhados, mais funda que o limite de recursão do Python."""
+    tree = {"name": "leaf.txt"}
+    for i in reversed(range(depth)):
+        tree = {"name": f"d{i}", "children": [tree]}
+    return tree
+
+
+def test_render_tree_expands_everything_within_budget():
+    assert render_tree(_sample_tree(), max_tokens=1000).splitlines()[:6] == [
+        "root/",
+        "  a/",
+        "    x/",
+        "      deep.txt",
+        "    f1.py",
+        "  b/",
+    ]
+
+
+def test_render_tree_always_lists_first_level():
+    assert render_tree(_sample_tree(), max_tokens=1) == "\n".join([
+        "root/",
+        "  a/ (1 pastas, 2 arquivos)",
+        "  b/ (0 pastas, 30 arquivos)",
+        "  top.txt",
+    ])
+
+
+def test_render_tree_collapses_what_does_not_fit():
+    # `b` não cabe no orçamento, mas `x`, mais fundo e menor, ainda cabe depois dele
+    assert render_tree(_sample_tree(), max_tokens=40) == "\n".join([
+        "root/",
+        "  a/",
+        "    x/",
+        "      deep.txt",
+        "    f1.py",
+        "  b/ (0 pastas, 30 arquivos)",
+        "  top.txt",
+    ])
+
+
+def test_render_tree_max_children():
+    assert render_tree(_sample_tree(), max_tokens=1000, max_children=2) == "\n".join([
+        "root/",
+        "  a/",
+        "    x/",
+        "      deep.txt",
+        "    f1.py",
+        "  b/",
+        "    g0.py",
+        "    g1.py",
+        "    ... (+28 entradas)",
+        "  ... (+1 entradas)",
+    ])
+
+
+def test_render_tree_marks_unlisted_directories():
+    tree = {"name": "root", "children": [
+        {"name": "deep", "children": [], "truncated": "max_depth"},
+        {"name": "empty", "children": []},
+    ]}
+    assert render_tree(tree, max_tokens=1) == "\n".join([
+        "root/",
+        "  deep/ [não listada: profundidade máxima]",
+        "  empty/",
+    ])
+
+
+@pytest.mark.parametrize("path, name", [
+    ("", "root"),
+    (".", "root"),
+    ("a/x", "x"),
+    ("/a/x/", "x"),
+    ("a/f1.py", None),
+    ("missing", None),
+])
+def test_find_subtree(path, name):
+    node = find_subtree(_sample_tree(), path)
+    assert (node["name"] if node is not None else None) == name
+
+
+def test_render_tree_deep_tree():
+    depth = sys.getrecursionlimit() + 100
+    lines = render_tree(_deep_tree(depth), max_tokens=10 ** 9).splitlines()
+    assert len(lines) == depth + 1
+    assert lines[-1] == "  " * depth + "leaf.txt"
+
+
+def test_expand_directory():
+    tools = DirectoryTools(get_env())
+    handle = tools.result_store.put(_sample_tree())
+
+    assert tools.expand_directory(handle, "a") == "a/\n  x/\n    deep.txt\n  f1.py"
+    # O nome da raiz no começo do caminho é aceito
+    assert tools.expand_directory(handle, "root/a/x") == "x/\n  deep.txt"
+    assert tools.expand_directory(handle, "b", max_tokens=1).splitlines()[1:3] == ["  g0.py", "  g1.py"]
+    with pytest.raises(ValueError, match="'a/f1.py' não encontrado"):
+        tools.expand_directory(handle, "a/f1.py")
+
+
+def _baseline_stylized_text(node: dict, is_last_parent: bool = True, prefix: str = "", is_root: bool = False) -> List[str]:
+    """Renderização recursiva original de `save_json_structure_as_txt`, usada como referência."""
+    rama = "├──" if not is_last_parent else "└──"
+    lines = [f"{prefix}{rama} {node['name']}/"] if not is_root else [f"{node['name']}/"]
+    if "children" in node:
+        for i, child in enumerate(node["children"]):
+            is_last = i == len(node["children"]) - 1
+            new_prefix = (f"{prefix}│   " if not is_last_parent else f"{prefix}    ") if not is_root else ""
+            lines.extend(_baseline_stylized_text(child, is_last, new_prefix))
+    return lines
+
+
+def _random_tree(rng: random.Random, depth: int = 0) -> dict:
+    children = []
+    for i in range(rng.randint(0, 4)):
+        if depth < 5 and rng.random() < 0.4:
+            children.append(_random_tree(rng, depth + 1))
+        else:
+            children.append({"name": f"file{i}.txt"})
+    return {"name": f"dir{depth}", "children": children}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_stylized_lines_match_baseline(seed):
+    tree = _random_tree(random.Random(seed))
+    assert list(iter_stylized_lines(tree)) == _baseline_stylized_text(tree, is_root=True)
+
+
+def test_stylized_lines_deep_tree():
+    depth = sys.getrecursionlimit() + 100
+    lines = list(iter_stylized_lines(_deep_tree(depth)))
+    assert len(lines) == depth + 1
+    assert lines[-1] == " " * 4 * (depth - 1) + "└── leaf.txt/"
+
+
+def test_save_stylized_tree(tmp_path):
+    tools = DirectoryTools(get_env())
+    tree = _random_tree(random.Random(0))
+    handle = tools.result_store.put(tree)
+    output_path = tmp_path / "tree.txt"
+
+    assert tools.save_json_structure_as_txt(handle, str(output_path)) == f"Estrutura salva em: {output_path}"
+    assert output_path.read_bytes() == "\n".join(_baseline_stylized_text(tree, is_root=True)).encode("utf-8")
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+
+import pytest
+
+from ai_assistant import walker
+from ai_assistant.gitignore import IgnoreMatcher
+from ai_assistant.env import get_env
+from ai_assistant.tools import DirectoryTools
+from ai_assistant.walker import WalkBudget, walk_tree
+from benchmarks.bench_walker import generate_tree, legacy_build_tree
+
+
+def _make_tree(root, paths) -> str:
+    """Cria os arquivos de `paths`; caminhos terminados em `/` criam diretórios vazios."""
+    for rel_path in paths:
+        path = root / rel_path
+        if rel_path.endswith("/"):
+            path.mkdir(parents=True, exist_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+    return str(root)
+
+
+def _find(tree: dict, rel_path: str) -> dict:
+    node = tree
+    for name in rel_path.split("/"):
+        node = next(child for child in node["children"] if child["name"] == name)
+    return node
+
+
+@pytest.mark.parametrize("max_workers", [1, 2, 8])
+def test_parallel_walk_matches_legacy_recursion(tmp_path, max_workers):
+    root = str(tmp_path)
+    generate_tree(root, entries=600, fanout=3, files_per_dir=4)
+    ignore = {"dir_1", "file_0.txt"}
+
+    tree = walk_tree(root, IgnoreMatcher(ignore), max_workers=max_workers)
+
+    # Mesma ordem e mesmo conteúdo, byte a byte, da implementação recursiva original
+    assert json.dumps(tree) == json.dumps(legacy_build_tree(root, ignore))
+
+
+def test_permission_error_leaves_directory_empty(tmp_path, monkeypatch):
+    root = _make_tree(tmp_path / "root", ["denied/secret.txt", "open/file.txt"])
+    denied = os.path.join(root, "denied")
+    scandir = os.scandir
+
+    def scandir_without_permission(path):
+        if path == denied:
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(walker.os, "scandir", scandir_without_permission)
+    budget = WalkBudget()
+
+    tree = walk_tree(root, budget=budget)
+
+    assert _find(tree, "denied") == {"name": "denied", "children": []}
+    assert _find(tree, "open/file.txt") == {"name": "file.txt"}
+    assert not budget.skipped
+
+
+def test_symlink_cycle_is_marked_and_not_partial(tmp_path):
+    root = _make_tree(tmp_path / "root", ["a/file.txt"])
+    os.symlink(root, os.path.join(root, "a", "back"))
+    budget = WalkBudget()
+
+    tree = walk_tree(root, budget=budget)
+
+    assert _find(tree, "a/back") == {"name": "back", "children": [], "truncated": "cycle"}
+    assert budget.skipped == {"cycle": 1}
+    # Um ciclo não é limite atingido: a árvore está completa
+    assert not budget.partial
+    assert budget.describe().startswith("Aviso:")
+
+
+def test_max_depth_lists_directories_without_their_content(tmp_path):
+    root = _make_tree(tmp_path / "root", ["a/b/c.txt", "a/d.txt", "top.txt"])
+    budget = WalkBudget(max_depth=2)
+
+    tree = walk_tree(root, budget=budget)
+
+    assert _find(tree, "a/b") == {"name": "b", "children": [], "truncated": "max_depth"}
+    assert _find(tree, "a/d.txt") == {"name": "d.txt"}
+    assert budget.skipped == {"max_depth": 1}
+    assert budget.partial
+    assert "profundidade máxima: 1" in budget.describe()
+
+
+def test_max_entries_stops_listing(tmp_path):
+    root = _make_tree(tmp_path / "root", [f"d{i}/f{j}.txt" for i in range(4) for j in range(3)])
+    budget = WalkBudget(max_entries=4)
+
+    tree = walk_tree(root, max_workers=1, budget=budget)
+
+    truncated = [child["name"] for child in tree["children"] if child.get("truncated") == "max_entries"]
+    listed = [child["name"] for child in tree["children"] if child["children"]]
+    # A raiz (4 entradas) esgota o limite; nenhum subdiretório chega a ser listado
+    assert sorted(truncated) == ["d0", "d1", "d2", "d3"]
+    assert listed == []
+    assert budget.skipped == {"max_entries": 4}
+    assert "limite de entradas: 4" in budget.describe()
+
+
+def test_cancel_event_stops_walk(tmp_path, monkeypatch):
+    root = _make_tree(tmp_path / "root", [f"d{i}/sub/f.txt" for i in range(3)])
+    cancel = threading.Event()
+    list_directory = walker._list_directory
+
+    def list_then_cancel(*args, **kwargs):
+        # Simula o Ctrl+C logo depois da primeira listagem
+        result = list_directory(*args, **kwargs)
+        cancel.set()
+        return result
+
+    monkeypatch.setattr(walker, "_list_directory", list_then_cancel)
+    budget = WalkBudget(cancel=cancel)
+
+    tree = walk_tree(root, max_workers=1, budget=budget)
+
+    assert [child["name"] for child in tree["children"]] == ["d0", "d1", "d2"]
+    assert all(child["truncated"] == "cancelled" and not child["children"] for child in tree["children"])
+    assert budget.skipped == {"cancelled": 3}
+
+
+@pytest.mark.parametrize("max_depth, walk_max_depth, listed", [
+    (0, 5, False),
+    (1, 5, False),
+    (2, 0, True),
+    (None, 1, False),
+    (None, 0, True),
+])
+def test_tool_max_depth(tmp_path, max_depth, walk_max_depth, listed):
+    root = _make_tree(tmp_path / "root", ["a/b.txt"])
+    tools = DirectoryTools(get_env().model_copy(update={"WALK_MAX_DEPTH": walk_max_depth}))
+
+    result = tools.get_directory_tree(root, max_depth=max_depth)
+
+    assert ("profundidade máxima" not in result) == listed
+    assert ("b.txt" in result) == listed
+
+
+def test_tool_rejects_negative_max_depth(tmp_path):
+    tools = DirectoryTools(get_env())
+    with pytest.raises(ValueError, match="max_depth"):
+        tools.get_directory_tree(str(tmp_path), max_depth=-1)